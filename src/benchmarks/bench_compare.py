@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: full keyword-vs-ML comparison on large synthetic JSONL collections.
+Reports wall time and peak RSS for the serial hash join and with worker processes.
+Run from the src/ directory:  python benchmarks/bench_compare.py
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from compare_categorizers import CATEGORY_ALIASES, compare_categorizations
+from metadata_store import write_metadata
+
+ML_CATEGORIES = list(CATEGORY_ALIASES) + ["Business & Career", "Home & Interior", "Uncategorized"]
+KEYWORD_CATEGORIES = list(CATEGORY_ALIASES.values()) + ["Uncategorized"]
+
+
+def make_collections(records: int, root: Path):
+    rng = random.Random(11)
+    keyword_file, ml_file = root / "keyword.jsonl", root / "ml.jsonl"
+
+    def videos(ml: bool):
+        for i in range(records):
+            video = {
+                "url": f"https://www.tiktokv.com/share/video/{7_000_000_000_000_000_000 + i}/",
+                "title": f"synthetic video {i} #fyp",
+                "author_name": f"creator{i % 5000}",
+            }
+            if ml:
+                categories = rng.sample(ML_CATEGORIES, 2)
+                video.update(categories=categories, primary_category=categories[0],
+                             confidence=round(rng.random() * 0.5, 4))
+            else:
+                video["categories"] = rng.sample(KEYWORD_CATEGORIES, rng.randint(1, 2))
+            yield video
+
+    write_metadata(videos(ml=False), str(keyword_file))
+    write_metadata(videos(ml=True), str(ml_file))
+    return keyword_file, ml_file
+
+
+def peak_rss_mb(who=resource.RUSAGE_SELF) -> float:
+    return resource.getrusage(who).ru_maxrss / 1024  # KiB on Linux
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--records", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 4])
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="bench_compare_"))
+    try:
+        start = time.perf_counter()
+        keyword_file, ml_file = make_collections(args.records, root)
+        print(f"Generated 2 x {args.records} records in {time.perf_counter() - start:.1f}s "
+              f"({(keyword_file.stat().st_size + ml_file.stat().st_size) / 1e6:.0f} MB)")
+        print(f"Peak RSS after generating: {peak_rss_mb():.0f} MB\n")
+
+        print(f"{'workers':>7} {'seconds':>8} {'records/sec':>12} {'peak RSS MB':>12}")
+        for workers in args.workers:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                compare_categorizations(str(keyword_file), str(ml_file),
+                                        str(root / "disagreements.jsonl"), workers)
+            elapsed = time.perf_counter() - start
+            rss = max(peak_rss_mb(), peak_rss_mb(resource.RUSAGE_CHILDREN))
+            print(f"{workers:>7} {elapsed:>8.1f} {args.records / elapsed:>12.0f} {rss:>12.0f}")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Benchmark: serial vs async liveness checking against a local stub oEmbed server.
+Run from the src/ directory:  python benchmarks/bench_filter_async.py
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import filter_tiktoks_oembed
+import oembed_cache
+from oembed_client import AdaptiveRateLimiter, get_client
+from stub_oembed import make_links, start_stub_server
+
+
+def bench_serial(links):
+    start = time.perf_counter()
+    alive = [filter_tiktoks_oembed.check_link(link) for link in links]
+    return alive, time.perf_counter() - start
+
+
+def bench_async(links, concurrency, rate):
+    # The stub never throttles, so start at the cap instead of ramping up to it
+    get_client().limiter = AdaptiveRateLimiter(rate=rate or float("inf"), max_rate=rate or float("inf"))
+    start = time.perf_counter()
+    alive = asyncio.run(filter_tiktoks_oembed.check_links_async(links, concurrency, rate, verbose=False))
+    return alive, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--links", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub response delay in seconds")
+    args = parser.parse_args()
+
+    server, url = start_stub_server(latency=args.latency)
+    oembed_cache.OEMBED_URL = url
+    oembed_cache.CACHE_ENABLED = False  # Measure the network path, not cache hits
+    links = make_links(args.links)
+
+    print(f"Stub oEmbed server at {url} ({args.latency * 1000:.0f} ms latency), {len(links)} links\n")
+
+    serial_links = links[:min(len(links), 100)]
+    get_client().limiter = AdaptiveRateLimiter(rate=float("inf"), max_rate=float("inf"))
+    expected, elapsed = bench_serial(serial_links)
+    print(f"{'serial (no sleep)':<28} {len(serial_links) / elapsed:>8.1f} links/sec")
+
+    for concurrency, rate in [(8, 0), (16, 0), (32, 0), (64, 0), (32, 100.0)]:
+        alive, elapsed = bench_async(links, concurrency, rate)
+        assert alive[:len(expected)] == expected, "async results differ from serial"
+        label = f"async c={concurrency} rate={'∞' if not rate else int(rate)}/s"
+        print(f"{label:<28} {len(links) / elapsed:>8.1f} links/sec")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
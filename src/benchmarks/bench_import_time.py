@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Regression check: cold-start import time of the categorizer modules, measured
+with `python -X importtime` in fresh interpreters. Fails (exit code 1) if the
+median exceeds its budget or if a heavy dependency (sklearn, numpy, nltk,
+requests) is imported eagerly.
+Run from the src/ directory:  python benchmarks/bench_import_time.py
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent
+
+# Module -> cold import budget in milliseconds
+IMPORT_BUDGETS_MS = {
+    "categorize_tiktoks_ml": 150,
+    "categorize_tiktoks": 150,
+    "recategorize": 150,
+}
+LAZY_MODULES = ("sklearn", "numpy", "scipy", "nltk", "requests")
+
+
+def import_profile(module: str):
+    """
+    One cold import of module: (total microseconds, every module it pulled in,
+    {direct child import: cumulative microseconds}). Interpreter startup is excluded.
+    """
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    group = []   # (depth, name, cumulative) since the last top-level import
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        if depth == 0 and name == module:
+            children = {n: us for d, n, us in group if d == 1}
+            return int(cumulative), {n for _, n, _ in group}, children
+        group = [] if depth == 0 else group + [(depth, name, int(cumulative))]
+    raise RuntimeError(f"{module} not found in -X importtime output")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    failed = False
+    print(f"{'module':<24} {'median ms':>10} {'budget ms':>10}  heaviest imports")
+    for module, budget in IMPORT_BUDGETS_MS.items():
+        profiles = [import_profile(module) for _ in range(args.runs)]
+        median_ms = statistics.median(total for total, _, _ in profiles) / 1000
+        _, imported, children = profiles[-1]
+        heaviest = sorted(((us, name) for name, us in children.items()), reverse=True)[:3]
+        eager = sorted({name.split(".")[0] for name in imported} & set(LAZY_MODULES))
+
+        status = "✅" if median_ms <= budget and not eager else "❌"
+        failed |= status == "❌"
+        print(f"{status} {module:<22} {median_ms:>10.1f} {budget:>10}  "
+              + ", ".join(f"{name} {us / 1000:.0f}ms" for us, name in heaviest))
+        if eager:
+            print(f"   eagerly imports: {', '.join(eager)}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
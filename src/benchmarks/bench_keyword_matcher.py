@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-keyword substring scans vs the Aho-Corasick KeywordMatcher.
+Also reports precision/recall of substring vs word-boundary matching on titles
+with known categories and words that contain keywords by accident ("said", "vacation").
+Run from the src/ directory:  python benchmarks/bench_keyword_matcher.py
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from categorize_tiktoks import CATEGORY_KEYWORDS
+from keyword_matcher import KeywordMatcher
+
+FILLER = ["pov", "when", "you", "this", "is", "so", "real", "day", "in", "my", "life",
+          "part", "story", "time", "watch", "till", "the", "end", "wait", "for", "it"]
+# Words that contain a keyword without being about that category
+DISTRACTORS = ["said", "again", "rain", "chair", "paint", "brain", "scatter", "location",
+               "category", "carpet", "competition", "puppet", "trumpet", "upstream",
+               "straight", "housecat", "catalog", "artistic", "waiting"]
+
+
+def legacy_categorize(text: str):
+    """The original categorize_by_keywords logic (one substring scan per keyword)."""
+    categories = []
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        if any(keyword in text for keyword in keywords):
+            categories.append(category)
+    return categories
+
+
+def make_titles(count: int, seed: int = 7):
+    """(lowercased title, set of true categories) pairs."""
+    rng = random.Random(seed)
+    keyword_categories = {}
+    for category, keywords in CATEGORY_KEYWORDS.items():
+        for keyword in keywords:
+            keyword_categories.setdefault(keyword, set()).add(category)
+    keywords = sorted(keyword_categories)
+
+    titles = []
+    for _ in range(count):
+        chosen = rng.sample(keywords, rng.randint(0, 2))
+        words = chosen + rng.sample(FILLER, rng.randint(3, 8)) + rng.sample(DISTRACTORS, rng.randint(0, 2))
+        rng.shuffle(words)
+        truth = set().union(*(keyword_categories[k] for k in chosen)) if chosen else set()
+        titles.append((" ".join(f"#{w}" if rng.random() < 0.15 else w for w in words), truth))
+    return titles
+
+
+def precision_recall(predicted, titles):
+    tp = fp = fn = 0
+    for found, (_, truth) in zip(predicted, titles):
+        found = set(found)
+        tp += len(found & truth)
+        fp += len(found - truth)
+        fn += len(truth - found)
+    return tp / max(1, tp + fp), tp / max(1, tp + fn)
+
+
+def timed(fn, texts):
+    start = time.perf_counter()
+    results = [fn(text) for text in texts]
+    return results, len(texts) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--titles", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    titles = make_titles(args.titles)
+    texts = [text for text, _ in titles]
+    substring = KeywordMatcher(CATEGORY_KEYWORDS)
+    words = KeywordMatcher(CATEGORY_KEYWORDS, word_boundary=True)
+
+    legacy, legacy_rate = timed(legacy_categorize, texts)
+    fast, fast_rate = timed(substring.categories_for, texts)
+    whole, whole_rate = timed(words.categories_for, texts)
+
+    assert fast == legacy, "substring matcher disagrees with the legacy implementation"
+
+    print(f"{len(texts)} synthetic titles\n")
+    print(f"{'method':<28} {'titles/sec':>12} {'speedup':>8} {'precision':>10} {'recall':>8}")
+    for name, results, rate in [("legacy substring scans", legacy, legacy_rate),
+                                ("Aho-Corasick substring", fast, fast_rate),
+                                ("Aho-Corasick word-boundary", whole, whole_rate)]:
+        precision, recall = precision_recall(results, titles)
+        print(f"{name:<28} {rate:>12.0f} {rate / legacy_rate:>7.1f}x {precision:>10.3f} {recall:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Benchmark: keyword and ML categorization with and without the categorization
+memo, on synthetic collections with a given share of repeated captions.
+For ML, "no memo" is categorize_batch's default (batch_memo off: repeats are
+only shared within a batch) and "memo" turns batch_memo on.
+Run from the src/ directory:  python benchmarks/bench_memo.py
+"""
+
+import argparse
+import contextlib
+import io
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import categorize_tiktoks
+from benchmarks.bench_ml_batch import make_titles
+from categorize_tiktoks_ml import MLCategorizer
+
+
+def make_collection(count: int, repeat_share: float, seed: int = 7):
+    """Titles where repeat_share of them repeat an earlier caption (reposts, series, empty)."""
+    rng = random.Random(seed)
+    unique = make_titles(count, seed) + [""]
+    titles = []
+    for i in range(count):
+        titles.append(rng.choice(titles) if titles and rng.random() < repeat_share else unique[i])
+    return titles
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--titles", type=int, default=100_000)
+    parser.add_argument("--repeat-share", type=float, nargs="+", default=[0.0, 0.3, 0.6, 0.9])
+    parser.add_argument("--batch-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        categorizer = MLCategorizer()
+        categorizer.train(model_dir=None)
+    memo = categorizer.memo
+    keyword_memo = categorize_tiktoks.get_keyword_memo()
+
+    def run_ml(titles):
+        return [row for start in range(0, len(titles), args.batch_size)
+                for row in categorizer.categorize_batch(titles[start:start + args.batch_size])]
+
+    def run_keywords(titles):
+        # Batches through categorize_records, which checks the keywords once per batch
+        records = [{"url": "", "normalized_url": "", "status_code": 200, "data": {"title": title}}
+                   for title in titles]
+        return [metadata["categories"] for start in range(0, len(records), args.batch_size)
+                for metadata in categorize_tiktoks.categorize_records(records[start:start + args.batch_size])]
+
+    print(f"{'repeats':>7} {'path':<9} {'no memo s':>10} {'memo s':>8} {'speedup':>8} {'hit rate':>9}")
+    for share in args.repeat_share:
+        titles = make_collection(args.titles, share)
+        for name, run, path_memo in [("keywords", run_keywords, keyword_memo), ("ml", run_ml, memo)]:
+            path_memo.clear()
+            path_memo.maxsize = 0
+            categorizer.batch_memo = False
+            expected, plain = timed(lambda: run(titles))
+            path_memo.maxsize = args.titles
+            path_memo.hits = path_memo.misses = 0
+            categorizer.batch_memo = True
+            actual, memoized = timed(lambda: run(titles))
+            assert actual == expected, f"memoized {name} results differ"
+            print(f"{share:>7.0%} {name:<9} {plain:>10.2f} {memoized:>8.2f} "
+                  f"{plain / memoized:>7.1f}x {path_memo.hit_rate:>9.0%}")
+            path_memo.clear()
+
+
+if __name__ == "__main__":
+    main()
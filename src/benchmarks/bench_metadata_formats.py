@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark: aggregating a saved collection from the pretty-printed JSON array
+(json.load, then aggregate the list) vs streaming it from JSONL (iter_metadata
+straight into a counters-only CollectionIndex). Reports wall time and peak
+traced memory at several collection sizes; the JSONL peak should stay flat.
+Run from the src/ directory:  python benchmarks/bench_metadata_formats.py
+"""
+
+import argparse
+import json
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from collection_index import build_index
+from metadata_store import iter_metadata, write_metadata
+
+CATEGORIES = ["Cooking & Food", "Fitness & Health", "Comedy & Entertainment", "Music & Dance",
+              "Education & Learning", "Technology & Gaming", "Pets & Animals", "Uncategorized"]
+
+
+def make_video(i: int, rng: random.Random):
+    categories = rng.sample(CATEGORIES, rng.randint(1, 3))
+    return {
+        "url": f"https://www.tiktokv.com/share/video/{7_000_000_000_000_000_000 + i}/",
+        "normalized_url": f"https://www.tiktok.com/@creator/video/{7_000_000_000_000_000_000 + i}",
+        "title": f"video number {i} with a reasonably long caption #fyp #tag{rng.randint(0, 199)}",
+        "author_name": f"creator{rng.randint(0, 499)}",
+        "author_url": "https://www.tiktok.com/@creator",
+        "thumbnail_url": f"https://p16-sign.tiktokcdn.com/obj/{i:032x}.jpeg",
+        "provider_name": "TikTok",
+        "hashtags": ["fyp", f"tag{rng.randint(0, 199)}"],
+        "keywords": rng.sample(["recipe", "workout", "funny", "song", "cat", "tips", "day"], 3),
+        "categories": categories,
+        "category_scores": {c: round(rng.random(), 4) for c in categories},
+        "primary_category": categories[0],
+        "confidence": round(rng.random() * 0.5, 4),
+    }
+
+
+def measure(fn):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def aggregate_json(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        all_metadata = json.load(f)
+    return build_index(all_metadata, keep_videos=False)
+
+
+def aggregate_jsonl(path):
+    return build_index(iter_metadata(path), keep_videos=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 50_000, 100_000])
+    args = parser.parse_args()
+
+    root = Path(tempfile.mkdtemp(prefix="bench_metadata_formats_"))
+    print(f"{'videos':>8} {'format':<6} {'file MB':>8} {'seconds':>8} {'peak MB':>8}")
+    try:
+        for size in args.sizes:
+            json_file, jsonl_file = root / "metadata.json", root / "metadata.jsonl"
+            rng = random.Random(size)
+            write_metadata((make_video(i, rng) for i in range(size)), str(json_file))
+            write_metadata(iter_metadata(str(json_file)), str(jsonl_file))
+
+            for name, path, fn in [("json", json_file, aggregate_json),
+                                   ("jsonl", jsonl_file, aggregate_jsonl)]:
+                index, elapsed, peak = measure(lambda: fn(str(path)))
+                assert index.total == size
+                print(f"{size:>8} {name:<6} {path.stat().st_size / 1e6:>8.1f} "
+                      f"{elapsed:>8.2f} {peak / 1e6:>8.1f}")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark: MLCategorizer.categorize (per item) vs categorize_batch on synthetic titles.
+Run from the src/ directory:  python benchmarks/bench_ml_batch.py
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from categorize_tiktoks_ml import CATEGORY_TRAINING_DATA, MLCategorizer
+
+FILLER = ["omg", "wait", "for", "the", "end", "pov", "when", "you", "this", "is", "so", "real",
+          "day", "in", "my", "life", "part", "story", "time", "watch", "till", "fyp", "viral"]
+
+
+def make_titles(count: int, seed: int = 42):
+    """Titles mixing category vocabulary, filler words and hashtags."""
+    rng = random.Random(seed)
+    vocab = sorted({word for examples in CATEGORY_TRAINING_DATA.values()
+                    for example in examples for word in example.split()})
+    titles = []
+    for _ in range(count):
+        words = rng.sample(vocab, rng.randint(0, 3)) + rng.sample(FILLER, rng.randint(2, 6))
+        rng.shuffle(words)
+        tags = " ".join(f"#{w}" for w in rng.sample(vocab + FILLER, rng.randint(0, 3)))
+        titles.append(f"{' '.join(words)} {tags}".strip())
+    return titles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--titles", type=int, default=100_000)
+    parser.add_argument("--per-item-sample", type=int, default=2_000,
+                        help="titles to time on the per-item path (it is far slower)")
+    args = parser.parse_args()
+
+    categorizer = MLCategorizer()
+    if not categorizer.train(model_dir=None):
+        sys.exit("scikit-learn and numpy are required for this benchmark")
+
+    titles = make_titles(args.titles)
+    sample = titles[:args.per_item_sample]
+
+    start = time.perf_counter()
+    per_item = [categorizer.categorize(title) for title in sample]
+    per_item_rate = len(sample) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    batch = categorizer.categorize_batch(titles)
+    batch_elapsed = time.perf_counter() - start
+    batch_rate = len(titles) / batch_elapsed
+
+    mismatches = sum(
+        1 for a, b in zip(per_item, batch)
+        if [c for c, _ in a] != [c for c, _ in b]
+        or any(abs(x - y) > 1e-9 for (_, x), (_, y) in zip(a, b))
+    )
+
+    print(f"per-item categorize:  {per_item_rate:>10.0f} titles/sec  ({len(sample)} titles)")
+    print(f"categorize_batch:     {batch_rate:>10.0f} titles/sec  ({len(titles)} titles in {batch_elapsed:.2f}s)")
+    print(f"speedup:              {batch_rate / per_item_rate:>10.1f}x")
+    print(f"mismatches on sample: {mismatches}/{len(sample)}")
+
+
+if __name__ == "__main__":
+    main()
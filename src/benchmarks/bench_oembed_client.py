@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark: a bare requests.get per link (a new connection each time) vs the
+shared OEmbedClient session, against a local stub oEmbed server. Reports
+links/sec, TCP connections the server accepted, the client's reuse counters
+and latency percentiles. Over HTTPS every new connection also costs a TLS
+handshake, so the gap against the real endpoint is larger than here.
+Run from the src/ directory:  python benchmarks/bench_oembed_client.py
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import oembed_cache
+from oembed_client import AdaptiveRateLimiter, OEmbedClient, normalize_tiktok_url
+from stub_oembed import make_links, start_stub_server
+
+
+class BareRequests:
+    """Stands in for a session: every get() is a module-level requests.get."""
+
+    def get(self, *args, **kwargs):
+        import requests
+        return requests.get(*args, **kwargs)
+
+
+def run(client: OEmbedClient, links, threads: int, session=None):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        statuses = list(pool.map(lambda link: client.check(normalize_tiktok_url(link), session=session), links))
+    return statuses, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--links", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.005, help="stub response delay in seconds")
+    parser.add_argument("--histogram", action="store_true", help="print the pooled client's latency histogram")
+    args = parser.parse_args()
+
+    server, url = start_stub_server(latency=args.latency)
+    oembed_cache.OEMBED_URL = url
+    oembed_cache.CACHE_ENABLED = False
+    links = make_links(args.links)
+    unlimited = float("inf")
+    print(f"Stub oEmbed server at {url} ({args.latency * 1000:.0f} ms latency), "
+          f"{len(links)} links, {args.threads} threads\n")
+
+    print(f"{'client':<18} {'links/sec':>9} {'connections':>12} {'p50 ms':>7} {'p99 ms':>7}")
+    results = {}
+    for name, session in [("requests.get", BareRequests()), ("pooled session", None)]:
+        client = OEmbedClient(AdaptiveRateLimiter(unlimited, max_rate=unlimited), pool_size=args.threads)
+        connections_before = server.connection_count
+        results[name], elapsed = run(client, links, args.threads, session)
+        print(f"{name:<18} {len(links) / elapsed:>9.0f} {server.connection_count - connections_before:>12} "
+              f"{client.stats.percentile(50):>7} {client.stats.percentile(99):>7}")
+    assert results["requests.get"] == results["pooled session"], "clients disagree"
+
+    print(f"\nPooled client: {client.summary()}")
+    if args.histogram:
+        print("\n".join(client.stats.histogram()))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark: writing per-author/per-hashtag files directly (one open + many small
+writes per file, as organize_by_authors used to) vs the buffered OutputWriter,
+on a synthetic collection with 10k authors.
+Run from the src/ directory:  python benchmarks/bench_output_writer.py
+"""
+
+import argparse
+import random
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import categorize_tiktoks
+from collection_index import build_index
+from output_writer import OutputWriter
+
+
+def make_metadata(authors: int, videos_per_author: int, seed: int = 7):
+    rng = random.Random(seed)
+    hashtags = [f"tag{i}" for i in range(authors // 5)]
+    videos = []
+    for a in range(authors):
+        for v in range(videos_per_author):
+            video_id = 7_000_000_000_000_000_000 + a * videos_per_author + v
+            videos.append({
+                "url": f"https://www.tiktok.com/@creator{a}/video/{video_id}",
+                "title": f"video {v} by creator {a} #{rng.choice(hashtags)}",
+                "author_name": f"creator{a}",
+                "hashtags": rng.sample(hashtags, 2),
+                "categories": ["Uncategorized"],
+            })
+    return videos
+
+
+def legacy_organize(all_metadata, output_dir, index):
+    """The original one-file-at-a-time writers."""
+    author_dir = Path(output_dir) / "by_author"
+    author_dir.mkdir(parents=True, exist_ok=True)
+    for author, videos in sorted(index.by_author.items()):
+        with open(author_dir / f"{author}.txt", 'w', encoding='utf-8') as f:
+            f.write(f"# Videos by {author} ({len(videos)} total)\n\n")
+            for video in videos:
+                f.write(f"{video['url']}\n")
+                f.write(f"  {video['title']}\n\n")
+
+    hashtag_dir = Path(output_dir) / "by_hashtag"
+    hashtag_dir.mkdir(parents=True, exist_ok=True)
+    for hashtag, videos in index.by_hashtag.items():
+        if len(videos) < 2:
+            continue
+        with open(hashtag_dir / f"#{hashtag}.txt", 'w', encoding='utf-8') as f:
+            f.write(f"# Hashtag: #{hashtag} ({len(videos)} videos)\n\n")
+            for video in videos:
+                f.write(f"{video['url']}\n")
+                f.write(f"  {video['title']}\n")
+                f.write(f"  by {video['author_name']}\n\n")
+
+
+def writer_organize(all_metadata, output_dir, index, output_format):
+    with OutputWriter(output_dir, output_format) as writer:
+        categorize_tiktoks.organize_by_authors(all_metadata, output_dir, index, writer)
+        categorize_tiktoks.organize_by_hashtags(all_metadata, output_dir, index, writer)
+    return writer
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--authors", type=int, default=10_000)
+    parser.add_argument("--videos-per-author", type=int, default=3)
+    args = parser.parse_args()
+
+    all_metadata = make_metadata(args.authors, args.videos_per_author)
+    index = build_index(all_metadata)
+    root = Path(tempfile.mkdtemp(prefix="bench_output_writer_"))
+    results = []
+
+    try:
+        start = time.perf_counter()
+        legacy_organize(all_metadata, root / "legacy", index)
+        results.append(("legacy per-file writes", time.perf_counter() - start, None))
+
+        for output_format in ("files", "zip", "sqlite"):
+            for run in ("cold", "warm"):
+                start = time.perf_counter()
+                writer = writer_organize(all_metadata, root / output_format, index, output_format)
+                elapsed = time.perf_counter() - start
+                results.append((f"OutputWriter {output_format} ({run})", elapsed,
+                                f"{writer.written} written, {writer.unchanged} unchanged"))
+    finally:
+        shutil.rmtree(root)
+
+    print(f"\n{len(all_metadata)} videos, {len(index.by_author)} authors, {len(index.by_hashtag)} hashtags\n")
+    baseline = results[0][1]
+    print(f"{'method':<28} {'seconds':>8} {'speedup':>8}  files")
+    for name, elapsed, detail in results:
+        print(f"{name:<28} {elapsed:>8.3f} {baseline / elapsed:>7.1f}x  {detail or ''}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark: MLCategorizer._preprocess_text against the original regex + word_tokenize
+implementation, on a golden corpus of synthetic titles plus edge cases (URLs,
+mentions, non-ASCII, odd whitespace, contractions). Fails (exit code 1) if any
+output differs, or if vectorizing titles through the analyzer gives different
+TF-IDF rows than vectorizing the preprocessed text with sklearn's own analyzer.
+Speedups are also broken down by kind of title, since captions with URLs or
+emoji take different paths.
+Run from the src/ directory:  python benchmarks/bench_preprocess.py
+"""
+
+import argparse
+import contextlib
+import io
+import re
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import categorize_tiktoks_ml
+from benchmarks.bench_ml_batch import make_titles
+from categorize_tiktoks_ml import VECTORIZER_PARAMS, MLCategorizer, load_nltk
+
+EDGE_CASES = [
+    "", "   ", "#", "@", "http", "https", "www", "httpx", "wwwx", "xhttpy z", "a www.b.com c",
+    "see https://tiktok.com/@user/video/1?x=2 now", "link:http://a.b/c,more words", "HTTP://CAPS.COM ok",
+    "wwwhttp://x", "hello@world #fyp #FYP @Someone's", "don't can't won't y'all", "rock'n'roll",
+    "I cannot believe it, gonna gotta wanna lemme gimme", "Cannot GONNA wanna.", "tabs\tand\nnewlines\r\n",
+    "nbsp here em　ideographic", "\x1c\x1d\x1e\x1f separators", "emoji 🔥🔥 fire 🍝 pasta",
+    "Crème brûlée café naïve", "İstanbul ǅemal ẞtraße KelvinK", "励志 uplift 日本語のタイトル",
+    "numbers 123 4x4 v2.0 1,000", "under_score snake_case", "a b c de fgh ijkl", "the and of to",
+]
+
+
+def legacy_preprocess(categorizer: MLCategorizer, text: str) -> str:
+    """_preprocess_text as it was before the translate-table rewrite."""
+    if not text:
+        return ""
+    text = text.lower()
+    text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
+    text = re.sub(r'[@#]', '', text)
+    text = re.sub(r'[^a-z0-9\s]', ' ', text)
+    text = ' '.join(text.split())
+    if load_nltk():
+        try:
+            tokens = categorize_tiktoks_ml.word_tokenize(text)
+            text = ' '.join([w for w in tokens if w not in categorizer.stop_words and len(w) > 2])
+        except:
+            pass
+    return text
+
+
+def title_kinds(titles):
+    """The same titles dressed up the ways real captions differ."""
+    return {
+        "plain": titles,
+        "short": [title[:15] for title in titles],
+        "with URLs": [f"{title} https://vm.tiktok.com/ZM{i}/ www.example.com/{i}" for i, title in enumerate(titles)],
+        "emoji/accents": [f"{title} 🔥🔥 ✨ café" for title in titles],
+        "hashtags": [" ".join("#" + word for word in title.split()) for title in titles],
+    }
+
+
+def timed(fn, titles):
+    start = time.perf_counter()
+    results = [fn(title) for title in titles]
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--titles", type=int, default=100_000)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        categorizer = MLCategorizer()
+        categorizer.train(model_dir=None)
+    print(f"NLTK data available: {load_nltk()}")
+
+    corpus = EDGE_CASES + make_titles(args.titles)
+    # Decorate some titles the way real captions look
+    corpus += [f"{title} https://vm.tiktok.com/{i}/ @user{i}!" for i, title in enumerate(corpus[:2000])]
+
+    legacy, legacy_seconds = timed(lambda title: legacy_preprocess(categorizer, title), corpus)
+    fast, fast_seconds = timed(categorizer._preprocess_text, corpus)
+    mismatches = [(title, old, new) for title, old, new in zip(corpus, legacy, fast) if old != new]
+    for title, old, new in mismatches[:10]:
+        print(f"❌ {title!r}\n   legacy: {old!r}\n   new:    {new!r}")
+
+    # The analyzer must vectorize exactly like sklearn's analyzer on the preprocessed text
+    reference = categorize_tiktoks_ml.TfidfVectorizer(**VECTORIZER_PARAMS,
+                                                      vocabulary=categorizer.vectorizer.vocabulary_)
+    reference.idf_ = categorizer.vectorizer.idf_
+    sample = corpus[:20_000]
+    start = time.perf_counter()
+    expected = reference.transform([legacy_preprocess(categorizer, title) for title in sample])
+    legacy_vectorize = time.perf_counter() - start
+    start = time.perf_counter()
+    actual = categorizer.vectorizer.transform([categorizer._tokens(title) for title in sample])
+    fast_vectorize = time.perf_counter() - start
+    vectors_match = abs(expected - actual).max() < 1e-12 if expected.nnz or actual.nnz else True
+
+    print(f"{len(corpus)} titles, {len(mismatches)} mismatches")
+    print(f"{'path':<28} {'legacy µs':>10} {'new µs':>8} {'speedup':>8}")
+    for name, old, new, count in [("preprocess", legacy_seconds, fast_seconds, len(corpus)),
+                                  ("preprocess + vectorize", legacy_vectorize, fast_vectorize, len(sample))]:
+        print(f"{name:<28} {old / count * 1e6:>10.2f} {new / count * 1e6:>8.2f} {old / new:>7.1f}x")
+    print(f"{'✅' if vectors_match else '❌'} TF-IDF rows match")
+
+    print(f"\n{'title kind':<28} {'legacy µs':>10} {'new µs':>8} {'speedup':>8}")
+    for kind, titles in title_kinds(make_titles(min(args.titles, 20_000), seed=11)).items():
+        legacy_kind, old = timed(lambda title: legacy_preprocess(categorizer, title), titles)
+        fast_kind, new = timed(categorizer._preprocess_text, titles)
+        mismatches += [(title, a, b) for title, a, b in zip(titles, legacy_kind, fast_kind) if a != b]
+        print(f"{kind:<28} {old / len(titles) * 1e6:>10.2f} {new / len(titles) * 1e6:>8.2f} {old / new:>7.1f}x")
+
+    sys.exit(1 if mismatches or not vectors_match else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Benchmark: liveness via full oEmbed fetches vs OEmbedClient.probe(), against a
+local stub oEmbed server. Probes run once with HEAD allowed and once with the
+stub refusing HEAD (so the client falls back to streamed GETs), then once more
+closing each streamed GET after its headers instead of reading the small body.
+Reports
+links/sec, response bytes per link, connections opened and whether every
+verdict matches the full fetch.
+Run from the src/ directory:  python benchmarks/bench_probe.py
+"""
+
+import argparse
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import oembed_cache
+import oembed_client
+from oembed_client import AdaptiveRateLimiter, OEmbedClient, normalize_tiktok_url
+from stub_oembed import make_links, start_stub_server
+
+
+def run(check, links, threads: int):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        statuses = list(pool.map(lambda link: check(normalize_tiktok_url(link)), links))
+    return statuses, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--links", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.005, help="stub response delay in seconds")
+    args = parser.parse_args()
+
+    server, url = start_stub_server(latency=args.latency)
+    oembed_cache.OEMBED_URL = url
+    oembed_cache.CACHE_ENABLED = False
+    links = make_links(args.links)
+    unlimited = float("inf")
+    print(f"Stub oEmbed server at {url} ({args.latency * 1000:.0f} ms latency), "
+          f"{len(links)} links, {args.threads} threads\n")
+
+    print(f"{'mode':<26} {'links/sec':>9} {'bytes/link':>11} {'connections':>12} {'full fetches':>13} "
+          f"{'same verdicts':>14}")
+    expected = None
+    drain_bytes = oembed_client.PROBE_DRAIN_BYTES
+    for name, probe, head_allowed, drain in [("full fetch", False, True, drain_bytes),
+                                             ("probe (HEAD)", True, True, drain_bytes),
+                                             ("probe (HEAD refused)", True, False, drain_bytes),
+                                             ("probe (refused, no drain)", True, False, 0)]:
+        server.head_allowed = head_allowed
+        oembed_client.PROBE_DRAIN_BYTES = drain
+        client = OEmbedClient(AdaptiveRateLimiter(unlimited, max_rate=unlimited), pool_size=args.threads)
+        bytes_before, connections_before = server.bytes_sent, server.connection_count
+        statuses, elapsed = run(client.probe if probe else client.check, links, args.threads)
+        expected = expected or statuses
+        full_fetches = client.probe_fallbacks if probe else len(links)
+        print(f"{name:<26} {len(links) / elapsed:>9.0f} {(server.bytes_sent - bytes_before) / len(links):>11.0f} "
+              f"{server.connection_count - connections_before:>12} {full_fetches:>13} "
+              f"{'✅' if statuses == expected else '❌':>13}")
+        client.close()
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
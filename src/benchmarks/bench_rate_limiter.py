@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Benchmark: liveness checking against a stub oEmbed server that throttles like
+TikTok (HTTP 429 beyond --server-rate requests/second, with Retry-After).
+
+Compares the old fixed 0.3 s sleep, a fixed fast rate that ignores throttling,
+and the adaptive client. Reports throughput, 429s received, links left unknown,
+and live links wrongly reported dead (which must be 0).
+Run from the src/ directory:  python benchmarks/bench_rate_limiter.py
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import filter_tiktoks_oembed
+import oembed_cache
+import oembed_client
+from oembed_client import ALIVE, DEAD, UNKNOWN, AdaptiveRateLimiter, OEmbedClient
+from stub_oembed import make_links, start_stub_server
+
+
+def expected_status(link: str) -> str:
+    return DEAD if link.rstrip("/")[-1] in "012" else ALIVE
+
+
+def run(links, client: OEmbedClient, concurrency: int, rate: float):
+    oembed_client._default_client = client
+    start = time.perf_counter()
+    statuses = asyncio.run(filter_tiktoks_oembed.check_links_async(links, concurrency, rate, verbose=False))
+    return statuses, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--links", type=int, default=600)
+    parser.add_argument("--latency", type=float, default=0.02, help="stub response delay in seconds")
+    parser.add_argument("--server-rate", type=float, default=30.0,
+                        help="requests/second the stub allows before answering 429")
+    args = parser.parse_args()
+
+    server, url = start_stub_server(latency=args.latency, max_rate=args.server_rate, retry_after=1)
+    oembed_cache.OEMBED_URL = url
+    oembed_cache.CACHE_ENABLED = False
+    links = make_links(args.links)
+    expected = [expected_status(link) for link in links]
+    print(f"Stub oEmbed server at {url}: {args.latency * 1000:.0f} ms latency, "
+          f"429 beyond {args.server_rate:.0f} req/s, {len(links)} links\n")
+
+    scenarios = [
+        # name, client, concurrency, rate cap, links (the old sleep is too slow for all of them)
+        ("fixed 0.3s sleep", OEmbedClient(AdaptiveRateLimiter(1 / 0.3, 0, 1 / 0.3, 0, 1), max_retries=0),
+         1, 1 / 0.3, links[:60]),
+        ("fixed 100/s, no backoff", OEmbedClient(AdaptiveRateLimiter(100, 0, 100, 0, 1), max_retries=0),
+         16, 100, links),
+        ("adaptive", OEmbedClient(), 16, 100, links),
+    ]
+    print(f"{'client':<26} {'links/sec':>9} {'429s':>6} {'unknown':>8} {'wrongly dead':>13} {'final rate':>11}")
+    for name, client, concurrency, rate, sample in scenarios:
+        throttled_before = server.throttled_count
+        statuses, elapsed = run(sample, client, concurrency, rate)
+        counts = Counter(statuses)
+        wrongly_dead = sum(1 for got, want in zip(statuses, expected) if got == DEAD and want == ALIVE)
+        print(f"{name:<26} {len(sample) / elapsed:>9.1f} {server.throttled_count - throttled_before:>6} "
+              f"{counts[UNKNOWN]:>8} {wrongly_dead:>13} {client.limiter.rate:>9.1f}/s")
+    print("\n(Before the adaptive client, every unknown link above would have been dropped as dead.)")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
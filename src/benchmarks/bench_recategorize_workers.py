@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Benchmark: offline ML re-categorization throughput vs number of worker processes.
+Prints the scaling curve (speedup and efficiency relative to one process) and
+checks every run returns the same results, in the same order, as the serial one.
+Run from the src/ directory:  python benchmarks/bench_recategorize_workers.py
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.bench_ml_batch import make_titles
+from categorize_tiktoks_ml import MLCategorizer
+from recategorize import recategorize_ml
+
+
+def make_metadata(count: int):
+    return [{
+        "url": f"https://www.tiktokv.com/share/video/{7_000_000_000_000_000_000 + i}/",
+        "title": title,
+        "author_name": f"creator{i % 500}",
+    } for i, title in enumerate(make_titles(count))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--videos", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--batch-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    all_metadata = make_metadata(args.videos)
+    model_dir = tempfile.mkdtemp(prefix="bench_recategorize_workers_")
+    try:
+        categorizer = MLCategorizer()
+        with contextlib.redirect_stdout(io.StringIO()):
+            categorizer.train(model_dir)  # Saves the model the workers load
+
+        print(f"{args.videos} videos, {os.cpu_count()} CPU cores")
+        print(f"{'workers':>7} {'seconds':>8} {'videos/sec':>11} {'speedup':>8} {'efficiency':>10}")
+        baseline = serial_results = None
+        for workers in args.workers:
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                results = recategorize_ml(all_metadata, categorizer, args.batch_size, workers, model_dir)
+            elapsed = time.perf_counter() - start
+
+            if serial_results is None:
+                baseline, serial_results = elapsed, results
+            elif results != serial_results:
+                sys.exit(f"❌ {workers} workers produced different results than {args.workers[0]}")
+            speedup = baseline / elapsed
+            print(f"{workers:>7} {elapsed:>8.2f} {args.videos / elapsed:>11.0f} "
+                  f"{speedup:>7.2f}x {speedup / workers * args.workers[0]:>9.0%}")
+    finally:
+        shutil.rmtree(model_dir)
+
+
+if __name__ == "__main__":
+    main()
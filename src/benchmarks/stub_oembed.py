@@ -0,0 +1,156 @@
+"""
+Local stub of TikTok's oEmbed endpoint for benchmarks.
+Video IDs ending in 0-2 are reported as deleted (HTTP 400), the rest return a
+realistic oEmbed JSON body after a configurable delay. With `max_rate` set, the
+stub throttles like TikTok: requests beyond that many per second get HTTP 429
+(with a Retry-After header if `retry_after` is set). HEAD requests get the same
+status and headers without a body, or 405 if `head_allowed` is off. Every byte
+written back to clients is counted in `bytes_sent`.
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+EMBED_HTML = "<blockquote class=\"tiktok-embed\">" + "x" * 2000 + "</blockquote>"
+
+
+class CountingWriter:
+    """Wraps a handler's wfile and adds every byte written to server.bytes_sent."""
+
+    def __init__(self, wfile, server):
+        self._wfile = wfile
+        self._server = server
+
+    def write(self, data):
+        with self._server.lock:
+            self._server.bytes_sent += len(data)
+        return self._wfile.write(data)
+
+    def __getattr__(self, name):
+        return getattr(self._wfile, name)
+
+
+class StubOEmbedHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, like the real endpoint
+    disable_nagle_algorithm = True  # Headers and body are separate writes; don't stall on delayed ACKs
+
+    def setup(self):
+        super().setup()
+        with self.server.lock:
+            self.server.connection_count += 1
+        self.wfile = CountingWriter(self.wfile, self.server)
+
+    def handle(self):
+        try:
+            super().handle()
+        except ConnectionResetError:
+            pass  # Client hung up without reading the body
+
+    def do_HEAD(self):
+        if not self.server.head_allowed:
+            self.send_response(405)
+            self.send_header("Allow", "GET")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.do_GET(send_body=False)
+
+    def do_GET(self, send_body=True):
+        server = self.server
+        if server.latency:
+            time.sleep(server.latency)
+
+        query = parse_qs(urlparse(self.path).query)
+        match = re.search(r'/video/(\d+)', query.get("url", [""])[0])
+        video_id = match.group(1) if match else ""
+
+        with server.lock:
+            server.request_count += 1
+            throttled = server.max_rate and not server.take_token()
+            if throttled:
+                server.throttled_count += 1
+
+        if throttled:
+            payload = b'{"code": 429, "message": "Too many requests"}'
+            self.send_response(429)
+            if server.retry_after is not None:
+                self.send_header("Retry-After", str(server.retry_after))
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            if send_body:
+                self.wfile.write(payload)
+            return
+
+        if not video_id or video_id[-1] in "012":
+            status, body = 400, {"code": 400, "message": "Something went wrong"}
+        else:
+            status, body = 200, {
+                "version": "1.0",
+                "type": "video",
+                "title": f"Stub video {video_id} #fyp #stub",
+                "author_name": f"creator{int(video_id) % 97}",
+                "author_url": f"https://www.tiktok.com/@creator{int(video_id) % 97}",
+                "provider_name": "TikTok",
+                "thumbnail_url": f"https://p16-sign.tiktokcdn.com/{video_id}.jpeg",
+                "html": EMBED_HTML,
+            }
+
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TokenBucket:
+    """Server-side throttle: `rate` requests per second with bursts up to one second's worth."""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.tokens = max(1.0, rate)
+        self.updated = time.monotonic()
+
+    def __call__(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(max(1.0, self.rate), self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+def start_stub_server(latency: float = 0.05, max_rate: float = 0,
+                      retry_after: Optional[int] = None, head_allowed: bool = True) -> Tuple[ThreadingHTTPServer, str]:
+    """Start the stub server on a free port; returns (server, oembed_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubOEmbedHandler)
+    server.daemon_threads = True
+    server.latency = latency
+    server.max_rate = max_rate
+    server.retry_after = retry_after
+    server.head_allowed = head_allowed
+    server.take_token = TokenBucket(max_rate) if max_rate else None
+    server.lock = threading.Lock()
+    server.request_count = 0
+    server.connection_count = 0
+    server.throttled_count = 0
+    server.bytes_sent = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}/oembed"
+
+
+def make_links(count: int, start: int = 7560000000000000000):
+    """Generate synthetic share links in the same format as the data files."""
+    return [f"https://www.tiktokv.com/share/video/{start + i}/" for i in range(count)]
@@ -0,0 +1,81 @@
+"""
+Bounded LRU memo for categorization results, keyed by preprocessed title text.
+Saved collections repeat captions a lot (reposts, series, empty titles), so a
+repeated caption costs one dict lookup instead of a full scoring pass.
+
+Each memo is tied to a fingerprint of the data its results came from
+(CATEGORY_KEYWORDS or CATEGORY_TRAINING_DATA); when the fingerprint changes,
+every entry is dropped.
+"""
+
+import hashlib
+import json
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+MEMO_SIZE = 65536  # Max distinct texts remembered per categorizer
+
+_MISSING = object()
+
+
+def data_fingerprint(*data: Any) -> str:
+    """Stable hash of JSON-serializable categorization data."""
+    encoded = json.dumps(data, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()
+
+
+class CategorizationMemo:
+    """LRU mapping of preprocessed text -> categorization result, with hit/miss counts."""
+
+    def __init__(self, maxsize: int = MEMO_SIZE):
+        self.maxsize = maxsize
+        self.fingerprint = None
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._entries = OrderedDict()
+
+    def validate(self, fingerprint: str):
+        """Drop every entry if the categorization data changed since they were stored."""
+        if fingerprint != self.fingerprint:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self.fingerprint = fingerprint
+
+    def get(self, key: Hashable, default: Optional[Any] = None):
+        result = self._entries.get(key, _MISSING)
+        if result is _MISSING:
+            self.misses += 1
+            return default
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return result
+
+    def record_hit(self, count: int = 1):
+        """Count lookups answered by a result the caller already holds (e.g. a repeat within one batch)."""
+        self.hits += count
+
+    def put(self, key: Hashable, result: Any):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    @property
+    def lookups(self) -> int:
+        return self.hits + self.misses
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.lookups if self.lookups else 0.0
+
+    def summary(self) -> str:
+        return (f"{self.hits} hits, {self.misses} misses ({self.hit_rate:.0%} hit rate, "
+                f"{len(self._entries)} entries)")
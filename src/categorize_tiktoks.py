@@ -3,26 +3,27 @@ TikTok Categorizer - Enhanced version of oembed.py
 Fetches TikTok metadata and categorizes videos by author, keywords, hashtags, etc.
 """
 
-import requests
-import time
+import argparse
+import io
 import re
-import json
-from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Optional, Set
+from typing import Dict, Iterable, List, Optional, Set
 from urllib.parse import urlparse
 
+from categorization_memo import CategorizationMemo, data_fingerprint
+from checkpoint import CHECKPOINT_EVERY, CheckpointJournal, checkpoint_path, journal_key
+from collection_index import CollectionIndex, build_index
+from keyword_matcher import KeywordMatcher
+from metadata_store import write_metadata
+from oembed_cache import get_cache
+from oembed_client import HEADERS, get_client, normalize_tiktok_url
+from output_writer import OUTPUT_FORMATS, OutputWriter
+from pipeline import (BATCH_SIZE, FETCH_CONCURRENCY, FetchStage, categorize_stage,
+                      describe_failure, fetch_raw_record)
+
 INPUT_FILE = "tiktoks_cleaned.txt"
 OUTPUT_DIR = "categorized_tiktoks"
-METADATA_FILE = "tiktok_metadata.json"
-
-HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-        "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Safari/605.1.15"
-    ),
-    "Accept": "application/json",
-}
+METADATA_FILE = "tiktok_metadata.json"  # Use a .db name to keep metadata in a SQLite store
 
 # Keywords for auto-categorization
 CATEGORY_KEYWORDS = {
@@ -41,14 +42,11 @@ CATEGORY_KEYWORDS = {
     "Gaming": ["game", "gaming", "gamer", "gameplay", "stream"],
 }
 
+# Only match keywords as whole words ("ai" won't match "said", "cat" won't match "education")
+KEYWORD_WORD_BOUNDARY = False
 
-def normalize_tiktok_url(url: str) -> str:
-    """Convert tiktokv.com links to canonical tiktok.com format."""
-    match = re.search(r'/video/(\d+)', url)
-    if match:
-        video_id = match.group(1)
-        return f"https://www.tiktok.com/@_/video/{video_id}"
-    return url
+_keyword_matcher = None
+_keyword_memo = CategorizationMemo()
 
 
 def extract_hashtags(text: str) -> Set[str]:
@@ -58,81 +56,113 @@ def extract_hashtags(text: str) -> Set[str]:
     return set(re.findall(r'#(\w+)', text.lower()))
 
 
+def refresh_keyword_matcher():
+    """
+    Recompile the matcher and drop memoized results if CATEGORY_KEYWORDS or
+    KEYWORD_WORD_BOUNDARY changed. Every public categorization entry point checks
+    this itself (categorize_records once per batch).
+    """
+    global _keyword_matcher
+    fingerprint = data_fingerprint(CATEGORY_KEYWORDS, KEYWORD_WORD_BOUNDARY)
+    if _keyword_matcher is None or fingerprint != _keyword_memo.fingerprint:
+        _keyword_matcher = KeywordMatcher(CATEGORY_KEYWORDS, word_boundary=KEYWORD_WORD_BOUNDARY)
+    _keyword_memo.validate(fingerprint)
+
+
+def get_keyword_matcher() -> KeywordMatcher:
+    """Compile CATEGORY_KEYWORDS into a single-pass matcher (once per process)."""
+    if _keyword_matcher is None:
+        refresh_keyword_matcher()
+    return _keyword_matcher
+
+
+def get_keyword_memo() -> CategorizationMemo:
+    """The memo of keyword categorizations, keyed by lowercased text."""
+    return _keyword_memo
+
+
 def categorize_by_keywords(title: str, description: str = "") -> List[str]:
     """Automatically categorize based on keywords in title/description."""
+    refresh_keyword_matcher()
+    return _keyword_categories(title, description)
+
+
+def _keyword_categories(title: str, description: str = "") -> List[str]:
+    # Assumes refresh_keyword_matcher() already ran for the current keywords
     text = f"{title} {description}".lower()
-    categories = []
+    categories = _keyword_memo.get(text)
+    if categories is None:
+        categories = get_keyword_matcher().categories_for(text) or ["Uncategorized"]
+        _keyword_memo.put(text, categories)
+    return list(categories)
+
+
+def fetch_raw(video_url: str) -> Dict:
+    """Fetch the raw oEmbed record for a video (network stage only)."""
+    return fetch_raw_record(video_url, normalize_tiktok_url(video_url), HEADERS)
+
+
+def build_metadata(record: Dict) -> Optional[Dict]:
+    """
+    Turn a raw oEmbed record into categorized metadata (None if the fetch failed).
+    Callers run refresh_keyword_matcher() first, as categorize_records() does.
+    """
+    if record["status_code"] != 200 or record["data"] is None:
+        return None
+    data = record["data"]
     
-    for category, keywords in CATEGORY_KEYWORDS.items():
-        if any(keyword in text for keyword in keywords):
-            categories.append(category)
+    # Extract metadata
+    metadata = {
+        "url": record["url"],
+        "normalized_url": record["normalized_url"],
+        "title": data.get("title", ""),
+        "author_name": data.get("author_name", ""),
+        "author_url": data.get("author_url", ""),
+        "thumbnail_url": data.get("thumbnail_url", ""),
+        "provider_name": data.get("provider_name", ""),
+        "version": data.get("version", ""),
+        "html": data.get("html", ""),
+    }
     
-    return categories if categories else ["Uncategorized"]
+    # Extract hashtags from title
+    metadata["hashtags"] = list(extract_hashtags(metadata["title"]))
+    
+    # Auto-categorize
+    metadata["categories"] = _keyword_categories(metadata["title"])
+    
+    return metadata
+
+
+def categorize_records(records: List[Dict]) -> List[Optional[Dict]]:
+    """Categorize stage: build metadata for a batch of raw records."""
+    refresh_keyword_matcher()
+    return [build_metadata(record) for record in records]
 
 
 def fetch_tiktok_metadata(video_url: str) -> Optional[Dict]:
     """Fetch TikTok metadata via oEmbed API."""
-    try:
-        normalized = normalize_tiktok_url(video_url)
-        r = requests.get(
-            "https://www.tiktok.com/oembed",
-            params={"url": normalized},
-            headers=HEADERS,
-            timeout=10,
-        )
-
-        if r.status_code == 200:
-            data = r.json()
-            
-            # Extract metadata
-            metadata = {
-                "url": video_url,
-                "normalized_url": normalized,
-                "title": data.get("title", ""),
-                "author_name": data.get("author_name", ""),
-                "author_url": data.get("author_url", ""),
-                "thumbnail_url": data.get("thumbnail_url", ""),
-                "provider_name": data.get("provider_name", ""),
-                "version": data.get("version", ""),
-                "html": data.get("html", ""),
-            }
-            
-            # Extract hashtags from title
-            metadata["hashtags"] = list(extract_hashtags(metadata["title"]))
-            
-            # Auto-categorize
-            metadata["categories"] = categorize_by_keywords(metadata["title"])
-            
-            return metadata
-        else:
-            print(f"❌ Failed to fetch: {video_url} (Status: {r.status_code})")
-            return None
-
-    except Exception as e:
-        print(f"❌ Error fetching {video_url}: {e}")
-        return None
+    record = fetch_raw(video_url)
+    refresh_keyword_matcher()
+    metadata = build_metadata(record)
+    if metadata is None:
+        print(describe_failure(record))
+    return metadata
 
 
 def save_metadata(all_metadata: List[Dict], filename: str):
-    """Save all metadata to JSON file."""
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(all_metadata, f, indent=2, ensure_ascii=False)
+    """Save all metadata to a JSON file, or upsert it into a SQLite store (.db)."""
+    write_metadata(all_metadata, filename)
     print(f"💾 Saved metadata to {filename}")
 
 
-def organize_by_categories(all_metadata: List[Dict], output_dir: str):
+def organize_by_categories(all_metadata: List[Dict], output_dir: str,
+                           index: Optional[CollectionIndex] = None):
     """Organize TikToks into category files."""
     Path(output_dir).mkdir(exist_ok=True)
-    
-    # Group by categories
-    category_videos = defaultdict(list)
-    
-    for video in all_metadata:
-        for category in video.get("categories", ["Uncategorized"]):
-            category_videos[category].append(video)
+    index = index or build_index(all_metadata)
     
     # Save each category to a file
-    for category, videos in sorted(category_videos.items()):
+    for category, videos in sorted(index.by_category.items()):
         filename = Path(output_dir) / f"{category.lower().replace(' ', '_')}.txt"
         with open(filename, 'w', encoding='utf-8') as f:
             for video in videos:
@@ -146,77 +176,69 @@ def organize_by_categories(all_metadata: List[Dict], output_dir: str):
         print(f"📁 {category}: {len(videos)} videos → {filename}")
 
 
-def organize_by_authors(all_metadata: List[Dict], output_dir: str):
+def organize_by_authors(all_metadata: List[Dict], output_dir: str,
+                        index: Optional[CollectionIndex] = None,
+                        writer: Optional[OutputWriter] = None):
     """Organize TikToks by author."""
     author_dir = Path(output_dir) / "by_author"
-    author_dir.mkdir(exist_ok=True)
-    
-    # Group by author
-    author_videos = defaultdict(list)
+    index = index or build_index(all_metadata)
+    own_writer = writer is None
+    writer = writer or OutputWriter(output_dir)
     
-    for video in all_metadata:
-        author = video.get("author_name", "Unknown")
-        author_videos[author].append(video)
-    
-    # Save each author to a file
-    for author, videos in sorted(author_videos.items()):
+    # Render each author's file (the writer writes them all at once)
+    for author, videos in sorted(index.by_author.items()):
         safe_author = re.sub(r'[<>:"/\\|?*]', '_', author)
-        filename = author_dir / f"{safe_author}.txt"
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(f"# Videos by {author} ({len(videos)} total)\n\n")
-            for video in videos:
-                f.write(f"{video['url']}\n")
-                f.write(f"  {video['title']}\n\n")
-        
-    print(f"👤 Organized by {len(author_videos)} authors → {author_dir}")
+        f = io.StringIO()
+        f.write(f"# Videos by {author} ({len(videos)} total)\n\n")
+        for video in videos:
+            f.write(f"{video['url']}\n")
+            f.write(f"  {video['title']}\n\n")
+        writer.add(f"by_author/{safe_author}.txt", f.getvalue())
+    
+    if own_writer:
+        writer.close()
+    print(f"👤 Organized by {len(index.by_author)} authors → {author_dir}")
 
 
-def organize_by_hashtags(all_metadata: List[Dict], output_dir: str):
+def organize_by_hashtags(all_metadata: List[Dict], output_dir: str,
+                         index: Optional[CollectionIndex] = None,
+                         writer: Optional[OutputWriter] = None):
     """Organize TikToks by hashtags."""
     hashtag_dir = Path(output_dir) / "by_hashtag"
-    hashtag_dir.mkdir(exist_ok=True)
-    
-    # Group by hashtag
-    hashtag_videos = defaultdict(list)
-    
-    for video in all_metadata:
-        for hashtag in video.get("hashtags", []):
-            hashtag_videos[hashtag].append(video)
+    index = index or build_index(all_metadata)
+    own_writer = writer is None
+    writer = writer or OutputWriter(output_dir)
     
     # Save top hashtags (at least 2 videos)
-    popular_hashtags = {tag: videos for tag, videos in hashtag_videos.items() if len(videos) >= 2}
+    popular_hashtags = {tag: videos for tag, videos in index.by_hashtag.items() if len(videos) >= 2}
     
     for hashtag, videos in sorted(popular_hashtags.items(), key=lambda x: len(x[1]), reverse=True):
-        filename = hashtag_dir / f"#{hashtag}.txt"
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(f"# Hashtag: #{hashtag} ({len(videos)} videos)\n\n")
-            for video in videos:
-                f.write(f"{video['url']}\n")
-                f.write(f"  {video['title']}\n")
-                f.write(f"  by {video['author_name']}\n\n")
+        f = io.StringIO()
+        f.write(f"# Hashtag: #{hashtag} ({len(videos)} videos)\n\n")
+        for video in videos:
+            f.write(f"{video['url']}\n")
+            f.write(f"  {video['title']}\n")
+            f.write(f"  by {video['author_name']}\n\n")
+        writer.add(f"by_hashtag/#{hashtag}.txt", f.getvalue())
     
+    if own_writer:
+        writer.close()
     print(f"#️⃣ Found {len(popular_hashtags)} popular hashtags → {hashtag_dir}")
 
 
-def generate_summary_report(all_metadata: List[Dict], output_dir: str):
+def generate_summary_report(all_metadata: Iterable[Dict], output_dir: str,
+                            index: Optional[CollectionIndex] = None):
     """Generate a summary report."""
     report_file = Path(output_dir) / "summary_report.txt"
+    index = index or build_index(all_metadata, keep_videos=False)
     
     # Collect statistics
-    total_videos = len(all_metadata)
-    unique_authors = len(set(v.get("author_name", "Unknown") for v in all_metadata))
-    all_hashtags = set()
-    category_counts = defaultdict(int)
-    author_counts = defaultdict(int)
-    
-    for video in all_metadata:
-        all_hashtags.update(video.get("hashtags", []))
-        for category in video.get("categories", []):
-            category_counts[category] += 1
-        author_counts[video.get("author_name", "Unknown")] += 1
+    total_videos = index.total
+    unique_authors = len(index.author_counts)
+    all_hashtags = index.hashtags
     
     # Top authors
-    top_authors = sorted(author_counts.items(), key=lambda x: x[1], reverse=True)[:10]
+    top_authors = index.author_counts.most_common(10)
     
     # Write report
     with open(report_file, 'w', encoding='utf-8') as f:
@@ -230,7 +252,7 @@ def generate_summary_report(all_metadata: List[Dict], output_dir: str):
         f.write(f"  Unique Hashtags: {len(all_hashtags)}\n\n")
         
         f.write(f"📁 Categories:\n")
-        for category, count in sorted(category_counts.items(), key=lambda x: x[1], reverse=True):
+        for category, count in index.category_counts.most_common():
             percentage = (count / total_videos) * 100
             f.write(f"  {category}: {count} videos ({percentage:.1f}%)\n")
         
@@ -239,13 +261,26 @@ def generate_summary_report(all_metadata: List[Dict], output_dir: str):
             f.write(f"  {i}. {author}: {count} videos\n")
         
         f.write(f"\n#️⃣ Sample Hashtags ({min(20, len(all_hashtags))} of {len(all_hashtags)}):\n")
-        sample_hashtags = sorted(list(all_hashtags))[:20]
+        sample_hashtags = sorted(all_hashtags)[:20]
         f.write(f"  {', '.join(f'#{tag}' for tag in sample_hashtags)}\n")
     
     print(f"📄 Summary report → {report_file}")
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Fetch TikTok metadata and categorize videos by keywords.")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip videos already recorded in the checkpoint journal")
+    parser.add_argument("--checkpoint-every", type=int, default=CHECKPOINT_EVERY,
+                        help=f"flush the checkpoint journal every N videos (default: {CHECKPOINT_EVERY})")
+    parser.add_argument("--fetch-concurrency", type=int, default=FETCH_CONCURRENCY,
+                        help=f"parallel oEmbed fetches (default: {FETCH_CONCURRENCY})")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help=f"max videos categorized per batch (default: {BATCH_SIZE})")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default="files",
+                        help="write author/hashtag files as plain files, one zip, or one SQLite db (default: files)")
+    args = parser.parse_args()
+
     # Load TikTok links
     try:
         with open(INPUT_FILE, "r", encoding="utf-8") as f:
@@ -259,21 +294,35 @@ def main():
     print(f"🎬 Loaded {total} TikTok links")
     print(f"🔍 Fetching metadata and categorizing...\n")
 
-    # Fetch metadata for all videos
-    all_metadata = []
-    for i, link in enumerate(links, 1):
-        print(f"[{i}/{total}] Processing: {link[:50]}...")
-        metadata = fetch_tiktok_metadata(link)
-        
-        if metadata:
-            all_metadata.append(metadata)
-            print(f"  ✅ Title: {metadata['title'][:60]}...")
-            print(f"  👤 Author: {metadata['author_name']}")
-            print(f"  📁 Categories: {', '.join(metadata['categories'])}")
-        
-        # Rate limiting
-        time.sleep(0.5)
-        print()
+    # Fetch metadata for all videos, journaling each result so the run can be resumed
+    journal = CheckpointJournal(checkpoint_path(METADATA_FILE), args.checkpoint_every)
+    processed = journal.load() if args.resume else {}
+    if processed:
+        print(f"⏩ Resuming: {len(processed)} videos already processed\n")
+
+    results = {i: processed[journal_key(link)]
+               for i, link in enumerate(links) if journal_key(link) in processed}
+    pending = [i for i in range(total) if i not in results]
+
+    # Fetch and categorize concurrently: network fetches stream into batched categorization
+    fetch_stage = FetchStage((links[i] for i in pending), fetch_raw, args.fetch_concurrency)
+    with journal.open(resume=args.resume):
+        for n, (j, record, metadata) in enumerate(
+                categorize_stage(fetch_stage, categorize_records, args.batch_size), 1):
+            i = pending[j]
+            print(f"[{n}/{len(pending)}] Processing: {links[i][:50]}...")
+            
+            if metadata:
+                results[i] = metadata
+                journal.record(links[i], metadata)
+                print(f"  ✅ Title: {metadata['title'][:60]}...")
+                print(f"  👤 Author: {metadata['author_name']}")
+                print(f"  📁 Categories: {', '.join(metadata['categories'])}")
+            else:
+                print(describe_failure(record))
+            print()
+
+    all_metadata = [results[i] for i in sorted(results)]
 
     if not all_metadata:
         print("❌ No metadata could be fetched. Exiting.")
@@ -281,19 +330,28 @@ def main():
 
     print(f"\n{'='*60}")
     print(f"✅ Successfully fetched metadata for {len(all_metadata)}/{total} videos")
+    cache = get_cache()
+    if cache is not None:
+        print(f"🗄️  oEmbed cache: {cache.hits} hits, {cache.misses} misses")
+    if get_client().stats.requests:
+        print(f"🌐 oEmbed client: {get_client().summary()}")
+    print(f"🧠 Categorization memo: {get_keyword_memo().summary()}")
     print(f"{'='*60}\n")
 
     # Save metadata
     save_metadata(all_metadata, METADATA_FILE)
 
-    # Organize videos
+    # Organize videos (all groupings come from one pass over the metadata)
     print(f"\n📂 Organizing videos...\n")
-    organize_by_categories(all_metadata, OUTPUT_DIR)
-    organize_by_authors(all_metadata, OUTPUT_DIR)
-    organize_by_hashtags(all_metadata, OUTPUT_DIR)
+    index = build_index(all_metadata)
+    organize_by_categories(all_metadata, OUTPUT_DIR, index)
+    with OutputWriter(OUTPUT_DIR, args.output_format) as writer:
+        organize_by_authors(all_metadata, OUTPUT_DIR, index, writer)
+        organize_by_hashtags(all_metadata, OUTPUT_DIR, index, writer)
+    print(f"💾 Wrote {writer.written} files ({writer.unchanged} unchanged)")
     
     # Generate summary
-    generate_summary_report(all_metadata, OUTPUT_DIR)
+    generate_summary_report(all_metadata, OUTPUT_DIR, index)
 
     print(f"\n{'='*60}")
     print(f"✨ Done! Check the '{OUTPUT_DIR}' folder for organized videos.")
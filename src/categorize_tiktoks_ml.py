@@ -3,56 +3,55 @@ TikTok ML Categorizer - Advanced version using Machine Learning
 Uses NLP and semantic analysis for smarter categorization of TikTok videos
 """
 
-import requests
-import time
-import re
+import argparse
+import hashlib
+import io
 import json
+import re
+import string
 from collections import defaultdict, Counter
+from importlib.util import find_spec
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from urllib.parse import urlparse
 
-# Try to import ML libraries, provide helpful error messages if missing
-try:
-    from sklearn.feature_extraction.text import TfidfVectorizer
-    from sklearn.metrics.pairwise import cosine_similarity
-    import numpy as np
-    ML_AVAILABLE = True
-except ImportError:
-    ML_AVAILABLE = False
+from categorization_memo import CategorizationMemo
+from checkpoint import CHECKPOINT_EVERY, CheckpointJournal, checkpoint_path, journal_key
+from collection_index import CollectionIndex, build_index
+from keyword_matcher import KeywordMatcher
+from metadata_store import write_metadata
+from oembed_cache import get_cache
+from oembed_client import HEADERS, get_client, normalize_tiktok_url
+from output_writer import OUTPUT_FORMATS, OutputWriter
+from pipeline import (BATCH_SIZE, FETCH_CONCURRENCY, FetchStage, categorize_stage,
+                      describe_failure, fetch_raw_record)
+
+# ML libraries are only looked up here; they are imported on first use (see
+# load_ml_libraries / load_nltk), so importing this module stays fast and
+# runs that only use the keyword fallback or organize saved data never pay for them
+ML_AVAILABLE = find_spec("sklearn") is not None and find_spec("numpy") is not None
+if not ML_AVAILABLE:
     print("⚠️  ML libraries not installed. Install with:")
     print("   pip install scikit-learn numpy")
     print("   Falling back to keyword-based categorization\n")
 
-try:
-    import nltk
-    from nltk.corpus import stopwords
-    from nltk.tokenize import word_tokenize
-    # Try to download required NLTK data
-    try:
-        nltk.data.find('tokenizers/punkt')
-        nltk.data.find('corpora/stopwords')
-    except LookupError:
-        print("📥 Downloading NLTK data...")
-        nltk.download('punkt', quiet=True)
-        nltk.download('stopwords', quiet=True)
-    NLTK_AVAILABLE = True
-except ImportError:
-    NLTK_AVAILABLE = False
+NLTK_AVAILABLE = find_spec("nltk") is not None
+if not NLTK_AVAILABLE:
     print("⚠️  NLTK not installed. Install with: pip install nltk")
 
+# NLTK tokenizer/stopword data is read from here (and NLTK's usual locations), never downloaded.
+# To bundle it:  python -m nltk.downloader -d nltk_data punkt punkt_tab stopwords
+NLTK_DATA_DIR = Path(__file__).resolve().parent / "nltk_data"
+
+TfidfVectorizer = ENGLISH_STOP_WORDS = cosine_similarity = np = None   # Set by load_ml_libraries()
+stopwords = word_tokenize = None                  # Set by load_nltk()
+_nltk_ready = None
+
 INPUT_FILE = "tiktoks_cleaned.txt"
 OUTPUT_DIR = "categorized_tiktoks_ml"
-METADATA_FILE = "tiktok_metadata_ml.json"
-MODEL_FILE = "category_model.json"
-
-HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-        "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Safari/605.1.15"
-    ),
-    "Accept": "application/json",
-}
+METADATA_FILE = "tiktok_metadata_ml.json"  # Use a .db name to keep metadata in a SQLite store
+BATCH_MEMO = False  # Memoize categorize_batch results across batches; only pays off when many titles repeat
+MODEL_DIR = "category_model"  # Saved TF-IDF model: memory-mappable .npy arrays + meta.json
 
 # Enhanced category definitions with training examples
 CATEGORY_TRAINING_DATA = {
@@ -185,64 +184,160 @@ CATEGORY_TRAINING_DATA = {
 }
 
 
+def load_ml_libraries() -> bool:
+    """Import scikit-learn and NumPy on first use; returns ML_AVAILABLE."""
+    global TfidfVectorizer, ENGLISH_STOP_WORDS, cosine_similarity, np
+    if ML_AVAILABLE and np is None:
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS, TfidfVectorizer
+        from sklearn.metrics.pairwise import cosine_similarity
+        import numpy as np
+    return ML_AVAILABLE
+
+
+def load_nltk() -> bool:
+    """
+    Import NLTK on first use and check its tokenizer and stopword data are present
+    (in NLTK_DATA_DIR or NLTK's usual locations). Never downloads anything.
+    """
+    global stopwords, word_tokenize, _nltk_ready
+    if _nltk_ready is None:
+        _nltk_ready = False
+        if NLTK_AVAILABLE:
+            import nltk
+            from nltk.corpus import stopwords
+            from nltk.tokenize import word_tokenize
+            if str(NLTK_DATA_DIR) not in nltk.data.path:
+                nltk.data.path.insert(0, str(NLTK_DATA_DIR))
+            try:
+                stopwords.words('english')
+                word_tokenize("ok")
+                _nltk_ready = True
+            except LookupError:
+                print(f"⚠️  NLTK data not found; using basic preprocessing. To bundle it run:")
+                print(f"   python -m nltk.downloader -d {NLTK_DATA_DIR} punkt punkt_tab stopwords")
+    return _nltk_ready
+
+
+# _preprocess_text normalization (on ASCII bytes, non-ASCII already replaced by '?'):
+# @/# markers are deleted, everything else that isn't a-z/0-9 becomes a space
+_NORMALIZE_TABLE = bytes(c if chr(c) in string.ascii_lowercase + string.digits else ord(' ')
+                         for c in range(256))
+_NORMALIZE_DELETE = b'@#'
+# The only word_tokenize rules that can fire on normalized text
+_NLTK_CONTRACTIONS = {
+    'cannot': ('can', 'not'),
+    'gimme': ('gim', 'me'),
+    'gonna': ('gon', 'na'),
+    'gotta': ('got', 'ta'),
+    'lemme': ('lem', 'me'),
+    'wanna': ('wan', 'na'),
+}
+
+
+# 'http'/'www' and the rest of the word; only run when one of them occurs
+_URL_PATTERN = re.compile(r'(?:http|www)\S+')
+
+
+VECTORIZER_PARAMS = dict(
+    max_features=1000,
+    ngram_range=(1, 2),  # Use unigrams and bigrams
+    min_df=1,
+    max_df=0.95,
+    stop_words='english'
+)
+
+
+def training_data_hash() -> str:
+    """Fingerprint of everything a trained model depends on, to invalidate stale saved models."""
+    load_ml_libraries()
+    import sklearn
+    fingerprint = json.dumps([CATEGORY_TRAINING_DATA, VECTORIZER_PARAMS, sklearn.__version__],
+                             sort_keys=True, default=str)
+    return hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()
+
+
 class MLCategorizer:
     """Machine Learning-based categorizer using TF-IDF and cosine similarity."""
     
-    def __init__(self):
+    def __init__(self, batch_memo: Optional[bool] = None):
         self.vectorizer = None
         self.category_vectors = {}
+        self.category_matrix = None  # Stacked category vectors (categories x features)
         self.categories = list(CATEGORY_TRAINING_DATA.keys())
         self.stop_words = self._get_stop_words()
+        self._keyword_index = None  # Built on first keyword-fallback call
+        self.memo = CategorizationMemo()  # (method, preprocessed text, top_n, threshold) -> results
+        self.batch_memo = BATCH_MEMO if batch_memo is None else batch_memo
         
     def _get_stop_words(self):
         """Get stop words for text preprocessing."""
-        if NLTK_AVAILABLE:
+        if load_nltk():
             try:
                 return set(stopwords.words('english'))
             except:
                 pass
         # Fallback to basic stop words
-        return {'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+        return frozenset({'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
                 'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'been', 'be',
                 'have', 'has', 'had', 'do', 'does', 'did', 'will', 'would', 'could',
-                'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those'}
+                'should', 'may', 'might', 'must', 'can', 'this', 'that', 'these', 'those'})
     
-    def _preprocess_text(self, text: str) -> str:
-        """Clean and preprocess text."""
+    def _tokens(self, text: str) -> List[str]:
+        """
+        Clean text into tokens: lowercase, drop URLs and @/# markers, keep only
+        a-z/0-9 words, and (if NLTK data is available) split NLTK's contractions
+        and drop stop words and words of 1-2 letters.
+        """
         if not text:
-            return ""
+            return []
         
-        # Convert to lowercase
         text = text.lower()
         
-        # Remove URLs
-        text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
-        
-        # Remove mentions and hashtags markers (keep the words)
-        text = re.sub(r'[@#]', '', text)
+        # Remove URLs (from 'http'/'www' to the end of the word)
+        if 'http' in text or 'www' in text:
+            text = _URL_PATTERN.sub('', text)
         
-        # Keep only alphanumeric and spaces
-        text = re.sub(r'[^a-z0-9\s]', ' ', text)
+        tokens = (text.encode('ascii', 'replace')
+                  .translate(_NORMALIZE_TABLE, _NORMALIZE_DELETE)
+                  .decode('ascii').split())
         
-        # Remove extra whitespace
-        text = ' '.join(text.split())
-        
-        # Remove stop words if NLTK is available
-        if NLTK_AVAILABLE:
-            try:
-                tokens = word_tokenize(text)
-                text = ' '.join([w for w in tokens if w not in self.stop_words and len(w) > 2])
-            except:
-                pass
+        # word_tokenize on this text only ever splits a few contractions
+        if load_nltk():
+            stop_words = self.stop_words
+            tokens = [w for token in tokens for w in _NLTK_CONTRACTIONS.get(token, (token,))
+                      if len(w) > 2 and w not in stop_words]
         
-        return text
+        return tokens
+    
+    def _preprocess_text(self, text: str) -> str:
+        """Clean and preprocess text."""
+        return ' '.join(self._tokens(text))
     
-    def train(self):
-        """Train the categorizer on category examples."""
-        if not ML_AVAILABLE:
+    def _analyze(self, doc) -> List[str]:
+        """
+        Vectorizer analyzer for titles: the word unigrams and bigrams sklearn's
+        default analyzer would produce from _preprocess_text(doc). Also accepts
+        a token list from _tokens(), so titles are only tokenized once.
+        """
+        tokens = self._tokens(doc) if isinstance(doc, str) else doc
+        words = [w for w in tokens if len(w) > 1 and w not in ENGLISH_STOP_WORDS]
+        return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    
+    def train(self, model_dir: Optional[str] = MODEL_DIR, retrain: bool = False):
+        """
+        Train the categorizer on category examples.
+        If model_dir holds a model saved from the same training data it is loaded
+        (memory-mapped) instead, unless retrain is set; the freshly trained model
+        is saved there. Pass model_dir=None to train without saving.
+        """
+        if not load_ml_libraries():
             print("⚠️  ML not available, using keyword matching")
             return False
         
+        if model_dir and not retrain and self.load(model_dir):
+            print(f"📦 Loaded trained model from {model_dir}")
+            return True
+        
         print("🧠 Training ML categorizer...")
         
         # Prepare training data
@@ -251,13 +346,7 @@ class MLCategorizer:
             training_texts.extend(examples)
         
         # Create TF-IDF vectorizer
-        self.vectorizer = TfidfVectorizer(
-            max_features=1000,
-            ngram_range=(1, 2),  # Use unigrams and bigrams
-            min_df=1,
-            max_df=0.95,
-            stop_words='english'
-        )
+        self.vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
         
         # Fit vectorizer on all training data
         self.vectorizer.fit(training_texts)
@@ -269,7 +358,76 @@ class MLCategorizer:
             vector = self.vectorizer.transform([category_text])
             self.category_vectors[category] = vector
         
+        # Stack all category vectors into one sparse matrix for batch scoring
+        self.category_matrix = self.vectorizer.transform(
+            [' '.join(CATEGORY_TRAINING_DATA[category]) for category in self.categories]
+        )
+        
+        # Training examples go through sklearn's own analyzer; titles go through ours
+        self.vectorizer.analyzer = self._analyze
+        
         print("✅ Training complete!")
+        self.memo.validate(training_data_hash())
+        if model_dir:
+            self.save(model_dir)
+        return True
+    
+    def save(self, model_dir: str = MODEL_DIR):
+        """Save the fitted vocabulary, IDF weights and category matrix as .npy files."""
+        model_path = Path(model_dir)
+        model_path.mkdir(parents=True, exist_ok=True)
+        (model_path / "meta.json").unlink(missing_ok=True)  # Invalidate while the arrays are rewritten
+        vocabulary = sorted(self.vectorizer.vocabulary_, key=self.vectorizer.vocabulary_.get)
+        matrix = self.category_matrix.tocsr()
+        
+        np.save(model_path / "idf.npy", self.vectorizer.idf_)
+        np.save(model_path / "matrix_data.npy", matrix.data)
+        np.save(model_path / "matrix_indices.npy", matrix.indices)
+        np.save(model_path / "matrix_indptr.npy", matrix.indptr)
+        # meta.json goes last: a model only counts as saved once it is written
+        with open(model_path / "meta.json", 'w', encoding='utf-8') as f:
+            json.dump({
+                "training_hash": training_data_hash(),
+                "categories": self.categories,
+                "shape": list(matrix.shape),
+                "vocabulary": vocabulary,
+            }, f, ensure_ascii=False)
+    
+    def load(self, model_dir: str = MODEL_DIR, mmap: bool = True) -> bool:
+        """
+        Load a model saved by save(), memory-mapping its arrays so every process
+        that loads it shares the same pages. Returns False if there is no saved
+        model or it was trained on different data.
+        """
+        if not load_ml_libraries():
+            return False
+        model_path = Path(model_dir)
+        try:
+            with open(model_path / "meta.json", 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return False
+        if meta.get("training_hash") != training_data_hash() or meta.get("categories") != self.categories:
+            return False
+        
+        from scipy.sparse import csr_matrix
+        mmap_mode = 'r' if mmap else None
+        try:
+            idf = np.load(model_path / "idf.npy", mmap_mode=mmap_mode)
+            matrix = csr_matrix((np.load(model_path / "matrix_data.npy", mmap_mode=mmap_mode),
+                                 np.load(model_path / "matrix_indices.npy", mmap_mode=mmap_mode),
+                                 np.load(model_path / "matrix_indptr.npy", mmap_mode=mmap_mode)),
+                                shape=tuple(meta["shape"]))
+        except (FileNotFoundError, ValueError):
+            return False
+        
+        vocabulary = {term: i for i, term in enumerate(meta["vocabulary"])}
+        self.vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS, vocabulary=vocabulary)
+        self.vectorizer.analyzer = self._analyze
+        self.vectorizer.idf_ = idf
+        self.category_matrix = matrix
+        self.category_vectors = {category: matrix[i] for i, category in enumerate(self.categories)}
+        self.memo.validate(meta["training_hash"])
         return True
     
     def categorize(self, text: str, top_n: int = 3, threshold: float = 0.15) -> List[Tuple[str, float]]:
@@ -289,11 +447,16 @@ class MLCategorizer:
             return self._keyword_categorize(text, top_n)
         
         # Preprocess and vectorize input text
-        processed_text = self._preprocess_text(text)
-        if not processed_text:
+        tokens = self._tokens(text)
+        if not tokens:
             return [("Uncategorized", 0.0)]
         
-        text_vector = self.vectorizer.transform([processed_text])
+        key = ('categorize', ' '.join(tokens), top_n, threshold)
+        cached = self.memo.get(key)
+        if cached is not None:
+            return list(cached)
+        
+        text_vector = self.vectorizer.transform([tokens])
         
         # Calculate similarity with each category
         similarities = {}
@@ -305,27 +468,116 @@ class MLCategorizer:
         # Sort by similarity score
         sorted_categories = sorted(similarities.items(), key=lambda x: x[1], reverse=True)
         
-        if not sorted_categories:
-            return [("Uncategorized", 0.0)]
-        
-        return sorted_categories[:top_n]
+        result = sorted_categories[:top_n] or [("Uncategorized", 0.0)]
+        self.memo.put(key, result)
+        return list(result)
     
-    def _keyword_categorize(self, text: str, top_n: int = 3) -> List[Tuple[str, float]]:
-        """Fallback keyword-based categorization."""
-        text_lower = text.lower()
-        scores = {}
+    def categorize_batch(self, texts: List[str], top_n: int = 3,
+                         threshold: float = 0.15) -> List[List[Tuple[str, float]]]:
+        """
+        Categorize many texts at once.
         
+        All texts are vectorized in a single transform call and scored against
+        every category with one sparse matrix product. TF-IDF rows are
+        L2-normalized, so the dot product equals the cosine similarity used by
+        categorize(). Repeated texts within the batch are scored once; with
+        batch_memo set, results are also remembered across batches.
+        
+        Args:
+            texts: Texts to categorize
+            top_n: Number of top categories to return per text
+            threshold: Minimum similarity score to include category
+            
+        Returns:
+            One list of (category, confidence_score) tuples per input text
+        """
+        if not ML_AVAILABLE or not self.vectorizer:
+            return [self._keyword_categorize(text, top_n) for text in texts]
+        
+        if not texts:
+            return []
+        
+        # Only texts not seen before (in the memo or earlier in this batch) are scored
+        memo = self.memo if self.batch_memo else None
+        results = [None] * len(texts)
+        pending = {}  # key -> (tokens, rows waiting for it)
+        for i, text in enumerate(texts):
+            tokens = self._tokens(text)
+            key = ('categorize_batch', ' '.join(tokens), top_n, threshold)
+            if key in pending:
+                pending[key][1].append(i)
+                if memo is not None:
+                    memo.record_hit()
+                continue
+            cached = memo.get(key) if memo is not None else None
+            if cached is None:
+                pending[key] = (tokens, [i])
+            else:
+                results[i] = list(cached)
+        if not pending:
+            return results
+        
+        processed = [tokens for tokens, _ in pending.values()]
+        scores = (self.vectorizer.transform(processed) @ self.category_matrix.T).toarray()
+        
+        # Select the top_n categories per row without fully sorting every row
+        k = min(top_n, len(self.categories))
+        if k < len(self.categories):
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(k), scores.shape).copy()
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.lexsort((top, -top_scores), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        keep = top_scores >= threshold
+        
+        for i, (key, (tokens, rows)) in enumerate(pending.items()):
+            row = [(self.categories[j], float(score))
+                   for j, score, kept in zip(top[i], top_scores[i], keep[i]) if kept]
+            if not tokens or not row:
+                row = [("Uncategorized", 0.0)]
+            if memo is not None:
+                memo.put(key, row)
+            for r in rows:
+                results[r] = list(row)
+        
+        return results
+    
+    def _build_keyword_index(self):
+        """Compile the fallback keyword sets from CATEGORY_TRAINING_DATA once."""
+        category_keywords = {}
         for category, examples in CATEGORY_TRAINING_DATA.items():
-            # Extract keywords from examples
             keywords = set()
             for example in examples:
                 keywords.update(example.split())
-            
-            # Count matching keywords
-            matches = sum(1 for keyword in keywords if keyword in text_lower)
-            if matches > 0:
-                scores[category] = matches / len(keywords)
+            category_keywords[category] = sorted(keywords)
+        
+        keyword_categories = defaultdict(list)
+        for category, keywords in category_keywords.items():
+            for keyword in keywords:
+                keyword_categories[keyword.lower()].append(category)
         
+        self._keyword_index = (
+            KeywordMatcher(category_keywords),
+            dict(keyword_categories),
+            {category: len(keywords) for category, keywords in category_keywords.items()},
+        )
+    
+    def _keyword_categorize(self, text: str, top_n: int = 3) -> List[Tuple[str, float]]:
+        """Fallback keyword-based categorization."""
+        if self._keyword_index is None:
+            self._build_keyword_index()
+        matcher, keyword_categories, keyword_counts = self._keyword_index
+        
+        # One pass over the text finds every keyword; count distinct matches per category
+        matches = defaultdict(int)
+        for keyword in matcher.keywords_in(text.lower()):
+            for category in keyword_categories[keyword]:
+                matches[category] += 1
+        
+        scores = {category: matches[category] / count
+                  for category, count in keyword_counts.items() if category in matches}
         sorted_categories = sorted(scores.items(), key=lambda x: x[1], reverse=True)
         
         if not sorted_categories:
@@ -334,15 +586,6 @@ class MLCategorizer:
         return sorted_categories[:top_n]
 
 
-def normalize_tiktok_url(url: str) -> str:
-    """Convert tiktokv.com links to canonical tiktok.com format."""
-    match = re.search(r'/video/(\d+)', url)
-    if match:
-        video_id = match.group(1)
-        return f"https://www.tiktok.com/@_/video/{video_id}"
-    return url
-
-
 def extract_hashtags(text: str) -> Set[str]:
     """Extract hashtags from text."""
     if not text:
@@ -369,88 +612,94 @@ def extract_keywords(text: str, top_n: int = 5) -> List[str]:
     return [word for word, count in word_counts.most_common(top_n)]
 
 
-def fetch_tiktok_metadata(video_url: str, categorizer: MLCategorizer) -> Optional[Dict]:
-    """Fetch TikTok metadata via oEmbed API and categorize using ML."""
-    try:
-        normalized = normalize_tiktok_url(video_url)
-        r = requests.get(
-            "https://www.tiktok.com/oembed",
-            params={"url": normalized},
-            headers=HEADERS,
-            timeout=10,
-        )
+def fetch_raw(video_url: str) -> Dict:
+    """Fetch the raw oEmbed record for a video (network stage only)."""
+    return fetch_raw_record(video_url, normalize_tiktok_url(video_url), HEADERS)
+
+
+def categorization_text(data: Dict) -> str:
+    """Text the ML categorizer sees for a video."""
+    return f"{data.get('title', '')} {data.get('author_name', '')}"
+
+
+def build_metadata(record: Dict, category_results: List[Tuple[str, float]]) -> Dict:
+    """Turn a raw oEmbed record plus its ML categories into video metadata."""
+    data = record["data"]
+    
+    # Extract metadata
+    title = data.get("title", "")
+    author = data.get("author_name", "")
+    
+    metadata = {
+        "url": record["url"],
+        "normalized_url": record["normalized_url"],
+        "title": title,
+        "author_name": author,
+        "author_url": data.get("author_url", ""),
+        "thumbnail_url": data.get("thumbnail_url", ""),
+        "provider_name": data.get("provider_name", ""),
+    }
+    
+    # Extract hashtags
+    metadata["hashtags"] = list(extract_hashtags(title))
+    
+    # Extract keywords
+    metadata["keywords"] = extract_keywords(title)
+    
+    # Store categories with confidence scores
+    metadata["categories"] = []
+    metadata["category_scores"] = {}
+    
+    for category, score in category_results:
+        metadata["categories"].append(category)
+        metadata["category_scores"][category] = float(score)
+    
+    # Primary category is the one with highest confidence
+    metadata["primary_category"] = category_results[0][0] if category_results else "Uncategorized"
+    metadata["confidence"] = float(category_results[0][1]) if category_results else 0.0
+    
+    return metadata
 
-        if r.status_code == 200:
-            data = r.json()
-            
-            # Extract metadata
-            title = data.get("title", "")
-            author = data.get("author_name", "")
-            
-            metadata = {
-                "url": video_url,
-                "normalized_url": normalized,
-                "title": title,
-                "author_name": author,
-                "author_url": data.get("author_url", ""),
-                "thumbnail_url": data.get("thumbnail_url", ""),
-                "provider_name": data.get("provider_name", ""),
-            }
-            
-            # Extract hashtags
-            metadata["hashtags"] = list(extract_hashtags(title))
-            
-            # Extract keywords
-            metadata["keywords"] = extract_keywords(title)
-            
-            # ML-based categorization
-            text_to_categorize = f"{title} {author}"
-            category_results = categorizer.categorize(text_to_categorize, top_n=3, threshold=0.1)
-            
-            # Store categories with confidence scores
-            metadata["categories"] = []
-            metadata["category_scores"] = {}
-            
-            for category, score in category_results:
-                metadata["categories"].append(category)
-                metadata["category_scores"][category] = float(score)
-            
-            # Primary category is the one with highest confidence
-            metadata["primary_category"] = category_results[0][0] if category_results else "Uncategorized"
-            metadata["confidence"] = float(category_results[0][1]) if category_results else 0.0
-            
-            return metadata
-        else:
-            print(f"❌ Failed to fetch: {video_url} (Status: {r.status_code})")
-            return None
 
-    except Exception as e:
-        print(f"❌ Error fetching {video_url}: {e}")
+def categorize_records(records: List[Dict], categorizer: MLCategorizer) -> List[Optional[Dict]]:
+    """Categorize stage: score a batch of raw records with one categorize_batch call."""
+    ok = [record["status_code"] == 200 and record["data"] is not None for record in records]
+    category_results = iter(categorizer.categorize_batch(
+        [categorization_text(record["data"]) for record, fetched in zip(records, ok) if fetched],
+        top_n=3, threshold=0.1,
+    ))
+    return [build_metadata(record, next(category_results)) if fetched else None
+            for record, fetched in zip(records, ok)]
+
+
+def fetch_tiktok_metadata(video_url: str, categorizer: MLCategorizer) -> Optional[Dict]:
+    """Fetch TikTok metadata via oEmbed API and categorize using ML."""
+    record = fetch_raw(video_url)
+    if record["status_code"] != 200 or record["data"] is None:
+        print(describe_failure(record))
         return None
+    
+    # ML-based categorization
+    category_results = categorizer.categorize(categorization_text(record["data"]), top_n=3, threshold=0.1)
+    return build_metadata(record, category_results)
 
 
 def save_metadata(all_metadata: List[Dict], filename: str):
-    """Save all metadata to JSON file."""
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(all_metadata, f, indent=2, ensure_ascii=False)
+    """Save all metadata to a JSON file, or upsert it into a SQLite store (.db)."""
+    write_metadata(all_metadata, filename)
     print(f"💾 Saved metadata to {filename}")
 
 
-def organize_by_categories(all_metadata: List[Dict], output_dir: str):
+def organize_by_categories(all_metadata: List[Dict], output_dir: str,
+                           index: Optional[CollectionIndex] = None):
     """Organize TikToks into category files with ML confidence scores."""
     Path(output_dir).mkdir(exist_ok=True)
-    
-    # Group by primary category
-    category_videos = defaultdict(list)
-    
-    for video in all_metadata:
-        primary = video.get("primary_category", "Uncategorized")
-        category_videos[primary].append(video)
+    index = index or build_index(all_metadata)
     
     # Save each category to a file
-    for category, videos in sorted(category_videos.items()):
+    for category, videos in sorted(index.by_primary_category.items()):
         # Sort by confidence score
-        videos.sort(key=lambda x: x.get("confidence", 0), reverse=True)
+        videos = sorted(videos, key=lambda x: x.get("confidence", 0), reverse=True)
         
         filename = Path(output_dir) / f"{category.lower().replace(' ', '_').replace('&', 'and')}.txt"
         with open(filename, 'w', encoding='utf-8') as f:
@@ -476,122 +725,110 @@ def organize_by_categories(all_metadata: List[Dict], output_dir: str):
                     f.write(f"  Hashtags: {', '.join(video['hashtags'])}\n")
                 f.write("\n")
         
-        avg_confidence = sum(v.get("confidence", 0) for v in videos) / len(videos)
+        avg_confidence = index.primary_confidence_sums[category] / len(videos)
         print(f"📁 {category}: {len(videos)} videos (avg confidence: {avg_confidence:.2%}) → {filename}")
 
 
-def organize_by_authors(all_metadata: List[Dict], output_dir: str):
+def organize_by_authors(all_metadata: List[Dict], output_dir: str,
+                        index: Optional[CollectionIndex] = None,
+                        writer: Optional[OutputWriter] = None):
     """Organize TikToks by author with category distribution."""
     author_dir = Path(output_dir) / "by_author"
-    author_dir.mkdir(exist_ok=True)
-    
-    # Group by author
-    author_videos = defaultdict(list)
+    index = index or build_index(all_metadata)
+    own_writer = writer is None
+    writer = writer or OutputWriter(output_dir)
     
-    for video in all_metadata:
-        author = video.get("author_name", "Unknown")
-        author_videos[author].append(video)
-    
-    # Save each author to a file (only authors with 2+ videos)
+    # Render each author's file (only authors with 2+ videos)
     saved_count = 0
-    for author, videos in sorted(author_videos.items()):
+    for author, videos in sorted(index.by_author.items()):
         if len(videos) < 2:
             continue
             
         safe_author = re.sub(r'[<>:"/\\|?*]', '_', author)
-        filename = author_dir / f"{safe_author}.txt"
-        
-        # Count category distribution
-        category_counts = Counter(v.get("primary_category", "Uncategorized") for v in videos)
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(f"# Videos by {author} ({len(videos)} total)\n\n")
-            f.write(f"Category distribution:\n")
-            for cat, count in category_counts.most_common():
-                f.write(f"  - {cat}: {count} videos\n")
-            f.write("\n" + "="*60 + "\n\n")
-            
-            for video in videos:
-                f.write(f"{video['url']}\n")
-                f.write(f"  {video['title']}\n")
-                f.write(f"  Category: {video.get('primary_category', 'Uncategorized')} ({video.get('confidence', 0):.2%})\n\n")
         
+        # Category distribution
+        category_counts = index.author_primary_counts[author]
+        
+        f = io.StringIO()
+        f.write(f"# Videos by {author} ({len(videos)} total)\n\n")
+        f.write(f"Category distribution:\n")
+        for cat, count in category_counts.most_common():
+            f.write(f"  - {cat}: {count} videos\n")
+        f.write("\n" + "="*60 + "\n\n")
+        
+        for video in videos:
+            f.write(f"{video['url']}\n")
+            f.write(f"  {video['title']}\n")
+            f.write(f"  Category: {video.get('primary_category', 'Uncategorized')} ({video.get('confidence', 0):.2%})\n\n")
+        writer.add(f"by_author/{safe_author}.txt", f.getvalue())
         saved_count += 1
     
+    if own_writer:
+        writer.close()
     print(f"👤 Organized {saved_count} authors (with 2+ videos) → {author_dir}")
 
 
-def organize_by_hashtags(all_metadata: List[Dict], output_dir: str, min_videos: int = 3):
+def organize_by_hashtags(all_metadata: List[Dict], output_dir: str, min_videos: int = 3,
+                         index: Optional[CollectionIndex] = None,
+                         writer: Optional[OutputWriter] = None):
     """Organize TikToks by hashtags with ML category insights."""
     hashtag_dir = Path(output_dir) / "by_hashtag"
-    hashtag_dir.mkdir(exist_ok=True)
-    
-    # Group by hashtag
-    hashtag_videos = defaultdict(list)
-    
-    for video in all_metadata:
-        for hashtag in video.get("hashtags", []):
-            hashtag_videos[hashtag].append(video)
+    index = index or build_index(all_metadata)
+    own_writer = writer is None
+    writer = writer or OutputWriter(output_dir)
     
     # Save popular hashtags
-    popular_hashtags = {tag: videos for tag, videos in hashtag_videos.items() if len(videos) >= min_videos}
+    popular_hashtags = {tag: videos for tag, videos in index.by_hashtag.items() if len(videos) >= min_videos}
     
     for hashtag, videos in sorted(popular_hashtags.items(), key=lambda x: len(x[1]), reverse=True):
         # Category distribution for this hashtag
-        category_counts = Counter(v.get("primary_category", "Uncategorized") for v in videos)
+        category_counts = index.hashtag_primary_counts[hashtag]
         top_category = category_counts.most_common(1)[0][0] if category_counts else "Mixed"
         
-        filename = hashtag_dir / f"#{hashtag}.txt"
-        with open(filename, 'w', encoding='utf-8') as f:
-            f.write(f"# Hashtag: #{hashtag} ({len(videos)} videos)\n")
-            f.write(f"# Primary category: {top_category}\n\n")
-            
-            f.write(f"Category distribution:\n")
-            for cat, count in category_counts.most_common():
-                percentage = (count / len(videos)) * 100
-                f.write(f"  - {cat}: {count} videos ({percentage:.1f}%)\n")
-            f.write("\n" + "="*60 + "\n\n")
-            
-            for video in videos:
-                f.write(f"{video['url']}\n")
-                f.write(f"  {video['title']}\n")
-                f.write(f"  by {video['author_name']}\n")
-                f.write(f"  Category: {video.get('primary_category', 'Uncategorized')}\n\n")
-    
+        f = io.StringIO()
+        f.write(f"# Hashtag: #{hashtag} ({len(videos)} videos)\n")
+        f.write(f"# Primary category: {top_category}\n\n")
+        
+        f.write(f"Category distribution:\n")
+        for cat, count in category_counts.most_common():
+            percentage = (count / len(videos)) * 100
+            f.write(f"  - {cat}: {count} videos ({percentage:.1f}%)\n")
+        f.write("\n" + "="*60 + "\n\n")
+        
+        for video in videos:
+            f.write(f"{video['url']}\n")
+            f.write(f"  {video['title']}\n")
+            f.write(f"  by {video['author_name']}\n")
+            f.write(f"  Category: {video.get('primary_category', 'Uncategorized')}\n\n")
+        writer.add(f"by_hashtag/#{hashtag}.txt", f.getvalue())
+    
+    if own_writer:
+        writer.close()
     print(f"#️⃣ Found {len(popular_hashtags)} popular hashtags (≥{min_videos} videos) → {hashtag_dir}")
 
 
-def generate_ml_report(all_metadata: List[Dict], output_dir: str, categorizer: MLCategorizer):
+def generate_ml_report(all_metadata: Iterable[Dict], output_dir: str, categorizer: MLCategorizer,
+                       index: Optional[CollectionIndex] = None):
     """Generate detailed ML analysis report."""
     report_file = Path(output_dir) / "ml_analysis_report.txt"
+    index = index or build_index(all_metadata, keep_videos=False)
     
     # Collect statistics
-    total_videos = len(all_metadata)
-    unique_authors = len(set(v.get("author_name", "Unknown") for v in all_metadata))
-    all_hashtags = set()
-    category_counts = Counter()
-    confidence_scores = []
-    
-    for video in all_metadata:
-        all_hashtags.update(video.get("hashtags", []))
-        primary_cat = video.get("primary_category", "Uncategorized")
-        category_counts[primary_cat] += 1
-        confidence_scores.append(video.get("confidence", 0))
-    
-    avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0
-    high_confidence = sum(1 for s in confidence_scores if s >= 0.3)
-    medium_confidence = sum(1 for s in confidence_scores if 0.15 <= s < 0.3)
-    low_confidence = sum(1 for s in confidence_scores if s < 0.15)
+    total_videos = index.total
+    unique_authors = len(index.author_counts)
+    all_hashtags = index.hashtags
+    category_counts = index.primary_category_counts
+    
+    avg_confidence = index.average_confidence
+    high_confidence = index.confidence_histogram["high"]
+    medium_confidence = index.confidence_histogram["medium"]
+    low_confidence = index.confidence_histogram["low"]
     
     # Top authors by video count
-    author_counts = Counter(v.get("author_name", "Unknown") for v in all_metadata)
-    top_authors = author_counts.most_common(10)
+    top_authors = index.author_counts.most_common(10)
     
     # Most common keywords
-    all_keywords = []
-    for video in all_metadata:
-        all_keywords.extend(video.get("keywords", []))
-    common_keywords = Counter(all_keywords).most_common(20)
+    common_keywords = index.keyword_counts.most_common(20)
     
     # Write report
     with open(report_file, 'w', encoding='utf-8') as f:
@@ -618,17 +855,14 @@ def generate_ml_report(all_metadata: List[Dict], output_dir: str, categorizer: M
         f.write(f"📁 CATEGORY DISTRIBUTION:\n")
         for category, count in category_counts.most_common():
             percentage = (count / total_videos) * 100
-            # Calculate average confidence for this category
-            cat_videos = [v for v in all_metadata if v.get("primary_category") == category]
-            cat_avg_conf = sum(v.get("confidence", 0) for v in cat_videos) / len(cat_videos)
+            cat_avg_conf = index.primary_confidence_sums[category] / count
             
             f.write(f"  {category:.<40} {count:>4} videos ({percentage:>5.1f}%) | Avg Conf: {cat_avg_conf:.2%}\n")
         
         f.write(f"\n👤 TOP 10 AUTHORS:\n")
         for i, (author, count) in enumerate(top_authors, 1):
-            # Find most common category for this author
-            author_videos = [v for v in all_metadata if v.get("author_name") == author]
-            author_categories = Counter(v.get("primary_category") for v in author_videos)
+            # Most common category for this author
+            author_categories = index.author_primary_counts[author]
             top_cat = author_categories.most_common(1)[0][0] if author_categories else "Mixed"
             
             f.write(f"  {i:>2}. {author:<30} {count:>3} videos (mainly {top_cat})\n")
@@ -672,14 +906,31 @@ def generate_ml_report(all_metadata: List[Dict], output_dir: str, categorizer: M
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Fetch TikTok metadata and categorize videos with ML.")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip videos already recorded in the checkpoint journal")
+    parser.add_argument("--checkpoint-every", type=int, default=CHECKPOINT_EVERY,
+                        help=f"flush the checkpoint journal every N videos (default: {CHECKPOINT_EVERY})")
+    parser.add_argument("--fetch-concurrency", type=int, default=FETCH_CONCURRENCY,
+                        help=f"parallel oEmbed fetches (default: {FETCH_CONCURRENCY})")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help=f"max videos categorized per batch (default: {BATCH_SIZE})")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default="files",
+                        help="write author/hashtag files as plain files, one zip, or one SQLite db (default: files)")
+    parser.add_argument("--retrain", action="store_true",
+                        help=f"ignore the saved model in {MODEL_DIR}/ and train a fresh one")
+    parser.add_argument("--memo", action="store_true",
+                        help="remember results across batches; only worth it when many titles repeat")
+    args = parser.parse_args()
+
     print("=" * 70)
     print("🤖 TikTok ML Categorizer")
     print("=" * 70)
     print()
     
     # Initialize ML categorizer
-    categorizer = MLCategorizer()
-    ml_success = categorizer.train()
+    categorizer = MLCategorizer(batch_memo=args.memo or None)
+    ml_success = categorizer.train(retrain=args.retrain)
     
     if not ml_success:
         print("⚠️  Using keyword-based fallback categorization")
@@ -699,23 +950,38 @@ def main():
     print(f"🎬 Loaded {total} TikTok links")
     print(f"🔍 Analyzing with ML categorization...\n")
 
-    # Fetch metadata for all videos
-    all_metadata = []
-    for i, link in enumerate(links, 1):
-        print(f"[{i}/{total}] Processing: {link[:55]}...")
-        metadata = fetch_tiktok_metadata(link, categorizer)
-        
-        if metadata:
-            all_metadata.append(metadata)
-            categories_str = " | ".join([f"{cat} ({metadata['category_scores'].get(cat, 0):.2%})" 
-                                        for cat in metadata['categories'][:2]])
-            print(f"  ✅ {metadata['title'][:50]}...")
-            print(f"  👤 {metadata['author_name']}")
-            print(f"  🎯 {categories_str}")
-        
-        # Rate limiting
-        time.sleep(0.5)
-        print()
+    # Fetch metadata for all videos, journaling each result so the run can be resumed
+    journal = CheckpointJournal(checkpoint_path(METADATA_FILE), args.checkpoint_every)
+    processed = journal.load() if args.resume else {}
+    if processed:
+        print(f"⏩ Resuming: {len(processed)} videos already processed\n")
+
+    results = {i: processed[journal_key(link)]
+               for i, link in enumerate(links) if journal_key(link) in processed}
+    pending = [i for i in range(total) if i not in results]
+
+    # Fetch and categorize concurrently: network fetches stream into batched ML scoring
+    fetch_stage = FetchStage((links[i] for i in pending), fetch_raw, args.fetch_concurrency)
+    stage = categorize_stage(fetch_stage, lambda records: categorize_records(records, categorizer),
+                             args.batch_size)
+    with journal.open(resume=args.resume):
+        for n, (j, record, metadata) in enumerate(stage, 1):
+            i = pending[j]
+            print(f"[{n}/{len(pending)}] Processing: {links[i][:55]}...")
+            
+            if metadata:
+                results[i] = metadata
+                journal.record(links[i], metadata)
+                categories_str = " | ".join([f"{cat} ({metadata['category_scores'].get(cat, 0):.2%})" 
+                                            for cat in metadata['categories'][:2]])
+                print(f"  ✅ {metadata['title'][:50]}...")
+                print(f"  👤 {metadata['author_name']}")
+                print(f"  🎯 {categories_str}")
+            else:
+                print(describe_failure(record))
+            print()
+
+    all_metadata = [results[i] for i in sorted(results)]
 
     if not all_metadata:
         print("❌ No metadata could be fetched. Exiting.")
@@ -723,6 +989,13 @@ def main():
 
     print(f"\n{'='*70}")
     print(f"✅ Successfully analyzed {len(all_metadata)}/{total} videos")
+    cache = get_cache()
+    if cache is not None:
+        print(f"🗄️  oEmbed cache: {cache.hits} hits, {cache.misses} misses")
+    if get_client().stats.requests:
+        print(f"🌐 oEmbed client: {get_client().summary()}")
+    if ml_success and categorizer.memo.lookups:
+        print(f"🧠 Categorization memo: {categorizer.memo.summary()}")
     print(f"{'='*70}\n")
 
     # Save metadata
@@ -730,12 +1003,15 @@ def main():
 
     # Organize videos
     print(f"\n📂 Organizing videos...\n")
-    organize_by_categories(all_metadata, OUTPUT_DIR)
-    organize_by_authors(all_metadata, OUTPUT_DIR)
-    organize_by_hashtags(all_metadata, OUTPUT_DIR)
+    index = build_index(all_metadata)
+    organize_by_categories(all_metadata, OUTPUT_DIR, index)
+    with OutputWriter(OUTPUT_DIR, args.output_format) as writer:
+        organize_by_authors(all_metadata, OUTPUT_DIR, index, writer)
+        organize_by_hashtags(all_metadata, OUTPUT_DIR, index=index, writer=writer)
+    print(f"💾 Wrote {writer.written} files ({writer.unchanged} unchanged)")
     
     # Generate ML analysis report
-    generate_ml_report(all_metadata, OUTPUT_DIR, categorizer)
+    generate_ml_report(all_metadata, OUTPUT_DIR, categorizer, index)
 
     print(f"\n{'='*70}")
     print(f"✨ Done! Check the '{OUTPUT_DIR}' folder for ML-categorized videos.")
@@ -1,33 +1,13 @@
-import webbrowser
+import sys
+from pathlib import Path
 
-# --- CONFIGURATION ---
-BATCH_SIZE = 10
-LINKS_FILE = "fashion_formatted.txt"
-# ----------------------
-
-def open_links_in_batches(file_path):
-    # Read all links from the file (bottom to top)
-    with open(file_path, 'r', encoding='utf-8') as f:
-        links = [line.strip() for line in f if line.strip()][::-1]
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
-    total = len(links)
-    print(f"Loaded {total} TikTok links (reading from bottom to top).\n")
+import open_tiktoks
 
-    # Process in batches
-    for i in range(0, total, BATCH_SIZE):
-        batch = links[i:i + BATCH_SIZE]
-        batch_num = i // BATCH_SIZE + 1
-        print(f"\nOpening batch {batch_num}:")
-        for link in batch:
-            print(f"  - {link}")
-            webbrowser.open_new_tab(link)
-
-        remaining = total - (i + BATCH_SIZE)
-        if remaining > 0:
-            print(f"\n{remaining} links remaining.")
-            input("Press Enter to open the next batch...")
-        else:
-            print("\nAll links have been opened!")
+# --- CONFIGURATION ---
+open_tiktoks.LINKS_FILE = "fashion_formatted.txt"
+# ----------------------
 
 if __name__ == "__main__":
-    open_links_in_batches(LINKS_FILE)
+    open_tiktoks.main()
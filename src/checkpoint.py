@@ -0,0 +1,106 @@
+"""
+Append-only JSONL checkpoint journal for long categorization runs.
+Every fetched video is written as one line, so an interrupted run can be
+resumed and a rerun on a grown input file only processes the new links.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Dict
+
+from oembed_cache import extract_video_id
+
+CHECKPOINT_EVERY = 50  # Flush the journal to disk every N records
+
+
+def journal_key(video_url: str) -> str:
+    """Key journal entries by video ID so link variants of the same video match."""
+    return extract_video_id(video_url) or video_url
+
+
+class CheckpointJournal:
+    """
+    JSONL journal of processed videos, one {"key": ..., "metadata": ...} object per line.
+
+    Only successful fetches are journaled; failed links are retried on resume
+    (definitive failures are served from the oEmbed cache, so this is cheap).
+    """
+
+    def __init__(self, path: str, flush_every: int = CHECKPOINT_EVERY):
+        self.path = Path(path)
+        self.flush_every = max(1, flush_every)
+        self._file = None
+        self._pending = 0
+
+    def load(self) -> Dict[str, Dict]:
+        """Read all journaled records; a torn last line from a crash is ignored."""
+        records = {}
+        if not self.path.exists():
+            return records
+        with open(self.path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                records[entry["key"]] = entry["metadata"]
+        return records
+
+    def open(self, resume: bool = False):
+        """Open the journal for appending; without `resume` any previous journal is discarded."""
+        if resume:
+            self._drop_torn_tail()
+        self._file = open(self.path, 'a' if resume else 'w', encoding='utf-8')
+        return self
+
+    def _drop_torn_tail(self, block_size: int = 4096):
+        """Cut a partial last line left by a crash, so new records don't get appended onto it."""
+        if not self.path.exists():
+            return
+        with open(self.path, 'rb+') as f:
+            end = f.seek(0, os.SEEK_END)
+            pos = end
+            while pos > 0:
+                start = max(0, pos - block_size)
+                f.seek(start)
+                newline = f.read(pos - start).rfind(b"\n")
+                if newline != -1:
+                    keep = start + newline + 1
+                    break
+                pos = start
+            else:
+                keep = 0
+            if keep < end:
+                f.truncate(keep)
+
+    def record(self, video_url: str, metadata: Dict):
+        self._file.write(json.dumps({"key": journal_key(video_url), "metadata": metadata},
+                                    ensure_ascii=False) + "\n")
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        if self._file and self._pending:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._pending = 0
+
+    def close(self):
+        if self._file:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def checkpoint_path(metadata_file: str) -> str:
+    """Journal file that sits next to a metadata file, e.g. tiktok_metadata.checkpoint.jsonl."""
+    path = Path(metadata_file)
+    return str(path.with_name(f"{path.stem}.checkpoint.jsonl"))
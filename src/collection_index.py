@@ -0,0 +1,96 @@
+"""
+Single-pass aggregation over video metadata.
+Builds every grouping and counter the organize_by_* writers and the reports need
+in one traversal, so they read from indexes instead of rescanning the collection.
+"""
+
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List
+
+HIGH_CONFIDENCE = 0.3
+MEDIUM_CONFIDENCE = 0.15
+
+
+class CollectionIndex:
+    """
+    Group indexes and statistics for a collection of video metadata.
+
+    With keep_videos=False only the counters are kept (the by_* groupings stay
+    empty), so a report can aggregate a streamed collection without holding it.
+    """
+
+    def __init__(self, keep_videos: bool = True):
+        self.total = 0
+        self.keep_videos = keep_videos
+
+        # Groupings (videos kept in collection order)
+        self.by_category: Dict[str, List[Dict]] = defaultdict(list)          # every category of a video
+        self.by_primary_category: Dict[str, List[Dict]] = defaultdict(list)  # ML primary category
+        self.by_author: Dict[str, List[Dict]] = defaultdict(list)
+        self.by_hashtag: Dict[str, List[Dict]] = defaultdict(list)
+
+        # Counters
+        self.author_counts = Counter()            # videos per author, in first-seen order
+        self.hashtag_counts = Counter()           # videos per hashtag, in first-seen order
+        self.category_counts = Counter()          # videos per category (keyword categorizer)
+        self.primary_category_counts = Counter()  # videos per primary category (ML categorizer)
+        self.primary_confidence_sums = defaultdict(float)
+        self.author_primary_counts: Dict[str, Counter] = defaultdict(Counter)
+        self.hashtag_primary_counts: Dict[str, Counter] = defaultdict(Counter)
+        self.keyword_counts = Counter()
+
+        # Confidence histogram (ML categorizer)
+        self.confidence_sum = 0.0
+        self.confidence_histogram = {"high": 0, "medium": 0, "low": 0}
+
+    def add(self, video: Dict):
+        """Fold one video into every index."""
+        self.total += 1
+
+        author = video.get("author_name", "Unknown")
+        primary = video.get("primary_category", "Uncategorized")
+        confidence = video.get("confidence", 0)
+
+        if self.keep_videos:
+            self.by_author[author].append(video)
+            self.by_primary_category[primary].append(video)
+            for category in video.get("categories", ["Uncategorized"]):
+                self.by_category[category].append(video)
+            for hashtag in video.get("hashtags", []):
+                self.by_hashtag[hashtag].append(video)
+
+        self.author_counts[author] += 1
+        for category in video.get("categories", []):
+            self.category_counts[category] += 1
+        for hashtag in video.get("hashtags", []):
+            self.hashtag_counts[hashtag] += 1
+            self.hashtag_primary_counts[hashtag][primary] += 1
+
+        self.primary_category_counts[primary] += 1
+        self.primary_confidence_sums[primary] += confidence
+        self.author_primary_counts[author][primary] += 1
+        self.keyword_counts.update(video.get("keywords", []))
+
+        self.confidence_sum += confidence
+        if confidence >= HIGH_CONFIDENCE:
+            self.confidence_histogram["high"] += 1
+        elif confidence >= MEDIUM_CONFIDENCE:
+            self.confidence_histogram["medium"] += 1
+        else:
+            self.confidence_histogram["low"] += 1
+
+    @property
+    def hashtags(self) -> List[str]:
+        return list(self.hashtag_counts)
+
+    @property
+    def average_confidence(self) -> float:
+        return self.confidence_sum / self.total if self.total else 0
+
+
+def build_index(all_metadata: Iterable[Dict], keep_videos: bool = True) -> CollectionIndex:
+    """Index a collection (any iterable, including a streamed one) in a single pass."""
+    index = CollectionIndex(keep_videos)
+    for video in all_metadata:
+        index.add(video)
+    return index
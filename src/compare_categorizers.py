@@ -1,97 +1,376 @@
 #!/usr/bin/env python3
 """
 Quick comparison script to show the difference between keyword and ML categorization
+
+The keyword results are indexed by video ID in a compact hash table, and the ML
+results are streamed past it (a hash join), so every video in both files is
+compared while memory stays bounded by the size of the keyword index.
 """
 
+import argparse
 import json
+from array import array
+from collections import Counter, deque
+from multiprocessing import Pool
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from metadata_store import is_jsonl_path, iter_metadata
+from oembed_cache import extract_video_id
+
+# ML category -> the keyword category it corresponds to (ML-only categories have none)
+CATEGORY_ALIASES = {
+    "Cooking & Food": "Cooking",
+    "Fitness & Health": "Fitness",
+    "Comedy & Entertainment": "Comedy",
+    "DIY & Crafts": "DIY",
+    "Beauty & Skincare": "Beauty",
+    "Dance & Performance": "Dance",
+    "Music & Audio": "Music",
+    "Travel & Adventure": "Travel",
+    "Fashion & Style": "Fashion",
+    "Technology & Gadgets": "Tech",
+    "Pets & Animals": "Pets",
+    "Education & Learning": "Education",
+    "Gaming & Esports": "Gaming",
+}
+SAMPLE_SIZE = 20              # Videos shown side by side before the summary
+CHUNK_SIZE = 20_000           # ML records per worker task with --workers
+DISAGREEMENTS_FILE = "category_disagreements.jsonl"
+
+
+class VideoIdMap:
+    """Open-addressing hash map from 64-bit video ID to a small int (~12-24 bytes per entry)."""
+
+    MAX_ID = (1 << 64) - 1
+
+    def __init__(self, capacity=1 << 16):
+        self._bits = max(4, (capacity * 2 - 1).bit_length())
+        self._keys = array('Q', bytes(8 << self._bits))
+        self._values = array('I', bytes(4 << self._bits))
+        self._size = 0
+        self._zero = None    # Value for video ID 0, which can't live in the table
+
+    def __len__(self):
+        return self._size + (self._zero is not None)
+
+    @classmethod
+    def fits(cls, video_id):
+        return 0 <= video_id <= cls.MAX_ID
+
+    def _index(self, video_id):
+        return ((video_id * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> (64 - self._bits)
+
+    def __setitem__(self, video_id, value):
+        if not self.fits(video_id):
+            raise ValueError(f"video ID {video_id} doesn't fit in 64 bits")
+        if not video_id:
+            self._zero = value
+            return
+        # Slot key 0 means empty; ID 0 is kept in self._zero instead
+        keys = self._keys
+        mask = len(keys) - 1
+        i = self._index(video_id)
+        while keys[i] and keys[i] != video_id:
+            i = (i + 1) & mask
+        if not keys[i]:
+            keys[i] = video_id
+            self._size += 1
+        self._values[i] = value
+        if self._size * 2 > len(keys):
+            self._grow()
+
+    def get(self, video_id, default=None):
+        if video_id == 0:
+            return default if self._zero is None else self._zero
+        if not self.fits(video_id):
+            return default
+        keys = self._keys
+        mask = len(keys) - 1
+        i = self._index(video_id)
+        while keys[i]:
+            if keys[i] == video_id:
+                return self._values[i]
+            i = (i + 1) & mask
+        return default
+
+    def _grow(self):
+        old_keys, old_values = self._keys, self._values
+        self._bits += 1
+        self._keys = array('Q', bytes(8 << self._bits))
+        self._values = array('I', bytes(4 << self._bits))
+        mask = len(self._keys) - 1
+        for video_id, value in zip(old_keys, old_values):
+            if video_id:
+                i = self._index(video_id)
+                while self._keys[i]:
+                    i = (i + 1) & mask
+                self._keys[i] = video_id
+                self._values[i] = value
+
+
+class KeywordIndex:
+    """Keyword categories of every video, keyed by video ID (category lists are interned)."""
+
+    def __init__(self):
+        self.videos = VideoIdMap()
+        self.other: Dict[str, int] = {}            # Videos whose URL has no 64-bit numeric ID
+        self.category_sets: List[Tuple[str, ...]] = []
+        self._set_ids: Dict[Tuple[str, ...], int] = {}
+
+    def add(self, video: Dict):
+        categories = tuple(video.get('categories') or ["Uncategorized"])
+        set_id = self._set_ids.get(categories)
+        if set_id is None:
+            set_id = self._set_ids[categories] = len(self.category_sets)
+            self.category_sets.append(categories)
+        video_id = extract_video_id(video['url'])
+        if video_id and VideoIdMap.fits(int(video_id)):
+            self.videos[int(video_id)] = set_id
+        else:
+            self.other[video['url']] = set_id
+
+    def __len__(self):
+        return len(self.videos) + len(self.other)
+
+    def categories(self, url: str) -> Optional[Tuple[str, ...]]:
+        video_id = extract_video_id(url)
+        if video_id and VideoIdMap.fits(int(video_id)):
+            set_id = self.videos.get(int(video_id))
+        else:
+            set_id = self.other.get(url)
+        return None if set_id is None else self.category_sets[set_id]
+
+
+def build_keyword_index(videos: Iterable[Dict]) -> KeywordIndex:
+    index = KeywordIndex()
+    for video in videos:
+        index.add(video)
+    return index
+
+
+def align_category(ml_category: str) -> str:
+    """Name an ML category the way the keyword categorizer would."""
+    return CATEGORY_ALIASES.get(ml_category, ml_category)
+
+
+class ComparisonStats:
+    """Agreement counts and confusion matrix, mergeable across chunks."""
+
+    def __init__(self):
+        self.ml_total = 0
+        self.compared = 0
+        self.primary_agree = 0    # ML primary category is one of the keyword categories
+        self.any_agree = 0        # Some ML category is one of the keyword categories
+        self.confusion = Counter()  # (keyword category, ML primary category) -> videos
+
+    def merge(self, other: "ComparisonStats"):
+        self.ml_total += other.ml_total
+        self.compared += other.compared
+        self.primary_agree += other.primary_agree
+        self.any_agree += other.any_agree
+        self.confusion.update(other.confusion)
+
+
+def compare_chunk(ml_videos: Iterable[Dict], index: KeywordIndex):
+    """
+    Probe the keyword index with a chunk of ML results.
+    Returns (stats, sample, disagreements): sample holds the chunk's first
+    SAMPLE_SIZE compared videos, disagreements every video the two methods
+    categorize differently, both as (ml_video, keyword categories) pairs.
+    """
+    stats = ComparisonStats()
+    sample = []
+    disagreements = []
+    for ml_video in ml_videos:
+        stats.ml_total += 1
+        kw_categories = index.categories(ml_video['url'])
+        if kw_categories is None:
+            continue
+        stats.compared += 1
+
+        ml_primary = ml_video.get('primary_category', 'Uncategorized')
+        aligned_primary = align_category(ml_primary)
+        agrees = aligned_primary in kw_categories
+        stats.primary_agree += agrees
+        stats.any_agree += agrees or any(align_category(c) in kw_categories
+                                         for c in ml_video.get('categories', []))
+        # A video with several keyword categories counts once in each of their rows
+        for kw_category in kw_categories:
+            stats.confusion[kw_category, ml_primary] += 1
+        if len(sample) < SAMPLE_SIZE:
+            sample.append((ml_video, kw_categories))
+        if not agrees:
+            disagreements.append((ml_video, kw_categories))
+    return stats, sample, disagreements
+
+
+# --- Worker processes (--workers) ----------------------------------------
+
+_worker_index = None
+
+
+def _init_worker(index: KeywordIndex):
+    global _worker_index
+    _worker_index = index
 
-def compare_categorizations():
+
+def _compare_lines(lines: List[str]):
+    stats, sample, disagreements = compare_chunk((json.loads(line) for line in lines if line.strip()),
+                                                 _worker_index)
+    # Ship back only what the parent prints or writes
+    return (stats, [(_slim(v), kw) for v, kw in sample], [(_slim(v), kw) for v, kw in disagreements])
+
+
+def _slim(ml_video: Dict) -> Dict:
+    return {key: ml_video.get(key) for key in ('url', 'title', 'primary_category', 'confidence', 'categories')}
+
+
+def _line_chunks(path: str, chunk_size: int):
+    with open(path, 'r', encoding='utf-8') as f:
+        chunk = []
+        for line in f:
+            chunk.append(line)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+
+def _record_chunks(videos: Iterable[Dict], chunk_size: int):
+    chunk = []
+    for video in videos:
+        chunk.append(video)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_comparisons(index: KeywordIndex, ml_file: str, workers: int = 1, chunk_size: int = CHUNK_SIZE):
+    """Stream compare_chunk() results for each chunk of the ML file, in file order."""
+    if workers > 1 and is_jsonl_path(ml_file):
+        # JSON parsing dominates, so workers get raw lines and parse them themselves.
+        # Only a few chunks are in flight at once (Pool.imap would read the whole file ahead)
+        with Pool(workers, initializer=_init_worker, initargs=(index,)) as pool:
+            pending = deque()
+            for chunk in _line_chunks(ml_file, chunk_size):
+                pending.append(pool.apply_async(_compare_lines, (chunk,)))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().get()
+            while pending:
+                yield pending.popleft().get()
+    else:
+        for chunk in _record_chunks(iter_metadata(ml_file), chunk_size):
+            yield compare_chunk(chunk, index)
+
+
+def print_sample(ml_video: Dict, kw_cats: Tuple[str, ...]):
+    ml_primary = ml_video.get('primary_category', 'Uncategorized')
+    ml_confidence = ml_video.get('confidence', 0)
+
+    # Display
+    print(f"📹 {ml_video.get('title', '')[:60]}...")
+    print(f"   Keyword: {', '.join(list(kw_cats)[:2])}")
+    print(f"   ML:      {ml_primary} ({ml_confidence:.1%} confidence)")
+
+    if ml_confidence > 0.3:
+        print(f"   ✅ High confidence categorization")
+    elif ml_confidence > 0.15:
+        print(f"   ⚠️  Medium confidence")
+    else:
+        print(f"   ⚠️  Low confidence - mixed themes")
+    print()
+
+
+def print_confusion_matrix(stats: ComparisonStats, max_columns: int = 8):
+    """Keyword categories as rows, the most common ML primary categories as columns."""
+    row_totals = Counter()
+    column_totals = Counter()
+    for (kw_category, ml_category), count in stats.confusion.items():
+        row_totals[kw_category] += count
+        column_totals[ml_category] += count
+    columns = [c for c, _ in column_totals.most_common(max_columns)]
+
+    corner = "keyword \\ ML"
+    print(f"{corner:<16}" + "".join(f"{c[:10]:>11}" for c in columns) + f"{'other':>8}")
+    for kw_category, total in row_totals.most_common():
+        cells = [stats.confusion[kw_category, c] for c in columns]
+        print(f"{kw_category[:15]:<16}" + "".join(f"{n:>11}" for n in cells) + f"{total - sum(cells):>8}")
+
+
+def compare_categorizations(keyword_file: str = "tiktok_metadata.json", ml_file: str = "tiktok_metadata_ml.json",
+                            disagreements_file: str = DISAGREEMENTS_FILE, workers: int = 1):
     """Compare results from both categorization methods."""
-    
+
     # Check if both metadata files exist
-    keyword_file = "tiktok_metadata.json"
-    ml_file = "tiktok_metadata_ml.json"
-    
     if not Path(keyword_file).exists():
         print(f"❌ {keyword_file} not found. Run categorize_tiktoks.py first.")
         return
-    
+
     if not Path(ml_file).exists():
         print(f"❌ {ml_file} not found. Run categorize_tiktoks_ml.py first.")
         return
-    
-    # Load both files
-    with open(keyword_file, 'r', encoding='utf-8') as f:
-        keyword_data = json.load(f)
-    
-    with open(ml_file, 'r', encoding='utf-8') as f:
-        ml_data = json.load(f)
-    
-    # Create URL-based lookup
-    keyword_lookup = {v['url']: v for v in keyword_data}
-    ml_lookup = {v['url']: v for v in ml_data}
-    
-    # Find common URLs
-    common_urls = set(keyword_lookup.keys()) & set(ml_lookup.keys())
-    
-    if not common_urls:
+
+    # Index the keyword results, then stream the ML results past the index
+    index = build_keyword_index(iter_metadata(keyword_file))
+
+    stats = ComparisonStats()
+    shown = 0
+    improvements = []
+
+    with open(disagreements_file, 'w', encoding='utf-8') as out:
+        for chunk_stats, sample, disagreements in iter_comparisons(index, ml_file, workers):
+            stats.merge(chunk_stats)
+            for ml_video, kw_cats in sample:
+                if shown >= SAMPLE_SIZE:  # Show first 20
+                    break
+                if shown == 0:
+                    print("=" * 80)
+                    print("🔍 Comparing Keyword vs ML Categorization")
+                    print("=" * 80)
+                    print()
+                print_sample(ml_video, kw_cats)
+                shown += 1
+            for ml_video, kw_cats in disagreements:
+                if len(improvements) < 5:
+                    improvements.append((kw_cats, ml_video.get('primary_category', 'Uncategorized')))
+                out.write(json.dumps({
+                    "url": ml_video['url'],
+                    "title": ml_video.get('title', ''),
+                    "keyword_categories": list(kw_cats),
+                    "ml_primary_category": ml_video.get('primary_category', 'Uncategorized'),
+                    "ml_confidence": ml_video.get('confidence', 0),
+                }, ensure_ascii=False) + "\n")
+
+    if not stats.compared:
         print("❌ No common videos found between the two files.")
         return
-    
-    print("=" * 80)
-    print("🔍 Comparing Keyword vs ML Categorization")
-    print("=" * 80)
-    print()
-    
-    # Statistics
-    same_category = 0
-    different_category = 0
-    improvements = []
-    
-    for url in list(common_urls)[:20]:  # Show first 20
-        kw_video = keyword_lookup[url]
-        ml_video = ml_lookup[url]
-        
-        kw_cats = set(kw_video.get('categories', []))
-        ml_cats = set(ml_video.get('categories', []))
-        ml_primary = ml_video.get('primary_category', 'Uncategorized')
-        ml_confidence = ml_video.get('confidence', 0)
-        
-        # Check if categories match
-        if kw_cats & ml_cats:  # If there's any overlap
-            same_category += 1
-        else:
-            different_category += 1
-            improvements.append((url, kw_cats, ml_primary, ml_confidence))
-        
-        # Display
-        print(f"📹 {kw_video['title'][:60]}...")
-        print(f"   Keyword: {', '.join(list(kw_cats)[:2])}")
-        print(f"   ML:      {ml_primary} ({ml_confidence:.1%} confidence)")
-        
-        if ml_confidence > 0.3:
-            print(f"   ✅ High confidence categorization")
-        elif ml_confidence > 0.15:
-            print(f"   ⚠️  Medium confidence")
-        else:
-            print(f"   ⚠️  Low confidence - mixed themes")
-        print()
-    
+
     # Summary
+    different = stats.compared - stats.primary_agree
     print("=" * 80)
     print("📊 SUMMARY")
     print("=" * 80)
-    print(f"Total videos compared: {len(common_urls)}")
-    print(f"Similar categorization: {same_category}")
-    print(f"Different categorization: {different_category}")
+    print(f"Keyword videos: {len(index)}  |  ML videos: {stats.ml_total}")
+    print(f"Total videos compared: {stats.compared}")
+    print(f"Similar categorization: {stats.primary_agree} ({stats.primary_agree / stats.compared:.1%}, "
+          f"ML primary category matches a keyword category)")
+    print(f"Any overlap: {stats.any_agree} ({stats.any_agree / stats.compared:.1%})")
+    print(f"Different categorization: {different} → {disagreements_file}")
     print()
-    
+
+    print("🧮 Confusion matrix (videos):")
+    print_confusion_matrix(stats)
+    print()
+
     if improvements:
         print("🎯 ML provided more nuanced categorization for these videos:")
-        for url, kw_cats, ml_cat, conf in improvements[:5]:
+        for kw_cats, ml_cat in improvements:
             print(f"  • {ml_cat} (was: {', '.join(list(kw_cats)[:2])})")
-    
+
     print()
     print("💡 Key Differences:")
     print("  • Keyword: Fast, simple pattern matching")
@@ -99,4 +378,14 @@ def compare_categorizations():
     print()
 
 if __name__ == "__main__":
-    compare_categorizations()
+    parser = argparse.ArgumentParser(description="Compare keyword and ML categorization results.")
+    parser.add_argument("keyword_file", nargs="?", default="tiktok_metadata.json",
+                        help="keyword metadata (.json, .jsonl or .db; default: tiktok_metadata.json)")
+    parser.add_argument("ml_file", nargs="?", default="tiktok_metadata_ml.json",
+                        help="ML metadata (.json, .jsonl or .db; default: tiktok_metadata_ml.json)")
+    parser.add_argument("--disagreements", default=DISAGREEMENTS_FILE,
+                        help=f"where to write every disagreement as JSONL (default: {DISAGREEMENTS_FILE})")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="parallel worker processes for a JSONL ML file (default: 1)")
+    args = parser.parse_args()
+    compare_categorizations(args.keyword_file, args.ml_file, args.disagreements, args.workers)
@@ -1,31 +1,206 @@
+import argparse
+import gzip
 import re
+import sys
+from array import array
+
+BLOCK_SIZE = 1 << 20   # Characters read per block
+MAX_CARRY = 1 << 16    # Longest partial link carried over to the next block
+
+# Updated regex to match tiktokv.com as well (stops at whitespace and quotes, so links
+# inside JSON data exports come out clean)
+LINK_PATTERN = re.compile(
+    r"(https?://(?:www\.)?tiktok[a-z]*\.com/[^\s\"'<>]+)",
+    re.IGNORECASE
+)
+VIDEO_ID_PATTERN = re.compile(r"/video/(\d+)")
+# Characters that can never be part of a link, so a link can't span them
+LINK_BOUNDARIES = " \n\r\t\"'<>"
+
+
+class VideoIdSet:
+    """Compact set of 64-bit video IDs: open addressing over an array('Q'), ~16 bytes per ID."""
+
+    MAX_ID = (1 << 64) - 1
+
+    def __init__(self, capacity=1 << 16):
+        self._bits = max(4, (capacity * 2 - 1).bit_length())
+        self._slots = array('Q', bytes(8 << self._bits))
+        self._size = 0
+        self._has_zero = False  # 0 marks an empty slot, so it's tracked separately
+
+    def __len__(self):
+        return self._size
+
+    @classmethod
+    def fits(cls, video_id):
+        return 0 <= video_id <= cls.MAX_ID
+
+    def _index(self, video_id):
+        # Fibonacci hashing spreads the sequential low bits of TikTok IDs across the table
+        return ((video_id * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> (64 - self._bits)
+
+    def add(self, video_id):
+        """Add an ID; returns True if it was not already present."""
+        if not self.fits(video_id):
+            raise ValueError(f"video ID {video_id} doesn't fit in 64 bits")
+        if video_id == 0:
+            added = not self._has_zero
+            self._has_zero = True
+            self._size += added
+            return added
+
+        slots = self._slots
+        mask = len(slots) - 1
+        i = self._index(video_id)
+        while slots[i]:
+            if slots[i] == video_id:
+                return False
+            i = (i + 1) & mask
+        slots[i] = video_id
+        self._size += 1
+        if self._size * 2 > len(slots):
+            self._grow()
+        return True
+
+    def __contains__(self, video_id):
+        if not self.fits(video_id):
+            return False
+        if video_id == 0:
+            return self._has_zero
+        slots = self._slots
+        mask = len(slots) - 1
+        i = self._index(video_id)
+        while slots[i]:
+            if slots[i] == video_id:
+                return True
+            i = (i + 1) & mask
+        return False
+
+    def _grow(self):
+        old = self._slots
+        self._bits += 1
+        self._slots = array('Q', bytes(8 << self._bits))
+        mask = len(self._slots) - 1
+        for video_id in old:
+            if video_id:
+                i = self._index(video_id)
+                while self._slots[i]:
+                    i = (i + 1) & mask
+                self._slots[i] = video_id
+
+
+def open_input(path):
+    """Open a text input: '-' for stdin, gzip for *.gz, plain text otherwise."""
+    if path == "-":
+        return sys.stdin
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", errors="replace")
+    return open(path, "r", encoding="utf-8", errors="replace")
+
+
+def iter_links(stream, block_size=BLOCK_SIZE):
+    """
+    Yield every TikTok link in a text stream, reading it in large blocks. A link
+    longer than MAX_CARRY is cut where the block boundary falls; those are counted
+    and reported on stderr.
+    """
+    carry = ""
+    truncated = 0
+    while True:
+        block = stream.read(block_size)
+        if not block:
+            break
+        text = carry + block
+
+        # Everything up to the last boundary character is complete; the rest may be
+        # the start of a link that continues in the next block
+        window = max(0, len(text) - MAX_CARRY)
+        cut = max(text.rfind(ch, window) for ch in LINK_BOUNDARIES) + 1
+        if cut == 0:
+            cut = window
+            truncated += _crosses(text, cut)
+
+        yield from _find_links(text, cut)
+        carry = text[cut:]
+
+    yield from _find_links(carry, len(carry))
+    if truncated:
+        print(f"⚠️  {truncated} links longer than {MAX_CARRY} characters were cut short",
+              file=sys.stderr)
+
+
+def _crosses(text, cut):
+    """1 if the last link starting before `cut` runs past it, else 0."""
+    pos = text.rfind("://", 0, cut + 5)
+    if pos == -1:
+        return 0
+    start = max(0, pos - 5 if text[pos - 1:pos] in ("s", "S") else pos - 4)
+    match = LINK_PATTERN.match(text, start) if start < cut else None
+    return int(bool(match) and match.end() > cut)
+
+
+def _find_links(text, end):
+    # Jump between "://" occurrences (a fast C-level find) and only run the
+    # case-insensitive regex where a link can actually start
+    last_end = 0
+    pos = text.find("://", 0, end)
+    while pos != -1:
+        start = pos - 5 if text[pos - 1:pos] in ("s", "S") else pos - 4
+        if start >= max(last_end, 0):
+            match = LINK_PATTERN.match(text, start, end)
+            if match:
+                yield match.group(1)
+                last_end = match.end()
+        pos = text.find("://", pos + 3, end)
+
 
 def extract_tiktok_links(input_file="uncategorized.txt", output_file="uncategorized_formatted.txt"):
-    # Updated regex to match tiktokv.com as well
-    pattern = re.compile(
-        r"(https?://(?:www\.)?tiktok[a-z]*\.com/[^\s]+)",
-        re.IGNORECASE
-    )
-    
-    links = []
-
-    with open(input_file, "r", encoding="utf-8") as f:
-        for line in f:
-            matches = pattern.findall(line)
-            links.extend(matches)
-
-    seen = set()
-    unique_links = []
-    for link in links:
-        if link not in seen:
-            seen.add(link)
-            unique_links.append(link)
-
-    with open(output_file, "w", encoding="utf-8") as out:
-        for link in unique_links:
-            out.write(link + "\n")
-
-    print(f"Done! Extracted {len(unique_links)} TikTok links into {output_file}")
-
-
-extract_tiktok_links()
+    # Accept one path or several ('-' reads stdin, *.gz is decompressed on the fly)
+    input_files = [input_file] if isinstance(input_file, str) else list(input_file)
+
+    # Dedupe on the numeric video ID, so tiktokv.com/share/video/X and
+    # tiktok.com/@user/video/X count as the same video
+    seen_ids = VideoIdSet()
+    seen_other = set()  # Links without a 64-bit video ID (profiles, short links), or oversized IDs
+    count = 0
+
+    out = sys.stdout if output_file == "-" else open(output_file, "w", encoding="utf-8")
+    try:
+        for path in input_files:
+            stream = open_input(path)
+            try:
+                for link in iter_links(stream):
+                    match = VIDEO_ID_PATTERN.search(link)
+                    if match and VideoIdSet.fits(int(match.group(1))):
+                        is_new = seen_ids.add(int(match.group(1)))
+                    else:
+                        key = match.group(1) if match else link
+                        is_new = key not in seen_other
+                        seen_other.add(key)
+                    if is_new:
+                        out.write(link + "\n")
+                        count += 1
+            finally:
+                if stream is not sys.stdin:
+                    stream.close()
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    print(f"Done! Extracted {count} TikTok links into {output_file}",
+          file=sys.stderr if output_file == "-" else sys.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract unique TikTok links from text or data exports.")
+    parser.add_argument("inputs", nargs="*", default=["uncategorized.txt"],
+                        help="input files ('-' for stdin, .gz supported; default: uncategorized.txt)")
+    parser.add_argument("-o", "--output", default="uncategorized_formatted.txt",
+                        help="output file, '-' for stdout (default: uncategorized_formatted.txt)")
+    args = parser.parse_args()
+    extract_tiktok_links(args.inputs, args.output)
+
+
+if __name__ == "__main__":
+    main()
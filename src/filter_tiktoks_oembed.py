@@ -1,68 +1,181 @@
-import requests
-import time
-import re
+import argparse
+import asyncio
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import liveness_history
+from liveness_history import LivenessHistory
+from oembed_cache import extract_video_id, get_cache
+from oembed_client import ALIVE, DEAD, HEADERS, UNKNOWN, get_client, normalize_tiktok_url
 
 INPUT_FILE = "tiktoks_dead.txt"
 OUTPUT_FILE = "tiktoks_cleaned.txt"
 
-HEADERS = {
-    "User-Agent": (
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-        "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Safari/605.1.15"
-    ),
-    "Accept": "application/json",
-}
-
-def normalize_tiktok_url(url: str) -> str:
-    """Convert tiktokv.com links to canonical tiktok.com format."""
-    match = re.search(r'/video/(\d+)', url)
-    if match:
-        video_id = match.group(1)
-        return f"https://www.tiktok.com/@_/video/{video_id}"
-    return url
-
-def tiktok_exists(video_url):
-    try:
-        normalized = normalize_tiktok_url(video_url)
-        r = requests.get(
-            "https://www.tiktok.com/oembed",
-            params={"url": normalized},
-            headers=HEADERS,
-            timeout=10,
-        )
-
-        if r.status_code == 200:
-            return True
+# Async mode settings
+CONCURRENCY = 16     # Max oEmbed probes in flight at once
+RATE_LIMIT = 20.0    # Max requests per second; the adaptive limiter stays at or below it
+
+RECHECK_BUDGET = 0   # Max uncached links to check per run, most overdue first (0 = all)
+
+STATUS_LABELS = {ALIVE: "✅ OK", DEAD: "❌ Gone", UNKNOWN: "⚠️  Unknown"}
+
+def check_link(video_url, session=None, probe=False) -> str:
+    """ALIVE, DEAD, or UNKNOWN if TikTok kept throttling us or the request kept failing."""
+    client = get_client()
+    check = client.probe if probe else client.check
+    return check(normalize_tiktok_url(video_url), HEADERS, session=session)
+
+
+def tiktok_exists(video_url, session=None):
+    return check_link(video_url, session) == ALIVE
+
+
+def set_max_rate(rate: float):
+    """Cap the shared client's adaptive rate (0 = no cap)."""
+    limiter = get_client().limiter
+    limiter.max_rate = rate if rate > 0 else float("inf")
+    limiter.rate = min(limiter.rate, limiter.max_rate)
+
+
+def plan_checks(video_ids, history, budget=RECHECK_BUDGET):
+    """
+    Returns (indexes of the links to check this run, {video_id: fetched_at} for the ones
+    the oEmbed cache will answer). Cached links and links without a video ID cost no
+    budget; the budget goes to the uncached links whose last verdict in `history` is
+    most overdue.
+    """
+    cache = get_cache()
+    free, pending, cached_at = [], {}, {}
+    for i, video_id in enumerate(video_ids):
+        fetched_at = cache.fetched_at(video_id) if cache is not None and video_id else None
+        if fetched_at is not None:
+            cached_at[video_id] = fetched_at
+        if video_id is None or fetched_at is not None:
+            free.append(i)
         else:
-            # Uncomment next line if you want to see failed reason
-            # print(f"❌ {r.status_code} for {normalized}")
-            return False
+            pending.setdefault(video_id, []).append(i)
+    chosen = history.schedule(pending, budget)
+    return sorted(free + [i for video_id in chosen for i in pending[video_id]]), cached_at
+
+
+async def check_links_async(links, concurrency=CONCURRENCY, rate=RATE_LIMIT, verbose=True, probe=False):
+    """Check many links at once; returns one status (ALIVE/DEAD/UNKNOWN) per link, in input order."""
+    total = len(links)
+    results = [UNKNOWN] * total
+    done = 0
+
+    get_client().ensure_pool_size(concurrency)
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    semaphore = asyncio.Semaphore(concurrency)
+    set_max_rate(rate)
+    loop = asyncio.get_running_loop()
 
-    except Exception:
-        return False
+    async def check(i, link):
+        nonlocal done
+        async with semaphore:
+            status = await loop.run_in_executor(executor, check_link, link, None, probe)
+        results[i] = status
+        done += 1
+        if verbose:
+            print(f"[{done}/{total}] {STATUS_LABELS[status]} – {link}")
+
+    try:
+        await asyncio.gather(*(check(i, link) for i, link in enumerate(links)))
+    finally:
+        executor.shutdown(wait=True)
+
+    return results
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Filter out dead TikTok links using oEmbed.")
+    parser.add_argument("--async", dest="use_async", action="store_true",
+                        help="check links concurrently instead of one at a time")
+    parser.add_argument("--concurrency", type=int, default=CONCURRENCY,
+                        help=f"max requests in flight in async mode (default: {CONCURRENCY})")
+    parser.add_argument("--rate", type=float, default=RATE_LIMIT,
+                        help=f"max requests per second, 0 = no cap (default: {RATE_LIMIT}); "
+                             "the actual rate adapts to TikTok's throttling")
+    parser.add_argument("--probe", action="store_true",
+                        help="liveness only: send HEAD requests instead of downloading the oEmbed data "
+                             "(live videos' metadata is then not cached for the categorizers); a few "
+                             "HEAD verdicts are spot-checked with a full fetch")
+    parser.add_argument("--budget", type=int, default=RECHECK_BUDGET,
+                        help="max uncached links to check this run, most overdue first; the rest keep "
+                             "their last verdict from the liveness history (default: all)")
+    parser.add_argument("--no-history", action="store_true",
+                        help="don't read or update the liveness history; check every link")
+    parser.add_argument("--latency-histogram", action="store_true",
+                        help="print the distribution of oEmbed request latencies at the end")
+    args = parser.parse_args()
+
     with open(INPUT_FILE, "r", encoding="utf-8") as f:
         links = [line.strip() for line in f if line.strip()]
 
-    total = len(links)
-    print(f"Loaded {total} links.\nChecking...")
+    print(f"Loaded {len(links)} links.")
 
-    good_links = []
-    for i, link in enumerate(links, 1):
-        exists = tiktok_exists(link)
-        status = "✅ OK" if exists else "❌ Gone"
-        print(f"[{i}/{total}] {status} – {link}")
-        if exists:
-            good_links.append(link)
-        time.sleep(0.3)
+    history = None
+    if liveness_history.HISTORY_ENABLED and not args.no_history:
+        history = LivenessHistory()
+        video_ids = [extract_video_id(link) for link in links]
+        new = history.see(video_id for video_id in video_ids if video_id)
+        entries = history.lookup(video_id for video_id in video_ids if video_id)
+        to_check, cached_at = plan_checks(video_ids, history, args.budget)
+        # Links left out by the budget keep their last verdict (never-checked ones are unknown)
+        results = [(entries[video_id].last_status if video_id in entries else None) or UNKNOWN
+                   for video_id in video_ids]
+        print(f"Liveness history: {len(entries)} videos known, {new} new; "
+              f"checking {len(to_check)}, {len(links) - len(to_check)} keep their last verdict.")
+    else:
+        to_check = range(len(links))
+        results = [UNKNOWN] * len(links)
+
+    check_list = [links[i] for i in to_check]
+    total = len(check_list)
+    print("Checking...")
+
+    if args.use_async:
+        checked = asyncio.run(check_links_async(check_list, args.concurrency, args.rate, probe=args.probe))
+    else:
+        set_max_rate(args.rate)
+        checked = []
+        for i, link in enumerate(check_list, 1):
+            status = check_link(link, probe=args.probe)
+            print(f"[{i}/{total}] {STATUS_LABELS[status]} – {link}")
+            checked.append(status)
+
+    for i, status in zip(to_check, checked):
+        results[i] = status
+    if history is not None:
+        # Cache answers are as old as the cached response, not as old as this run
+        history.record((video_ids[i], status, cached_at.get(video_ids[i]))
+                       for i, status in zip(to_check, checked) if video_ids[i])
+        counts = history.stats()
+        history.close()
+        print(f"Liveness history: {counts[ALIVE]} alive, {counts[DEAD]} dead, "
+              f"{counts[UNKNOWN] + counts['never checked']} without a verdict")
+
+    # Links we couldn't get a verdict for are kept: throttling must never delete live links
+    good_links = [link for link, status in zip(links, results) if status != DEAD]
+    counts = Counter(results)
 
     with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
         f.write("\n".join(good_links))
 
     print(f"\nDone! Saved {len(good_links)} valid links to {OUTPUT_FILE}")
-    print(f"Removed {total - len(good_links)} dead links.")
+    print(f"Removed {counts[DEAD]} dead links.")
+    if counts[UNKNOWN]:
+        print(f"⚠️  {counts[UNKNOWN]} links have no verdict yet (throttled, timed out or not checked yet) "
+              f"and were kept; rerun later to check them.")
+
+    client = get_client()
+    print(f"oEmbed client: {client.summary()}")
+    if args.latency_histogram:
+        print("\n".join(client.stats.histogram()))
+
+    cache = get_cache()
+    if cache is not None:
+        print(f"oEmbed cache: {cache.hits} hits, {cache.misses} misses ({len(cache)} entries)")
 
 
 if __name__ == "__main__":
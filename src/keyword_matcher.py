@@ -0,0 +1,143 @@
+"""
+Aho-Corasick multi-keyword matcher.
+Compiles a {category: [keywords]} map into one automaton, so every category
+present in a text is found in a single pass over its characters instead of one
+substring scan per keyword.
+"""
+
+from collections import deque
+from typing import Dict, List, Set
+
+
+def _is_word_char(ch: str) -> bool:
+    return ch.isalnum() or ch == "_"
+
+
+class KeywordMatcher:
+    """
+    Finds which categories' keywords occur in a text.
+
+    By default a keyword matches anywhere, exactly like `keyword in text`.
+    With word_boundary=True it only matches as a whole word, so "ai" no longer
+    matches "said" and "cat" no longer matches "education".
+    Texts are matched as given; lowercase them first for case-insensitive matching.
+    """
+
+    def __init__(self, category_keywords: Dict[str, List[str]], word_boundary: bool = False):
+        self.categories = list(category_keywords)
+        self.word_boundary = word_boundary
+        self._decoded = {0: []}
+
+        # Bitmask of categories for each distinct keyword
+        keyword_masks = {}
+        for bit, (category, keywords) in enumerate(category_keywords.items()):
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if keyword:
+                    keyword_masks[keyword] = keyword_masks.get(keyword, 0) | (1 << bit)
+
+        # Trie of all keywords
+        goto = [{}]
+        terminal = [None]
+        for keyword in keyword_masks:
+            state = 0
+            for ch in keyword:
+                if ch not in goto[state]:
+                    goto.append({})
+                    terminal.append(None)
+                    goto[state][ch] = len(goto) - 1
+                state = goto[state][ch]
+            terminal[state] = keyword
+
+        # Failure links in BFS order, then a full transition table (DFA) so scanning
+        # never has to follow failure links
+        fail = [0] * len(goto)
+        outputs = [[keyword] if keyword else [] for keyword in terminal]
+        order = []
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            order.append(state)
+            for ch, child in goto[state].items():
+                queue.append(child)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[child] = goto[f].get(ch, 0) if goto[f].get(ch, 0) != child else 0
+                outputs[child] = outputs[child] + outputs[fail[child]]
+
+        delta = [dict(goto[0])] + [None] * (len(goto) - 1)
+        for state in order:
+            transitions = dict(delta[fail[state]])
+            transitions.update(goto[state])
+            delta[state] = transitions
+        self._delta = delta
+
+        # Per state: every keyword ending here, as a category mask and (length, mask) pairs
+        self._out_mask = [0] * len(goto)
+        self._out_keywords = [()] * len(goto)
+        for state, keywords in enumerate(outputs):
+            for keyword in keywords:
+                self._out_mask[state] |= keyword_masks[keyword]
+            self._out_keywords[state] = tuple((keyword, len(keyword), keyword_masks[keyword])
+                                              for keyword in keywords)
+
+    def _scan(self, text: str) -> int:
+        """Category bitmask of every keyword found in text."""
+        delta = self._delta
+        out_mask = self._out_mask
+        state = 0
+        found = 0
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            found |= out_mask[state]
+        return found
+
+    def _scan_words(self, text: str) -> int:
+        """Category bitmask of every keyword found in text as a whole word."""
+        delta = self._delta
+        out_keywords = self._out_keywords
+        end = len(text)
+        state = 0
+        found = 0
+        for i, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            if out_keywords[state]:
+                if i + 1 < end and _is_word_char(text[i + 1]):
+                    continue
+                for _, length, mask in out_keywords[state]:
+                    start = i - length + 1
+                    if start == 0 or not _is_word_char(text[start - 1]):
+                        found |= mask
+        return found
+
+    def match_mask(self, text: str) -> int:
+        """Bitmask over self.categories of the categories matched in text."""
+        return self._scan_words(text) if self.word_boundary else self._scan(text)
+
+    def categories_for(self, text: str) -> List[str]:
+        """Matched categories, in the order they were declared."""
+        mask = self.match_mask(text)
+        categories = self._decoded.get(mask)
+        if categories is None:
+            categories = [c for bit, c in enumerate(self.categories) if mask >> bit & 1]
+            self._decoded[mask] = categories
+        return list(categories)
+
+    def keywords_in(self, text: str) -> Set[str]:
+        """Distinct keywords found in text (respecting word_boundary)."""
+        delta = self._delta
+        out_keywords = self._out_keywords
+        end = len(text)
+        state = 0
+        found = set()
+        for i, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            for keyword, length, _ in out_keywords[state]:
+                if self.word_boundary:
+                    start = i - length + 1
+                    if (start > 0 and _is_word_char(text[start - 1])) or \
+                            (i + 1 < end and _is_word_char(text[i + 1])):
+                        continue
+                found.add(keyword)
+        return found
@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Compact binary store of TikTok video IDs.
+
+The link lists in data/ are full URLs that only differ in their 19-digit video
+ID. A LinkStore keeps just the IDs as a sorted array of uint64 in a small
+binary file that is memory-mapped on load, with O(log n) membership tests and
+fast set operations between lists. Importing a text file keeps only the set
+of video IDs: exporting writes them back sorted by ID in the tiktokv share
+format, not in the original order or URL form.
+
+    python link_store.py import data/AllSavedTiktoks.txt saved.ids
+    python link_store.py diff saved.ids dead.ids -o alive.txt
+    python link_store.py intersect cleaned.ids valid.ids
+"""
+
+import argparse
+import mmap
+import sys
+import time
+from array import array
+from bisect import bisect_left
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Iterable, Optional
+
+from extract_tiktoks import VIDEO_ID_PATTERN
+
+NUMPY_AVAILABLE = find_spec("numpy") is not None  # Imported on the first set operation
+
+MAGIC = b"TTLINKS1"                          # File header, followed by the uint64 ID count
+HEADER_SIZE = 16
+MAX_ID = (1 << 64) - 1                       # Largest ID a uint64 slot can hold
+URL_FORMAT = "https://www.tiktokv.com/share/video/{}/"  # Same format as the data/ files
+
+
+class LinkStore:
+    """Sorted, de-duplicated set of video IDs backed by an array('Q') or a memory-mapped file."""
+
+    def __init__(self, ids: Iterable[int] = ()):
+        self._ids = array('Q', sorted(set(ids)))
+        self._mmap = None
+
+    @classmethod
+    def _from_sorted(cls, ids) -> "LinkStore":
+        store = cls.__new__(cls)
+        store._ids = ids
+        store._mmap = None
+        return store
+
+    # --- Import / export ---------------------------------------------------
+
+    @classmethod
+    def from_text(cls, path: str) -> "LinkStore":
+        """Parse a text file of links; lines without a /video/<id> are skipped, as are IDs over 64 bits."""
+        ids = set()
+        oversized = 0
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                match = VIDEO_ID_PATTERN.search(line)
+                if match:
+                    video_id = int(match.group(1))
+                    if video_id <= MAX_ID:
+                        ids.add(video_id)
+                    else:
+                        oversized += 1
+        if oversized:
+            print(f"⚠️  Skipped {oversized} links in {path} whose video ID doesn't fit in 64 bits",
+                  file=sys.stderr)
+        return cls(ids)
+
+    def to_text(self, path: str, url_format: str = URL_FORMAT):
+        """Write one link per line in the data/ text format."""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("\n".join(url_format.format(video_id) for video_id in self))
+
+    @classmethod
+    def load(cls, path: str) -> "LinkStore":
+        """Memory-map a .ids file (falls back to reading it into memory on big-endian hosts)."""
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a link store file")
+            count = int.from_bytes(f.read(8), 'little')
+            if count == 0:
+                return cls()
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if sys.byteorder != 'little':
+            ids = array('Q', mapped[HEADER_SIZE:HEADER_SIZE + count * 8])
+            ids.byteswap()
+            mapped.close()
+            return cls._from_sorted(ids)
+
+        view = memoryview(mapped)
+        store = cls._from_sorted(view[HEADER_SIZE:HEADER_SIZE + count * 8].cast('Q'))
+        store._mmap = (mapped, view)
+        return store
+
+    @classmethod
+    def open(cls, path: str) -> "LinkStore":
+        """Load a .ids file, or import a text file of links."""
+        return cls.load(path) if Path(path).suffix == ".ids" else cls.from_text(path)
+
+    def save(self, path: str):
+        ids = array('Q', self._ids)
+        if sys.byteorder != 'little':
+            ids.byteswap()
+        with open(path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(len(ids).to_bytes(8, 'little'))
+            ids.tofile(f)
+
+    # --- Set interface -----------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __iter__(self):
+        return iter(self._ids)
+
+    def __contains__(self, video_id: int) -> bool:
+        i = bisect_left(self._ids, video_id)
+        return i < len(self._ids) and self._ids[i] == video_id
+
+    def _combine(self, other: "LinkStore", numpy_op: str, set_op) -> "LinkStore":
+        """Apply a NumPy set routine (by name) to both ID arrays, or `set_op` without NumPy."""
+        if not NUMPY_AVAILABLE:
+            return LinkStore(set_op(set(self._ids), set(other._ids)))
+        import numpy as np
+
+        def as_numpy(ids):
+            return np.frombuffer(ids, dtype=np.uint64) if len(ids) else np.empty(0, np.uint64)
+
+        kwargs = {} if numpy_op == "union1d" else {"assume_unique": True}
+        result = getattr(np, numpy_op)(as_numpy(self._ids), as_numpy(other._ids), **kwargs)
+        return LinkStore._from_sorted(array('Q', result.astype(np.uint64).tobytes()))
+
+    def union(self, other: "LinkStore") -> "LinkStore":
+        return self._combine(other, "union1d", set.union)
+
+    def intersection(self, other: "LinkStore") -> "LinkStore":
+        return self._combine(other, "intersect1d", set.intersection)
+
+    def difference(self, other: "LinkStore") -> "LinkStore":
+        return self._combine(other, "setdiff1d", set.difference)
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+    def close(self):
+        if self._mmap is not None:
+            mapped, view = self._mmap
+            self._ids.release()
+            view.release()
+            mapped.close()
+            self._ids = array('Q')
+            self._mmap = None
+
+
+def _write_result(store: LinkStore, output: Optional[str]):
+    if not output:
+        return
+    if Path(output).suffix == ".ids":
+        store.save(output)
+    else:
+        store.to_text(output)
+    print(f"💾 Saved {len(store)} links to {output}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact video-ID link store.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("import", help="convert a text file of links to a .ids store")
+    p.add_argument("text_file")
+    p.add_argument("store_file")
+
+    p = sub.add_parser("export", help="write a .ids store back out as text links")
+    p.add_argument("store_file")
+    p.add_argument("text_file")
+
+    for name, help_text in [("diff", "links in A but not in B"),
+                            ("intersect", "links in both A and B"),
+                            ("union", "links in A or B")]:
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("a", help=".ids store or text file")
+        p.add_argument("b", help=".ids store or text file")
+        p.add_argument("-o", "--output", help="save the result (.ids or text)")
+
+    p = sub.add_parser("contains", help="check whether a video ID or link is in a store")
+    p.add_argument("store_file")
+    p.add_argument("video", help="video ID or link")
+
+    args = parser.parse_args()
+
+    if args.command == "import":
+        store = LinkStore.from_text(args.text_file)
+        store.save(args.store_file)
+        print(f"💾 Imported {len(store)} video IDs → {args.store_file}")
+
+    elif args.command == "export":
+        store = LinkStore.load(args.store_file)
+        store.to_text(args.text_file)
+        print(f"💾 Exported {len(store)} links → {args.text_file}")
+
+    elif args.command == "contains":
+        store = LinkStore.open(args.store_file)
+        match = VIDEO_ID_PATTERN.search(args.video)
+        video_id = int(match.group(1) if match else args.video)
+        print("✅ Present" if video_id in store else "❌ Not present")
+
+    else:
+        a, b = LinkStore.open(args.a), LinkStore.open(args.b)
+        start = time.perf_counter()
+        result = {"diff": a.difference, "intersect": a.intersection, "union": a.union}[args.command](b)
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{args.command}: {len(a)} vs {len(b)} → {len(result)} links ({elapsed:.2f} ms)")
+        _write_result(result, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+"""
+Per-video liveness history for filter_tiktoks_oembed.py, in SQLite keyed by
+TikTok video ID: when each video was first seen, when it was last checked,
+the last verdict (alive/dead/unknown) and how many checks in a row failed.
+
+With a re-check budget, the filter only spends network requests on the links
+whose last verdict is most overdue, so a full health sweep of a large
+collection is spread over several runs; every other link keeps its last known
+verdict.
+
+    python liveness_history.py stats
+    python liveness_history.py plan tiktoks_dead.txt --budget 2000
+"""
+
+import argparse
+import heapq
+import math
+import sqlite3
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from oembed_client import ALIVE, DEAD, UNKNOWN
+from oembed_cache import extract_video_id
+
+HISTORY_FILE = "liveness_history.db"
+HISTORY_ENABLED = True
+
+# How long each verdict stays trustworthy; a link's re-check priority is its
+# staleness divided by this (so 1.0 means "due")
+ALIVE_RECHECK_AFTER = 7 * 24 * 3600   # Saved videos that were alive mostly stay alive
+DEAD_RECHECK_AFTER = 30 * 24 * 3600   # Private videos occasionally come back; deleted ones don't
+UNKNOWN_RECHECK_AFTER = 3600          # No verdict yet: check again as soon as possible
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS liveness (
+    video_id             TEXT PRIMARY KEY,
+    first_seen           REAL NOT NULL,
+    last_checked         REAL,
+    last_status          TEXT,
+    consecutive_failures INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+class LivenessEntry(NamedTuple):
+    video_id: str
+    first_seen: float
+    last_checked: Optional[float]
+    last_status: Optional[str]
+    consecutive_failures: int
+
+
+def recheck_priority(entry: Optional[LivenessEntry], now: float) -> float:
+    """
+    How overdue a re-check is. Never-checked links come first (inf). Otherwise the
+    staleness is weighted by how likely the verdict is to be out of date: links that
+    keep failing to answer are probably dead and move up, while links confirmed dead
+    several times in a row move down.
+    """
+    if entry is None or entry.last_checked is None:
+        return math.inf
+    staleness = max(0.0, now - entry.last_checked)
+    if entry.last_status == ALIVE:
+        return staleness / ALIVE_RECHECK_AFTER
+    if entry.last_status == DEAD:
+        return staleness / (DEAD_RECHECK_AFTER * max(1, entry.consecutive_failures))
+    return staleness * (1 + entry.consecutive_failures) / UNKNOWN_RECHECK_AFTER
+
+
+class LivenessHistory:
+    """SQLite table of per-video check results, with a staleness-based re-check scheduler."""
+
+    def __init__(self, path: str = HISTORY_FILE):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def see(self, video_ids: Iterable[str], seen_at: Optional[float] = None) -> int:
+        """Register videos found in an input file; returns how many were new."""
+        seen_at = seen_at or time.time()
+        with self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO liveness (video_id, first_seen) VALUES (?, ?)",
+                ((video_id, seen_at) for video_id in video_ids),
+            )
+            return self._conn.total_changes - before
+
+    def record(self, results: Iterable[Tuple], checked_at: Optional[float] = None):
+        """
+        Store (video_id, status) or (video_id, status, checked_at) check results; anything
+        but ALIVE extends the failure streak. A per-result checked_at (e.g. when a cached
+        response was fetched) overrides `checked_at`, which defaults to now. A result no
+        newer than the stored check (the same cached answer seen again) is ignored.
+        """
+        checked_at = checked_at or time.time()
+        results = {(result[0], result[2] if len(result) > 2 and result[2] else checked_at): result[1]
+                   for result in results}
+        with self._conn:
+            self._conn.executemany("""
+                INSERT INTO liveness (video_id, first_seen, last_checked, last_status, consecutive_failures)
+                VALUES (?1, ?2, ?2, ?3, ?3 != 'alive')
+                ON CONFLICT (video_id) DO UPDATE SET
+                    last_checked = excluded.last_checked,
+                    last_status = excluded.last_status,
+                    consecutive_failures = CASE WHEN excluded.last_status = 'alive' THEN 0
+                                                ELSE consecutive_failures + 1 END
+                WHERE excluded.last_checked > COALESCE(liveness.last_checked, 0)
+            """, ((video_id, at, status) for (video_id, at), status in results.items()))
+
+    def get(self, video_id: str) -> Optional[LivenessEntry]:
+        row = self._conn.execute("SELECT * FROM liveness WHERE video_id = ?", (video_id,)).fetchone()
+        return LivenessEntry(*row) if row else None
+
+    def lookup(self, video_ids: Iterable[str]) -> Dict[str, LivenessEntry]:
+        """History entries for the given videos (unknown videos are left out)."""
+        with self._conn:
+            self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS wanted (video_id TEXT PRIMARY KEY)")
+            self._conn.execute("DELETE FROM wanted")
+            self._conn.executemany("INSERT OR IGNORE INTO wanted VALUES (?)", ((v,) for v in video_ids))
+            rows = self._conn.execute(
+                "SELECT l.* FROM liveness l JOIN wanted USING (video_id)"
+            ).fetchall()
+            self._conn.execute("DELETE FROM wanted")
+        return {row[0]: LivenessEntry(*row) for row in rows}
+
+    def schedule(self, video_ids: Iterable[str], budget: int = 0,
+                 now: Optional[float] = None) -> List[str]:
+        """
+        The videos to check this run, most overdue first: all of them if `budget` is 0,
+        otherwise the `budget` with the highest recheck_priority().
+        """
+        video_ids = list(dict.fromkeys(video_ids))
+        entries = self.lookup(video_ids)
+        now = now or time.time()
+
+        def priority(video_id):
+            return recheck_priority(entries.get(video_id), now)
+
+        if budget and budget < len(video_ids):
+            return heapq.nlargest(budget, video_ids, key=priority)
+        return sorted(video_ids, key=priority, reverse=True)
+
+    def stats(self) -> Counter:
+        """Count of videos by last verdict ("never checked" for new ones)."""
+        rows = self._conn.execute(
+            "SELECT COALESCE(last_status, 'never checked'), COUNT(*) FROM liveness GROUP BY 1"
+        ).fetchall()
+        return Counter(dict(rows))
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM liveness").fetchone()[0]
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-video liveness history for the oEmbed filter.")
+    parser.add_argument("--db", default=HISTORY_FILE, help=f"history file (default: {HISTORY_FILE})")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("stats", help="count videos by last verdict")
+
+    p = sub.add_parser("plan", help="show which links the filter would check next")
+    p.add_argument("links_file")
+    p.add_argument("--budget", type=int, default=0, help="max links to check (0 = all)")
+
+    args = parser.parse_args()
+
+    with LivenessHistory(args.db) as history:
+        if args.command == "stats":
+            counts = history.stats()
+            print(f"📊 {len(history)} videos in {args.db}")
+            for status in (ALIVE, DEAD, UNKNOWN, "never checked"):
+                print(f"  {status:<14} {counts[status]:>8}")
+            return
+
+        with open(args.links_file, "r", encoding="utf-8") as f:
+            ids = [video_id for video_id in map(extract_video_id, f) if video_id]
+        entries = history.lookup(ids)
+        now = time.time()
+        plan = history.schedule(ids, args.budget, now)
+        for video_id in plan:
+            entry = entries.get(video_id)
+            if entry is None or entry.last_checked is None:
+                print(f"{video_id}  never checked")
+            else:
+                age = (now - entry.last_checked) / 86400
+                print(f"{video_id}  {entry.last_status:<8} {age:6.1f} days ago  "
+                      f"priority {recheck_priority(entry, now):.2f}")
+        print(f"\n🗓️  {len(plan)} of {len(set(ids))} links would be checked")
+
+
+if __name__ == "__main__":
+    main()
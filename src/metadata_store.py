@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+SQLite store for video metadata, keyed by TikTok video ID.
+
+Each video's full metadata record is kept as JSON, with the fields people
+filter on (author, primary category, confidence, categories, hashtags) broken
+out into indexed columns and tables. Writes are upserts, so reruns only touch
+the videos they change, and queries read just the matching rows.
+
+    python metadata_store.py import tiktok_metadata_ml.json tiktok_metadata_ml.db
+    python metadata_store.py query tiktok_metadata_ml.db --category "Cooking & Food" --author chef
+    python metadata_store.py query tiktok_metadata_ml.db --max-confidence 0.15
+    python metadata_store.py export tiktok_metadata_ml.db tiktok_metadata_ml.jsonl
+
+Also home to the metadata file helpers the scripts share: write_metadata() and
+iter_metadata() handle SQLite stores, JSONL (one record per line, streamed) and
+the original pretty-printed JSON array.
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from oembed_cache import extract_video_id
+
+STORE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+JSONL_SUFFIXES = (".jsonl", ".ndjson")
+UPSERT_BATCH_SIZE = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id         TEXT PRIMARY KEY,
+    url              TEXT NOT NULL,
+    title            TEXT,
+    author_name      TEXT,
+    primary_category TEXT,
+    confidence       REAL,
+    record           TEXT NOT NULL,
+    updated_at       REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS video_categories (
+    video_id TEXT NOT NULL,
+    category TEXT NOT NULL,
+    rank     INTEGER NOT NULL,
+    score    REAL,
+    PRIMARY KEY (video_id, category)
+);
+CREATE TABLE IF NOT EXISTS video_hashtags (
+    video_id TEXT NOT NULL,
+    hashtag  TEXT NOT NULL,
+    PRIMARY KEY (video_id, hashtag)
+);
+CREATE INDEX IF NOT EXISTS idx_videos_author ON videos (author_name);
+CREATE INDEX IF NOT EXISTS idx_videos_primary ON videos (primary_category, confidence);
+CREATE INDEX IF NOT EXISTS idx_videos_confidence ON videos (confidence);
+CREATE INDEX IF NOT EXISTS idx_categories_category ON video_categories (category);
+CREATE INDEX IF NOT EXISTS idx_hashtags_hashtag ON video_hashtags (hashtag);
+"""
+
+
+def is_store_path(path: str) -> bool:
+    return Path(path).suffix.lower() in STORE_SUFFIXES
+
+
+def is_jsonl_path(path: str) -> bool:
+    return Path(path).suffix.lower() in JSONL_SUFFIXES
+
+
+def video_key(video: Dict) -> str:
+    """Store key for a video: its numeric video ID, or the URL if it has none."""
+    return extract_video_id(video["url"]) or video["url"]
+
+
+class MetadataStore:
+    """Video metadata in SQLite, with indexes on author, primary category, category and hashtag."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    # --- Writes ------------------------------------------------------------
+
+    def upsert(self, videos: Iterable[Dict], batch_size: int = UPSERT_BATCH_SIZE) -> int:
+        """Insert or update videos; returns how many were written."""
+        count = 0
+        batch = []
+        for video in videos:
+            batch.append(video)
+            if len(batch) >= batch_size:
+                count += self._upsert_batch(batch)
+                batch = []
+        if batch:
+            count += self._upsert_batch(batch)
+        return count
+
+    def _upsert_batch(self, videos: List[Dict]) -> int:
+        now = time.time()
+        keys = [video_key(video) for video in videos]
+        video_rows = []
+        category_rows = []
+        hashtag_rows = []
+        for key, video in zip(keys, videos):
+            video_rows.append((key, video["url"], video.get("title"), video.get("author_name"),
+                               video.get("primary_category"), video.get("confidence"),
+                               json.dumps(video, ensure_ascii=False), now))
+            scores = video.get("category_scores", {})
+            category_rows.extend((key, category, rank, scores.get(category))
+                                 for rank, category in enumerate(video.get("categories", [])))
+            hashtag_rows.extend((key, hashtag) for hashtag in video.get("hashtags", []))
+
+        with self._conn:
+            # Updating in place (rather than INSERT OR REPLACE) keeps each video's
+            # original rowid, so exports stay in first-seen order
+            self._conn.executemany("""
+                INSERT INTO videos (video_id, url, title, author_name, primary_category, confidence, record, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (video_id) DO UPDATE SET
+                    url = excluded.url, title = excluded.title, author_name = excluded.author_name,
+                    primary_category = excluded.primary_category, confidence = excluded.confidence,
+                    record = excluded.record, updated_at = excluded.updated_at
+            """, video_rows)
+            self._conn.executemany("DELETE FROM video_categories WHERE video_id = ?", [(k,) for k in keys])
+            self._conn.executemany("DELETE FROM video_hashtags WHERE video_id = ?", [(k,) for k in keys])
+            self._conn.executemany("INSERT OR IGNORE INTO video_categories VALUES (?, ?, ?, ?)", category_rows)
+            self._conn.executemany("INSERT OR IGNORE INTO video_hashtags VALUES (?, ?)", hashtag_rows)
+        return len(videos)
+
+    def delete(self, video_id: str):
+        with self._conn:
+            for table in ("videos", "video_categories", "video_hashtags"):
+                self._conn.execute(f"DELETE FROM {table} WHERE video_id = ?", (video_id,))
+
+    # --- Reads -------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+
+    def __contains__(self, video_id: str) -> bool:
+        return self._conn.execute("SELECT 1 FROM videos WHERE video_id = ?", (video_id,)).fetchone() is not None
+
+    def get(self, video_id: str) -> Optional[Dict]:
+        row = self._conn.execute("SELECT record FROM videos WHERE video_id = ?", (video_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def __iter__(self) -> Iterator[Dict]:
+        """Every video, in the order it was first stored."""
+        for (record,) in self._conn.execute("SELECT record FROM videos ORDER BY rowid"):
+            yield json.loads(record)
+
+    def query(self, category: Optional[str] = None, primary_category: Optional[str] = None,
+              author: Optional[str] = None, hashtag: Optional[str] = None,
+              min_confidence: Optional[float] = None, max_confidence: Optional[float] = None,
+              limit: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Videos matching every given filter, streamed from the indexes
+        (in index order, not insertion order).
+        category matches any of a video's categories; primary_category only its top one.
+        max_confidence is exclusive, min_confidence inclusive.
+        """
+        sql = "SELECT v.record FROM videos v"
+        where = []
+        params = []
+        if category is not None:
+            sql += " JOIN video_categories c ON c.video_id = v.video_id AND c.category = ?"
+            params.append(category)
+        if hashtag is not None:
+            sql += " JOIN video_hashtags h ON h.video_id = v.video_id AND h.hashtag = ?"
+            params.append(hashtag)
+        for clause, value in [("v.primary_category = ?", primary_category),
+                              ("v.author_name = ?", author),
+                              ("v.confidence >= ?", min_confidence),
+                              ("v.confidence < ?", max_confidence)]:
+            if value is not None:
+                where.append(clause)
+                params.append(value)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        for (record,) in self._conn.execute(sql, params):
+            yield json.loads(record)
+
+    def category_counts(self) -> Dict[str, int]:
+        """Videos per category, straight from the category index."""
+        return dict(self._conn.execute(
+            "SELECT category, COUNT(*) FROM video_categories GROUP BY category ORDER BY COUNT(*) DESC"))
+
+    def export_json(self, path: str):
+        """Write the whole store as a JSON array (or JSONL for a .jsonl path)."""
+        write_metadata(self, path)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _dump_json_array(videos: Iterable[Dict], f):
+    """Stream videos out as a JSON array, byte-for-byte what json.dump(indent=2) writes."""
+    first = True
+    for video in videos:
+        f.write("[\n  " if first else ",\n  ")
+        f.write(json.dumps(video, indent=2, ensure_ascii=False).replace("\n", "\n  "))
+        first = False
+    f.write("[]" if first else "\n]")
+
+
+def write_metadata(all_metadata: Iterable[Dict], filename: str):
+    """
+    Save metadata based on the filename: upserted into a SQLite store (.db/.sqlite),
+    one record per line (.jsonl), or a JSON array (anything else).
+    Records are written as they stream in; files are replaced atomically, so a
+    collection can be streamed from a file back into the same file.
+    """
+    if is_store_path(filename):
+        with MetadataStore(filename) as store:
+            store.upsert(all_metadata)
+        return
+
+    tmp_file = f"{filename}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        if is_jsonl_path(filename):
+            for video in all_metadata:
+                f.write(json.dumps(video, ensure_ascii=False))
+                f.write("\n")
+        else:
+            _dump_json_array(all_metadata, f)
+    os.replace(tmp_file, filename)
+
+
+def iter_metadata(filename: str) -> Iterator[Dict]:
+    """
+    Lazily yield the videos in a SQLite store, JSONL file or JSON file.
+    Stores and JSONL files are streamed record by record; a JSON array has to be
+    parsed whole before the first record comes out.
+    """
+    if is_store_path(filename):
+        if not Path(filename).exists():
+            raise FileNotFoundError(filename)
+        with MetadataStore(filename) as store:
+            yield from store
+    elif is_jsonl_path(filename):
+        with open(filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+    else:
+        with open(filename, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
+
+
+def load_metadata(filename: str) -> List[Dict]:
+    """Load metadata from a SQLite store, JSONL file or JSON file, based on the filename."""
+    if not Path(filename).exists():
+        raise FileNotFoundError(filename)
+    return list(iter_metadata(filename))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite store for TikTok video metadata.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("import", help="upsert a metadata JSON/JSONL file into a store")
+    p.add_argument("json_file")
+    p.add_argument("store_file")
+
+    p = sub.add_parser("export", help="write a store back out as metadata JSON (or JSONL for *.jsonl)")
+    p.add_argument("store_file")
+    p.add_argument("json_file")
+
+    p = sub.add_parser("query", help="list videos matching filters")
+    p.add_argument("store_file")
+    p.add_argument("--category", help="any assigned category")
+    p.add_argument("--primary-category", help="top ML category")
+    p.add_argument("--author")
+    p.add_argument("--hashtag")
+    p.add_argument("--min-confidence", type=float)
+    p.add_argument("--max-confidence", type=float, help="exclusive upper bound")
+    p.add_argument("--limit", type=int)
+
+    args = parser.parse_args()
+
+    if args.command == "import":
+        with MetadataStore(args.store_file) as store:
+            count = store.upsert(iter_metadata(args.json_file))
+            print(f"💾 Upserted {count} videos → {args.store_file} ({len(store)} total)")
+
+    elif args.command == "export":
+        with MetadataStore(args.store_file) as store:
+            store.export_json(args.json_file)
+            print(f"💾 Exported {len(store)} videos → {args.json_file}")
+
+    else:
+        with MetadataStore(args.store_file) as store:
+            start = time.perf_counter()
+            videos = list(store.query(category=args.category, primary_category=args.primary_category,
+                                      author=args.author, hashtag=args.hashtag,
+                                      min_confidence=args.min_confidence,
+                                      max_confidence=args.max_confidence, limit=args.limit))
+            elapsed = (time.perf_counter() - start) * 1000
+            for video in videos:
+                confidence = video.get("confidence")
+                suffix = f" ({confidence:.2%})" if confidence is not None else ""
+                print(f"{video['url']}")
+                print(f"  {video.get('title', '')} — {video.get('author_name', '')}"
+                      f" [{', '.join(video.get('categories', []))}]{suffix}")
+            print(f"\n🔎 {len(videos)} videos ({elapsed:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Persistent oEmbed response cache shared by the filter and categorizer scripts.
+Responses are stored in a small SQLite file keyed by TikTok video ID, so every
+stage (and every rerun) pays the network cost for a video at most once.
+Fetching itself lives in oembed_client.py.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+
+CACHE_FILE = "oembed_cache.db"
+CACHE_ENABLED = True
+OEMBED_URL = "https://www.tiktok.com/oembed"
+
+POSITIVE_TTL = 30 * 24 * 3600  # Keep working videos for 30 days
+NEGATIVE_TTL = 24 * 3600       # Re-check deleted/private videos after a day
+MAX_AGE = 90 * 24 * 3600       # Evict anything older than this
+MAX_ENTRIES = 200_000          # Evict oldest entries beyond this count
+
+
+class OEmbedResponse(NamedTuple):
+    status_code: int
+    data: Optional[Dict]
+    fetched_at: float
+    from_cache: bool
+
+
+def extract_video_id(url: str) -> Optional[str]:
+    """Return the numeric video ID from any TikTok video URL, or None."""
+    match = re.search(r'/video/(\d+)', url)
+    return match.group(1) if match else None
+
+
+def is_cacheable(status_code: int) -> bool:
+    """Only definitive answers are cached; throttling and server errors are not."""
+    return status_code == 200 or (400 <= status_code < 500 and status_code != 429)
+
+
+class OEmbedCache:
+    """SQLite-backed cache of oEmbed responses with positive/negative TTLs."""
+
+    def __init__(self, path: str = CACHE_FILE, positive_ttl: float = POSITIVE_TTL,
+                 negative_ttl: float = NEGATIVE_TTL, max_age: float = MAX_AGE,
+                 max_entries: int = MAX_ENTRIES):
+        self.path = path
+        self.positive_ttl = positive_ttl
+        self.negative_ttl = negative_ttl
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                   video_id TEXT PRIMARY KEY,
+                   status_code INTEGER NOT NULL,
+                   body TEXT,
+                   fetched_at REAL NOT NULL
+               )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_fetched_at ON responses (fetched_at)")
+        self._conn.commit()
+        self.evict()
+
+    def get(self, video_id: str) -> Optional[OEmbedResponse]:
+        """Return the cached response if it exists and is within its TTL."""
+        with self._lock:
+            row = self._lookup(video_id)
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+
+        status_code, body, fetched_at = row
+        data = json.loads(body) if status_code == 200 and body else None
+        return OEmbedResponse(status_code, data, fetched_at, True)
+
+    def contains(self, video_id: str) -> bool:
+        """True if a fresh entry exists; does not count towards hit/miss statistics."""
+        with self._lock:
+            return self._lookup(video_id) is not None
+
+    def fetched_at(self, video_id: str) -> Optional[float]:
+        """When a fresh entry was fetched, or None; does not count towards hit/miss statistics."""
+        with self._lock:
+            row = self._lookup(video_id)
+            return row[2] if row is not None else None
+
+    def _lookup(self, video_id: str):
+        row = self._conn.execute(
+            "SELECT status_code, body, fetched_at FROM responses WHERE video_id = ?",
+            (video_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        ttl = self.positive_ttl if row[0] == 200 else self.negative_ttl
+        if time.time() - row[2] > ttl:
+            return None
+        return row
+
+    def put(self, video_id: str, status_code: int, body: Optional[str], fetched_at: float = None):
+        """Store a response body (raw JSON text) for a video."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (video_id, status_code, body, fetched_at) "
+                "VALUES (?, ?, ?, ?)",
+                (video_id, status_code, body, fetched_at or time.time()),
+            )
+            self._conn.commit()
+
+    def evict(self) -> int:
+        """Drop entries older than max_age, then the oldest entries beyond max_entries."""
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM responses WHERE fetched_at < ?", (time.time() - self.max_age,)
+            )
+            removed = cur.rowcount
+            cur = self._conn.execute(
+                "DELETE FROM responses WHERE video_id IN ("
+                "  SELECT video_id FROM responses ORDER BY fetched_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+            removed += cur.rowcount
+            self._conn.commit()
+        return removed
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[OEmbedCache]:
+    """Return the process-wide cache, opening CACHE_FILE on first use."""
+    global _default_cache
+    if not CACHE_ENABLED:
+        return None
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = OEmbedCache(CACHE_FILE)
+        return _default_cache
+
+
+def is_cached(video_url: str) -> bool:
+    """True if a fresh response for this video is already in the cache."""
+    cache = get_cache()
+    video_id = extract_video_id(video_url)
+    if cache is None or video_id is None:
+        return False
+    return cache.contains(video_id)
+
@@ -0,0 +1,481 @@
+"""
+Shared oEmbed client used by the filter and categorizer scripts: one keep-alive
+connection pool, adaptive rate control, retries and liveness classification.
+
+Requests are paced by an AIMD limiter shared by every thread in the process:
+the rate doubles every second until TikTok first throttles us (429/503 or
+timeouts), then creeps up while it answers normally and is halved whenever it
+throttles again, honouring Retry-After. Throttled or failed
+requests are retried with jittered exponential backoff. Links that still can't
+be checked are reported as UNKNOWN rather than dead, and are never cached.
+
+Every request goes through one requests.Session, so TLS handshakes are paid
+once per pooled connection rather than once per request. ClientStats records
+a latency histogram and how many connections were opened vs reused.
+
+probe() is a liveness-only check that downloads as little as possible: a HEAD
+request (status line and headers, no embed HTML), or a streamed GET whose body
+is never parsed if the endpoint refuses HEAD. Only answers it can't classify
+fall back to a full fetch.
+"""
+
+import bisect
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+import oembed_cache
+from oembed_cache import OEmbedResponse, extract_video_id, get_cache, is_cacheable
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/605.1.15 (KHTML, like Gecko) Version/17.0 Safari/605.1.15"
+    ),
+    "Accept": "application/json",
+}
+
+POOL_SIZE = 32        # Keep-alive connections kept open to the oEmbed host
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+INITIAL_RATE = 4.0    # Requests per second to start at
+MIN_RATE = 0.2        # Never slow down below this
+MAX_RATE = 20.0       # Never speed up beyond this
+RATE_INCREASE = 0.5   # Additive increase: requests/second gained per second without throttling
+RATE_DECREASE = 0.5   # Multiplicative decrease applied when throttled
+
+MAX_RETRIES = 4       # Extra attempts after a throttled/failed request
+BACKOFF_BASE = 1.0    # Seconds; attempt n waits up to BACKOFF_BASE * 2**n
+BACKOFF_MAX = 60.0
+REQUEST_TIMEOUT = 10
+
+THROTTLE_STATUSES = {429, 503}            # Slow everyone down
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+PROBE_DEAD_STATUSES = {400, 404, 410}  # HEAD answers trusted as "deleted/private"
+PROBE_UNSUPPORTED = {405, 501}         # Endpoint refuses HEAD: probe with a streamed GET instead
+PROBE_VERIFY = 3       # Confirm this many HEAD verdicts with a full fetch before trusting HEAD
+PROBE_SPOT_CHECK = 0.02  # ...then keep confirming this fraction of them at random
+PROBE_DRAIN_BYTES = 16 * 1024  # Streamed GET bodies up to this size are read so the connection is reused
+
+ALIVE = "alive"
+DEAD = "dead"
+UNKNOWN = "unknown"  # Throttled, timed out or server error: no verdict
+
+
+def normalize_tiktok_url(url: str) -> str:
+    """Convert tiktokv.com links to canonical tiktok.com format."""
+    video_id = extract_video_id(url)
+    if video_id:
+        return f"https://www.tiktok.com/@_/video/{video_id}"
+    return url
+
+
+def make_session(pool_size: int = POOL_SIZE):
+    """Create a keep-alive session whose connection pool fits `pool_size` concurrent requests."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    # One host, so one pool; retries are handled by OEmbedClient, not urllib3
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    from email.utils import parsedate_to_datetime
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, retry_after: Optional[float] = None) -> float:
+    """Full-jitter exponential backoff for a retry, unless the server said how long to wait."""
+    if retry_after is not None:
+        return min(retry_after, BACKOFF_MAX)
+    return random.uniform(0, min(BACKOFF_MAX, BACKOFF_BASE * 2 ** attempt))
+
+
+def liveness(status_code: Optional[int]) -> str:
+    """ALIVE for 200, DEAD for definitive answers (400/404/...), UNKNOWN for the rest."""
+    if status_code == 200:
+        return ALIVE
+    if status_code is not None and is_cacheable(status_code):
+        return DEAD
+    return UNKNOWN
+
+
+def release(response):
+    """
+    Finish with a streamed response without parsing it. Small bodies are read so the
+    keep-alive connection goes back to the pool (cheaper than a new TLS handshake);
+    larger ones are cut off by closing the connection.
+    """
+    length = response.headers.get("Content-Length", "")
+    if length.isdigit() and int(length) <= PROBE_DRAIN_BYTES:
+        response.raw.drain_conn()
+        response.raw.release_conn()
+    else:
+        response.close()
+
+
+def pool_counts(session):
+    """(requests sent, new connections opened) over one session's connection pools."""
+    sent = opened = 0
+    for adapter in set(session.adapters.values()):
+        for key in adapter.poolmanager.pools.keys():
+            pool = adapter.poolmanager.pools.get(key)
+            if pool is not None:
+                sent += pool.num_requests
+                opened += pool.num_connections
+    return sent, opened
+
+
+class AdaptiveRateLimiter:
+    """
+    Thread-safe AIMD pacer with slow start. acquire() blocks until the next
+    request slot; on_success() / on_throttle() feed back what the server said.
+    """
+
+    def __init__(self, rate: float = INITIAL_RATE, min_rate: float = MIN_RATE,
+                 max_rate: float = MAX_RATE, increase: float = RATE_INCREASE,
+                 decrease: float = RATE_DECREASE):
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.rate = min(max(rate, min_rate), max_rate)
+        self.increase = increase
+        self.decrease = decrease
+        self.throttled = 0
+        self.slow_start = True  # Until the first throttle signal
+        self._next_slot = time.monotonic()
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1 / self.rate
+        if slot > now:
+            time.sleep(slot - now)
+
+    def on_success(self):
+        with self._lock:
+            # Spread the increase over a second's worth of requests
+            step = 1.0 if self.slow_start else self.increase / self.rate
+            self.rate = min(self.max_rate, self.rate + step)
+
+    def on_throttle(self, retry_after: Optional[float] = None):
+        with self._lock:
+            now = time.monotonic()
+            self.throttled += 1
+            self.slow_start = False
+            # One burst of 429s from requests already in flight counts as one signal
+            if now - self._last_decrease >= 1 / self.rate:
+                self.rate = max(self.min_rate, self.rate * self.decrease)
+                self._last_decrease = now
+            if retry_after:
+                self._next_slot = max(self._next_slot, now + min(retry_after, BACKOFF_MAX))
+
+
+class ClientStats:
+    """Thread-safe request latency histogram (LATENCY_BUCKETS_MS upper bounds, plus overflow)."""
+
+    def __init__(self, buckets_ms=LATENCY_BUCKETS_MS):
+        self.buckets_ms = list(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.requests = 0
+        self.total_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets_ms, seconds * 1000)] += 1
+            self.requests += 1
+            self.total_seconds += seconds
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Upper bound (ms) of the bucket holding the p-th percentile; inf if it overflowed."""
+        if not self.requests:
+            return None
+        rank = p / 100 * self.requests
+        seen = 0
+        for bound, count in zip(self.buckets_ms + [float("inf")], self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def histogram(self) -> List[str]:
+        """One text line per non-empty bucket."""
+        lines = []
+        lower = 0
+        for bound, count in zip(self.buckets_ms + [float("inf")], self.counts):
+            if count:
+                bar = "█" * max(1, round(40 * count / self.requests))
+                label = f"{lower}-{bound} ms" if bound != float("inf") else f">{lower} ms"
+                lines.append(f"{label:>14} {count:>7} {bar}")
+            lower = bound
+        return lines
+
+
+class OEmbedClient:
+    """Cache-aware oEmbed fetcher sharing one connection pool and AdaptiveRateLimiter across threads."""
+
+    def __init__(self, limiter: Optional[AdaptiveRateLimiter] = None, max_retries: int = MAX_RETRIES,
+                 timeout: float = REQUEST_TIMEOUT, pool_size: int = POOL_SIZE):
+        self.limiter = limiter or AdaptiveRateLimiter()
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.retries = 0
+        self.probes = 0
+        self.probe_fallbacks = 0
+        self.probe_method = "HEAD"  # Downgraded to "GET" if the endpoint refuses or misreports HEAD
+        self._head_verifications = 0
+        self._counts_lock = threading.Lock()  # Guards the counters above and _head_verifications
+        self.stats = ClientStats()
+        self._session = None
+        self._session_pool_size = 0
+        self._session_lock = threading.Lock()
+        self._in_flight = 0              # Requests currently using the shared session
+        self._retired_counts = (0, 0)    # connection_counts() of sessions replaced by a bigger pool
+
+    @property
+    def session(self):
+        """The shared keep-alive session, created on first use."""
+        with self._session_lock:
+            return self._current_session()
+
+    def _current_session(self):
+        # Called with _session_lock held. A smaller pool is only swapped out while no
+        # request is using it; the old session is dropped, not closed under anyone.
+        if self._session is None or (self._in_flight == 0 and self._session_pool_size < self.pool_size):
+            if self._session is not None:
+                sent, opened = pool_counts(self._session)
+                self._retired_counts = (self._retired_counts[0] + sent, self._retired_counts[1] + opened)
+            self._session, self._session_pool_size = make_session(self.pool_size), self.pool_size
+        return self._session
+
+    def ensure_pool_size(self, pool_size: int):
+        """
+        Grow the connection pool so `pool_size` threads can each hold a connection. The
+        bigger session replaces the current one as soon as no request is in flight.
+        """
+        with self._session_lock:
+            if pool_size > self.pool_size:
+                self.pool_size = pool_size
+                if self._session is not None:
+                    self._current_session()
+
+    def _checkout(self):
+        with self._session_lock:
+            session = self._current_session()
+            self._in_flight += 1
+            return session
+
+    def _checkin(self):
+        with self._session_lock:
+            self._in_flight -= 1
+
+    def connection_counts(self):
+        """(requests sent, new connections opened) over the session's pools, including replaced ones."""
+        with self._session_lock:
+            sent, opened = pool_counts(self._session) if self._session is not None else (0, 0)
+            return self._retired_counts[0] + sent, self._retired_counts[1] + opened
+
+    def summary(self) -> str:
+        sent, opened = self.connection_counts()
+        reused = 1 - opened / sent if sent else 0
+        p50, p90, p99 = (self.stats.percentile(p) for p in (50, 90, 99))
+        latency = f"latency p50≤{p50} ms, p90≤{p90} ms, p99≤{p99} ms" if self.stats.requests else "no requests"
+        probes = (f"; {self.probes} {self.probe_method} probes, {self.probe_fallbacks} needed a full fetch"
+                  if self.probes else "")
+        return (f"{self.stats.requests} requests over {opened} connections ({reused:.0%} reused), "
+                f"{latency}; rate {self.limiter.rate:.1f} req/s, "
+                f"{self.limiter.throttled} throttled, {self.retries} retries{probes}")
+
+    def close(self):
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+
+    def fetch(self, normalized_url: str, headers: Optional[Dict] = None, session=None) -> OEmbedResponse:
+        """
+        Fetch oEmbed data for a normalized video URL, serving it from the cache when possible.
+
+        Throttling, server errors and network errors are retried; if they persist the
+        last response is returned (or the last network error raised). Only definitive
+        answers are cached.
+        """
+        cache = get_cache()
+        video_id = extract_video_id(normalized_url)
+
+        if cache is not None and video_id is not None:
+            cached = cache.get(video_id)
+            if cached is not None:
+                return cached
+
+        r = self._send("GET", normalized_url, headers, session)
+        fetched_at = time.time()
+        data = r.json() if r.status_code == 200 else None
+
+        if cache is not None and video_id is not None and is_cacheable(r.status_code):
+            cache.put(video_id, r.status_code, r.text, fetched_at)
+
+        return OEmbedResponse(r.status_code, data, fetched_at, False)
+
+    def _send(self, method: str, normalized_url: str, headers: Optional[Dict] = None, session=None,
+              stream: bool = False):
+        """
+        One request paced by the limiter. Throttling, server errors and network errors are
+        retried; if they persist the last response is returned (or the last network error raised).
+        """
+        import requests  # Deferred: tools that only read cached/saved data never import it
+        shared = session is None
+        session = self._checkout() if shared else session
+        try:
+            send = session.head if method == "HEAD" else session.get
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    self._count("retries")
+                self.limiter.acquire()
+                start = time.perf_counter()
+                try:
+                    r = send(
+                        oembed_cache.OEMBED_URL,
+                        params={"url": normalized_url},
+                        headers=headers,
+                        timeout=self.timeout,
+                        stream=stream,
+                    )
+                except (requests.Timeout, requests.ConnectionError):
+                    self.stats.record(time.perf_counter() - start)
+                    self.limiter.on_throttle()
+                    if attempt == self.max_retries:
+                        raise
+                    time.sleep(backoff_delay(attempt))
+                    continue
+
+                self.stats.record(time.perf_counter() - start)
+                if r.status_code not in RETRY_STATUSES:
+                    self.limiter.on_success()
+                    break
+                retry_after = parse_retry_after(r.headers.get("Retry-After"))
+                if r.status_code in THROTTLE_STATUSES:
+                    self.limiter.on_throttle(retry_after)
+                if attempt < self.max_retries:
+                    if stream:
+                        release(r)
+                    time.sleep(backoff_delay(attempt, retry_after))
+        finally:
+            if shared:
+                self._checkin()
+        return r
+
+    def probe(self, normalized_url: str, headers: Optional[Dict] = None, session=None) -> str:
+        """
+        ALIVE, DEAD or UNKNOWN for one video without downloading its oEmbed body.
+
+        Cached responses answer for free. Otherwise a HEAD request is sent; the first
+        PROBE_VERIFY HEAD verdicts and a random PROBE_SPOT_CHECK share of the later ones
+        are confirmed with a full fetch, and if one disagrees (or the endpoint refuses
+        HEAD) the client switches to streamed GETs whose body is discarded unread. HEAD answers that don't map to a verdict fall back to fetch().
+        Probe results are never cached as alive, since they carry no metadata.
+        """
+        cache = get_cache()
+        video_id = extract_video_id(normalized_url)
+        if cache is not None and video_id is not None:
+            cached = cache.get(video_id)
+            if cached is not None:
+                return liveness(cached.status_code)
+
+        self._count("probes")
+        try:
+            if self.probe_method == "HEAD":
+                r = self._send("HEAD", normalized_url, headers, session)
+                if r.status_code in PROBE_UNSUPPORTED:
+                    self.probe_method = "GET"
+                elif r.status_code == 200 or r.status_code in PROBE_DEAD_STATUSES:
+                    status = liveness(r.status_code)
+                    if not self._reserve_verification():
+                        if status == DEAD:
+                            self._cache_dead(video_id, r.status_code)
+                        return status
+                    # Make sure HEAD means the same thing as GET on this endpoint
+                    self._count("probe_fallbacks")
+                    confirmed = liveness(self.fetch(normalized_url, headers, session).status_code)
+                    if confirmed == UNKNOWN:
+                        with self._counts_lock:
+                            self._head_verifications -= 1  # Didn't count; verify another one
+                    elif confirmed != status:
+                        self.probe_method = "GET"
+                    return confirmed
+                elif r.status_code not in RETRY_STATUSES:
+                    # Redirects, auth errors...: only a full fetch can tell
+                    self._count("probe_fallbacks")
+                    return self.check(normalized_url, headers, session)
+                else:
+                    return UNKNOWN
+
+            r = self._send("GET", normalized_url, headers, session, stream=True)
+            release(r)
+            status = liveness(r.status_code)
+            if status == DEAD:
+                self._cache_dead(video_id, r.status_code)
+            return status
+        except Exception:
+            return UNKNOWN
+
+    def _reserve_verification(self) -> bool:
+        """True if this HEAD verdict gets confirmed: the first PROBE_VERIFY, then a random PROBE_SPOT_CHECK."""
+        with self._counts_lock:
+            if self._head_verifications >= PROBE_VERIFY:
+                return random.random() < PROBE_SPOT_CHECK
+            self._head_verifications += 1
+            return True
+
+    def _count(self, counter: str):
+        with self._counts_lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _cache_dead(self, video_id: Optional[str], status_code: int):
+        cache = get_cache()
+        if cache is not None and video_id is not None:
+            cache.put(video_id, status_code, None)
+
+    def check(self, normalized_url: str, headers: Optional[Dict] = None, session=None) -> str:
+        """ALIVE, DEAD or UNKNOWN for one video."""
+        try:
+            return liveness(self.fetch(normalized_url, headers, session).status_code)
+        except Exception:
+            return UNKNOWN
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_client() -> OEmbedClient:
+    """Return the process-wide client, so every fetcher shares one rate limiter."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = OEmbedClient()
+        return _default_client
+
+
+def fetch_oembed(normalized_url: str, headers: Optional[Dict] = None, session=None) -> OEmbedResponse:
+    """Fetch through the process-wide client (see OEmbedClient.fetch)."""
+    return get_client().fetch(normalized_url, headers, session)
@@ -1,33 +1,299 @@
+"""
+Open TikTok links in browser tabs a batch at a time, starting from the bottom
+of the file.
+
+The file is read backwards in blocks, so even huge lists start instantly.
+Links the oEmbed cache or the liveness history already know are dead are
+skipped. A cursor file next to the links file remembers which batch you
+reached, so a restart carries on from there, and links appended since then
+come first. While you review a batch, the oEmbed metadata for the next one is
+fetched in the background: its titles are shown, and links that turn out to be
+dead never get a tab.
+"""
+
+import argparse
+import hashlib
+import json
+import os
 import webbrowser
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import liveness_history
+from liveness_history import LivenessHistory
+from oembed_cache import extract_video_id, get_cache
+from oembed_client import DEAD, HEADERS, UNKNOWN, liveness, normalize_tiktok_url
+from pipeline import fetch_raw_record
 
 # --- CONFIGURATION ---
 BATCH_SIZE = 10
 LINKS_FILE = "uncategorized_formatted.txt"
+SKIP_DEAD = True        # Don't open links already known to be dead
+PREFETCH = True         # Fetch the next batch's oEmbed metadata while you review
+PREFETCH_THREADS = 4
+PREFETCH_WAIT = 5.0     # Seconds to wait for an unfinished prefetch before opening anyway
+READ_BLOCK = 1 << 16    # Bytes read per step while walking the file backwards
+CURSOR_SUFFIX = ".cursor"
 # ----------------------
 
-def open_links_in_batches(file_path):
-    # Read all links from the file (bottom to top)
-    with open(file_path, 'r', encoding='utf-8') as f:
-        links = [line.strip() for line in f if line.strip()][::-1]
-
-    total = len(links)
-    print(f"Loaded {total} TikTok links (reading from bottom to top).\n")
-
-    # Process in batches
-    for i in range(0, total, BATCH_SIZE):
-        batch = links[i:i + BATCH_SIZE]
-        batch_num = i // BATCH_SIZE + 1
-        print(f"\nOpening batch {batch_num}:")
-        for link in batch:
-            print(f"  - {link}")
-            webbrowser.open_new_tab(link)
-
-        remaining = total - (i + BATCH_SIZE)
-        if remaining > 0:
-            print(f"\n{remaining} links remaining.")
-            input("Press Enter to open the next batch...")
-        else:
-            print("\nAll links have been opened!")
+
+def iter_lines_reversed(file_path: str, start: int, end: int,
+                        block_size: int = READ_BLOCK) -> Iterator[Tuple[int, str]]:
+    """Yield (byte offset, line) for the non-empty lines in bytes [start, end) of a file, last line first."""
+    with open(file_path, 'rb') as f:
+        pos = end
+        head = b""
+        while pos > start:
+            size = min(block_size, pos - start)
+            pos -= size
+            f.seek(pos)
+            parts = (f.read(size) + head).split(b"\n")
+            head = parts[0]  # May continue in the previous block
+            offset = pos + len(parts[0]) + 1
+            offsets = []
+            for part in parts[1:]:
+                offsets.append(offset)
+                offset += len(part) + 1
+            for offset, part in zip(reversed(offsets), reversed(parts[1:])):
+                line = part.strip()
+                if line:
+                    yield offset, line.decode('utf-8', errors='replace')
+        line = head.strip()
+        if line:
+            yield start, line.decode('utf-8', errors='replace')
+
+
+def count_lines(file_path: str, ranges: List[List[int]], block_size: int = 1 << 20) -> int:
+    """Number of newline-terminated lines in the given byte ranges, without holding them in memory."""
+    count = 0
+    with open(file_path, 'rb') as f:
+        for start, end in ranges:
+            f.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                chunk = f.read(min(block_size, remaining))
+                if not chunk:
+                    break
+                count += chunk.count(b"\n")
+                remaining -= len(chunk)
+    return count
+
+
+def cursor_path(file_path: str) -> str:
+    return file_path + CURSOR_SUFFIX
+
+
+def file_digest(file_path: str, length: int, block_size: int = 1 << 20) -> str:
+    """SHA-1 of the first `length` bytes of a file."""
+    digest = hashlib.sha1()
+    with open(file_path, 'rb') as f:
+        while length > 0:
+            chunk = f.read(min(block_size, length))
+            if not chunk:
+                break
+            digest.update(chunk)
+            length -= len(chunk)
+    return digest.hexdigest()
+
+
+def load_cursor(file_path: str, restart: bool = False) -> Dict:
+    """
+    Byte ranges of the file still to open (each read bottom to top) and the last
+    batch number. Links appended since the last run are queued first. If the part
+    of the file the cursor covers changed (rewritten, shrunk), everything starts over.
+    """
+    size = os.path.getsize(file_path)
+    fresh = {"size": size, "sha1": file_digest(file_path, size), "pending": [[0, size]], "batch": 0}
+    if restart:
+        return fresh
+    try:
+        with open(cursor_path(file_path), 'r', encoding='utf-8') as f:
+            cursor = json.load(f)
+        old_size, old_digest = cursor["size"], cursor["sha1"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return fresh
+    if old_size > size:
+        return fresh
+    if size > old_size:
+        if file_digest(file_path, old_size) != old_digest:
+            return fresh
+        cursor["pending"].insert(0, [old_size, size])
+        cursor.update(size=size, sha1=fresh["sha1"])
+    elif fresh["sha1"] != old_digest:
+        return fresh
+    return cursor
+
+
+def save_cursor(file_path: str, cursor: Dict):
+    tmp_path = cursor_path(file_path) + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cursor, f)
+    os.replace(tmp_path, cursor_path(file_path))
+
+
+def pending_after(ranges: List[List[int]], position: Optional[Tuple[int, int]]) -> List[List[int]]:
+    """What is left of `ranges` once everything up to `position` (range index, line offset) is done."""
+    if position is None:
+        return [list(r) for r in ranges]
+    index, offset = position
+    left = [[ranges[index][0], offset]] if offset > ranges[index][0] else []
+    return left + [list(r) for r in ranges[index + 1:]]
+
+
+def known_status(link: str, history: Optional[LivenessHistory]) -> Tuple[str, Optional[Dict]]:
+    """(status, oEmbed data) from the cache or liveness history only; never touches the network."""
+    video_id = extract_video_id(link)
+    if video_id is None:
+        return UNKNOWN, None
+    cache = get_cache()
+    cached = cache.get(video_id) if cache is not None else None
+    if cached is not None:
+        return liveness(cached.status_code), cached.data
+    entry = history.get(video_id) if history is not None else None
+    return (entry.last_status or UNKNOWN) if entry else UNKNOWN, None
+
+
+def describe(link: str, data: Optional[Dict]) -> str:
+    if not data:
+        return f"  - {link}"
+    return f"  - {link}  {(data.get('title') or '')[:60]} (@{data.get('author_name', '?')})"
+
+
+class BatchReader:
+    """Pulls batches off the reversed link stream, dropping links already known to be dead."""
+
+    def __init__(self, file_path: str, ranges: List[List[int]], batch_size: int,
+                 history: Optional[LivenessHistory], skip_dead: bool = SKIP_DEAD):
+        self.ranges = ranges
+        self.batch_size = batch_size
+        self.history = history
+        self.skip_dead = skip_dead
+        self.consumed = 0
+        self.skipped = 0
+        self._stream = ((index, offset, link) for index, (start, end) in enumerate(ranges)
+                        for offset, link in iter_lines_reversed(file_path, start, end))
+
+    def next_batch(self):
+        """Returns ([(link, cached data)], position of the last line read) — an empty list at the end."""
+        batch, position = [], None
+        for index, offset, link in self._stream:
+            position = (index, offset)
+            self.consumed += 1
+            status, data = known_status(link, self.history)
+            if self.skip_dead and status == DEAD:
+                self.skipped += 1
+                continue
+            batch.append((link, data))
+            if len(batch) == self.batch_size:
+                break
+        return batch, position
+
+
+def prefetch(executor: Optional[ThreadPoolExecutor], batch):
+    """Start fetching oEmbed data for the links that don't have cached data yet."""
+    if executor is None:
+        return {}
+    return {link: executor.submit(fetch_raw_record, link, normalize_tiktok_url(link), HEADERS)
+            for link, data in batch if data is None}
+
+
+def resolve_prefetch(batch, futures, history: Optional[LivenessHistory]):
+    """Merge finished prefetches into the batch; returns (batch without dead links, dead count)."""
+    if futures:
+        wait(futures.values(), timeout=PREFETCH_WAIT)
+    kept, verdicts = [], []
+    for link, data in batch:
+        future = futures.get(link)
+        if future is not None and future.done():
+            record = future.result()
+            status = liveness(record["status_code"])
+            video_id = extract_video_id(link)
+            if video_id and status != UNKNOWN and not record["from_cache"]:
+                verdicts.append((video_id, status))
+            if status == DEAD:
+                continue
+            data = record["data"]
+        kept.append((link, data))
+    if history is not None and verdicts:
+        history.record(verdicts)
+    return kept, len(batch) - len(kept)
+
+
+def open_links_in_batches(file_path, batch_size=BATCH_SIZE, prefetch_metadata=PREFETCH, restart=False):
+    cursor = load_cursor(file_path, restart)
+    ranges = cursor["pending"]
+    if not any(end > start for start, end in ranges):
+        print(f"All links in {file_path} have been opened already (use --restart to start over).")
+        return
+
+    total = count_lines(file_path, ranges)
+    batch_num = cursor["batch"]
+    resumed = " (resuming)" if batch_num else ""
+    print(f"About {total} TikTok links to go in {file_path}, reading from bottom to top{resumed}.\n")
+
+    history = None
+    if liveness_history.HISTORY_ENABLED and os.path.exists(liveness_history.HISTORY_FILE):
+        history = LivenessHistory()
+    reader = BatchReader(file_path, ranges, batch_size, history)
+    executor = ThreadPoolExecutor(max_workers=PREFETCH_THREADS) if prefetch_metadata else None
+
+    found_dead = 0
+    try:
+        batch, position = reader.next_batch()
+        futures = prefetch(executor, batch)
+        while batch:
+            batch, dead = resolve_prefetch(batch, futures, history)
+            found_dead += dead
+            done_position = position
+            upcoming, position = reader.next_batch()
+            futures = prefetch(executor, upcoming)  # Fetched while the current batch is reviewed
+            if not upcoming:
+                done_position = position or done_position  # Trailing dead links are done too
+
+            if batch:
+                batch_num += 1
+                print(f"\nOpening batch {batch_num}:")
+                if dead:
+                    print(f"  (skipped {dead} links that turned out to be dead)")
+                for link, data in batch:
+                    print(describe(link, data))
+                    webbrowser.open_new_tab(link)
+            # Saved before prompting, so stopping at the prompt doesn't reopen these tabs
+            cursor.update(pending=pending_after(ranges, done_position), batch=batch_num)
+            save_cursor(file_path, cursor)
+            if not upcoming:
+                print("\nAll links have been opened!")
+            elif batch:
+                print(f"\n~{total - reader.consumed + len(upcoming)} links remaining.")
+                input("Press Enter to open the next batch...")
+            batch = upcoming
+    except KeyboardInterrupt:
+        print(f"\nStopped. The next run starts at batch {cursor['batch'] + 1}.")
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if history is not None:
+            history.close()
+
+    if reader.skipped or found_dead:
+        print(f"Skipped {reader.skipped} links already known to be dead "
+              f"and {found_dead} that turned out to be dead.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Open TikTok links in browser tabs, a batch at a time.")
+    parser.add_argument("links_file", nargs="?", default=LINKS_FILE,
+                        help=f"text file with one link per line (default: {LINKS_FILE})")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help=f"tabs opened per batch (default: {BATCH_SIZE})")
+    parser.add_argument("--restart", action="store_true",
+                        help="ignore the saved cursor and start again from the bottom of the file")
+    parser.add_argument("--no-prefetch", action="store_true",
+                        help="don't fetch oEmbed metadata in the background (offline use)")
+    args = parser.parse_args()
+
+    open_links_in_batches(args.links_file, args.batch_size, not args.no_prefetch, args.restart)
+
 
 if __name__ == "__main__":
-    open_links_in_batches(LINKS_FILE)
+    main()
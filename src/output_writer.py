@@ -0,0 +1,143 @@
+"""
+Buffered output writer for the organized folders.
+Files are rendered in memory, then written in one go from a thread pool.
+Files whose content hasn't changed since the last run are skipped, and the
+whole output can instead be packed into a single zip archive or SQLite file.
+"""
+
+import hashlib
+import json
+import sqlite3
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Tuple
+
+OUTPUT_FORMATS = ("files", "zip", "sqlite")
+WRITE_WORKERS = 8
+MANIFEST_FILE = ".manifest.json"   # Content hashes of the files written last run
+ARCHIVE_FILE = "organized.zip"
+DATABASE_FILE = "organized.db"
+
+
+def content_hash(content: str) -> str:
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+class OutputWriter:
+    """
+    Collects rendered files (relative path -> text) and writes them on close().
+
+    files:  one file per entry under output_dir, written in parallel, unchanged files skipped
+    zip:    everything in output_dir/organized.zip, rewritten only if any content changed
+    sqlite: everything in output_dir/organized.db (files table), only changed rows updated
+    """
+
+    def __init__(self, output_dir: str, output_format: str = "files", workers: int = WRITE_WORKERS):
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format {output_format!r} (expected one of {OUTPUT_FORMATS})")
+        self.output_dir = Path(output_dir)
+        self.output_format = output_format
+        self.workers = workers
+        self._files: Dict[str, str] = {}
+        self.written = 0
+        self.unchanged = 0
+
+    def add(self, relative_path: str, content: str):
+        """Queue a file; a later add() with the same path replaces it."""
+        self._files[relative_path] = content
+
+    def close(self) -> Tuple[int, int]:
+        """Write everything queued; returns (files written, files skipped as unchanged)."""
+        if self._files:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+            {"files": self._write_files,
+             "zip": self._write_zip,
+             "sqlite": self._write_sqlite}[self.output_format]()
+            self._files = {}
+        return self.written, self.unchanged
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Formats -----------------------------------------------------------
+
+    def _load_manifest(self) -> Dict[str, str]:
+        try:
+            with open(self.output_dir / MANIFEST_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_manifest(self, manifest: Dict[str, str]):
+        with open(self.output_dir / MANIFEST_FILE, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, sort_keys=True)
+
+    def _write_files(self):
+        manifest = self._load_manifest()
+        changed = {}
+        for path, content in self._files.items():
+            digest = content_hash(content)
+            if manifest.get(path) == digest and (self.output_dir / path).exists():
+                self.unchanged += 1
+            else:
+                changed[path] = content
+                manifest[path] = digest
+
+        for directory in {(self.output_dir / path).parent for path in changed}:
+            directory.mkdir(parents=True, exist_ok=True)
+
+        def write(item):
+            path, content = item
+            with open(self.output_dir / path, 'w', encoding='utf-8') as f:
+                f.write(content)
+
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            list(pool.map(write, changed.items()))
+        self.written += len(changed)
+        self._save_manifest(manifest)
+
+    def _write_zip(self):
+        # A zip can't be updated in place, so it is rebuilt only when its contents differ
+        archive = self.output_dir / ARCHIVE_FILE
+        manifest = self._load_manifest()
+        digest = hashlib.sha1()
+        for path in sorted(self._files):
+            digest.update(path.encode('utf-8') + b"\0" + content_hash(self._files[path]).encode())
+        if manifest.get(ARCHIVE_FILE) == digest.hexdigest() and archive.exists():
+            self.unchanged += len(self._files)
+            return
+
+        with zipfile.ZipFile(archive, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for path in sorted(self._files):
+                zf.writestr(path, self._files[path])
+        self.written += len(self._files)
+        manifest[ARCHIVE_FILE] = digest.hexdigest()
+        self._save_manifest(manifest)
+
+    def _write_sqlite(self):
+        conn = sqlite3.connect(self.output_dir / DATABASE_FILE)
+        try:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path    TEXT PRIMARY KEY,
+                    content TEXT NOT NULL,
+                    sha1    TEXT NOT NULL
+                )
+            """)
+            existing = dict(conn.execute("SELECT path, sha1 FROM files"))
+            rows = []
+            for path, content in self._files.items():
+                digest = content_hash(content)
+                if existing.get(path) == digest:
+                    self.unchanged += 1
+                else:
+                    rows.append((path, content, digest))
+            with conn:
+                conn.executemany("INSERT OR REPLACE INTO files (path, content, sha1) VALUES (?, ?, ?)", rows)
+            self.written += len(rows)
+        finally:
+            conn.close()
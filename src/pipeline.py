@@ -0,0 +1,220 @@
+"""
+Two-stage fetch → categorize pipeline shared by both categorizer scripts.
+
+The fetch stage runs oEmbed requests on a pool of worker threads and streams
+raw records; the categorize stage consumes them in batches as they arrive.
+Requests are paced by the shared oEmbed client's adaptive rate limiter.
+Bounded queues between the stages apply backpressure, so fetching never runs
+far ahead of categorization. Either stage can be used on its own: feeding
+saved metadata into categorize_stage() never touches the network.
+"""
+
+import queue
+import threading
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from oembed_client import fetch_oembed
+
+FETCH_CONCURRENCY = 2  # Worker threads fetching from oEmbed
+BATCH_SIZE = 64        # Max records handed to the categorizer at once
+QUEUE_SIZE = 256       # Max records buffered between stages
+
+_DONE = object()
+
+
+class _FeedError:
+    """Outbox marker carrying the exception the `links` iterable raised."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+def failure_record(video_url: str, error: Exception) -> Dict:
+    """Raw record for a link whose fetch raised."""
+    return {
+        "url": video_url,
+        "normalized_url": video_url,
+        "status_code": None,
+        "data": None,
+        "error": str(error) or type(error).__name__,
+        "from_cache": False,
+    }
+
+
+def fetch_raw_record(video_url: str, normalized_url: str, headers: Dict) -> Dict:
+    """Fetch one video's raw oEmbed response as a plain record (no categorization)."""
+    record = {
+        "url": video_url,
+        "normalized_url": normalized_url,
+        "status_code": None,
+        "data": None,
+        "error": None,
+        "from_cache": False,
+    }
+    try:
+        r = fetch_oembed(normalized_url, headers)
+        record.update(status_code=r.status_code, data=r.data, from_cache=r.from_cache)
+    except Exception as e:
+        record["error"] = str(e)
+    return record
+
+
+def describe_failure(record: Dict) -> str:
+    """Human-readable reason a raw record has no usable data."""
+    if record.get("error"):
+        return f"❌ Error fetching {record['url']}: {record['error']}"
+    return f"❌ Failed to fetch: {record['url']} (Status: {record['status_code']})"
+
+
+def records_from_metadata(all_metadata: Iterable[Dict]) -> Iterator[Tuple[int, Dict]]:
+    """Turn saved metadata back into raw records, so it can be re-categorized offline."""
+    for i, video in enumerate(all_metadata):
+        data = {key: value for key, value in video.items()
+                if key in ("title", "author_name", "author_url", "thumbnail_url",
+                           "provider_name", "version", "html")}
+        yield i, {
+            "url": video["url"],
+            "normalized_url": video.get("normalized_url", video["url"]),
+            "status_code": 200,
+            "data": data,
+            "error": None,
+            "from_cache": True,
+        }
+
+
+class FetchStage:
+    """
+    Streams (index, raw_record) pairs for `links`, fetched by a pool of worker threads.
+
+    Records are yielded in completion order; `index` is the link's position in the input.
+    If iterating `links` raises, the records fetched so far are yielded and then the
+    exception is re-raised to the consumer.
+    """
+
+    def __init__(self, links: Iterable[str], fetch_fn: Callable[[str], Dict],
+                 concurrency: int = FETCH_CONCURRENCY, queue_size: int = QUEUE_SIZE):
+        self.fetch_fn = fetch_fn
+        self.concurrency = max(1, concurrency)
+        self._inbox = queue.Queue(maxsize=queue_size)
+        self._outbox = queue.Queue(maxsize=queue_size)
+        self._stop = threading.Event()
+        self._remaining = self.concurrency
+        self._error = None
+
+        threading.Thread(target=self._feed, args=(links,), daemon=True).start()
+        for _ in range(self.concurrency):
+            threading.Thread(target=self._work, daemon=True).start()
+
+    def _put(self, q: queue.Queue, item) -> bool:
+        """Blocking put that gives up once the stage is stopped."""
+        while not self._stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _feed(self, links: Iterable[str]):
+        try:
+            for item in enumerate(links):
+                if not self._put(self._inbox, item):
+                    return
+        except Exception as e:
+            self._put(self._outbox, _FeedError(e))
+        finally:
+            # Always stop the workers, or they (and the consumer) would wait forever
+            for _ in range(self.concurrency):
+                self._put(self._inbox, _DONE)
+
+    def _work(self):
+        try:
+            while not self._stop.is_set():
+                item = self._inbox.get()
+                if item is _DONE:
+                    break
+                index, link = item
+                try:
+                    record = self.fetch_fn(link)
+                except Exception as e:
+                    # Reported downstream through describe_failure() like any failed fetch
+                    record = failure_record(link, e)
+                if not self._put(self._outbox, (index, record)):
+                    return
+        finally:
+            # Always signal completion, or the consumer would wait forever
+            self._put(self._outbox, _DONE)
+
+    def _get(self, block: bool = True):
+        """
+        Next (index, record) pair, or None once every worker has finished. A blocking
+        call re-raises an error from the `links` iterable once the records already
+        fetched are out (a non-blocking one leaves it for the next blocking call).
+        """
+        while self._remaining:
+            item = self._outbox.get(block=block)
+            if item is _DONE:
+                self._remaining -= 1
+                continue
+            if isinstance(item, _FeedError):
+                self._error = item.error
+                continue
+            return item
+        if self._error is not None and block:
+            error, self._error = self._error, None
+            raise error
+        return None
+
+    def __iter__(self) -> Iterator[Tuple[int, Dict]]:
+        try:
+            while True:
+                item = self._get()
+                if item is None:
+                    return
+                yield item
+        finally:
+            self.close()
+
+    def batches(self, max_size: int) -> Iterator[List[Tuple[int, Dict]]]:
+        """Yield whatever has arrived (at least one record, at most `max_size`) as a batch."""
+        try:
+            while True:
+                first = self._get()
+                if first is None:
+                    return
+                batch = [first]
+                while len(batch) < max_size:
+                    try:
+                        item = self._get(block=False)
+                    except queue.Empty:
+                        break
+                    if item is None:
+                        break
+                    batch.append(item)
+                yield batch
+        finally:
+            self.close()
+
+    def close(self):
+        self._stop.set()
+
+
+def categorize_stage(records, categorize_fn: Callable[[List[Dict]], List[Optional[Dict]]],
+                     batch_size: int = BATCH_SIZE) -> Iterator[Tuple[int, Dict, Optional[Dict]]]:
+    """
+    Categorize raw records in batches, yielding (index, raw_record, metadata).
+
+    `records` is a FetchStage or any iterable of (index, raw_record) pairs;
+    `categorize_fn` maps a list of raw records to metadata dicts (None for failures).
+    """
+    if isinstance(records, FetchStage):
+        batches = records.batches(batch_size)
+    else:
+        iterator = iter(records)
+        batches = iter(lambda: list(islice(iterator, batch_size)), [])
+
+    for batch in batches:
+        results = categorize_fn([record for _, record in batch])
+        for (index, record), metadata in zip(batch, results):
+            yield index, record, metadata
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Offline re-categorization - reruns categorization on saved metadata without any network access.
+Useful after tweaking CATEGORY_KEYWORDS or CATEGORY_TRAINING_DATA.
+
+    python recategorize.py                 # tiktok_metadata.json    -> categorized_tiktoks/
+    python recategorize.py --ml            # tiktok_metadata_ml.json -> categorized_tiktoks_ml/
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import time
+from collections import deque
+from itertools import islice
+from multiprocessing import Pool
+
+import categorize_tiktoks
+from collection_index import build_index
+from metadata_store import load_metadata
+from output_writer import OUTPUT_FORMATS, OutputWriter
+from pipeline import categorize_stage, records_from_metadata
+
+RECATEGORIZE_BATCH_SIZE = 4096
+RECATEGORIZE_WORKERS = 1  # Processes to categorize with; 0 = one per CPU core
+
+
+_worker_categorize = None
+
+
+def _init_worker(model_dir: str = None, batch_memo: bool = None):
+    """
+    Set up one worker's categorize function. ML workers memory-map the model the
+    parent saved to model_dir, so it is neither retrained nor pickled per task.
+    """
+    global _worker_categorize
+    if model_dir is None:
+        _worker_categorize = categorize_tiktoks.categorize_records
+        return
+    import categorize_tiktoks_ml
+    categorizer = categorize_tiktoks_ml.MLCategorizer(batch_memo)
+    with contextlib.redirect_stdout(io.StringIO()):  # The parent already reported on ML/NLTK
+        if not categorizer.load(model_dir):
+            categorizer.train(model_dir=None)
+        categorize_tiktoks_ml.load_nltk()
+    _worker_categorize = lambda records: categorize_tiktoks_ml.categorize_records(records, categorizer)
+
+
+def _categorize_shard(records):
+    return _worker_categorize(records)
+
+
+def parallel_categorize(all_metadata, workers: int, batch_size: int = RECATEGORIZE_BATCH_SIZE,
+                        model_dir: str = None, batch_memo: bool = None):
+    """
+    Categorize saved metadata on a pool of worker processes, one batch per task,
+    and return the results in input order. model_dir selects the ML categorizer
+    (loaded from its saved model); None uses keywords.
+    """
+    records = (record for _, record in records_from_metadata(all_metadata))
+    shards = iter(lambda: list(islice(records, batch_size)), [])
+    results = []
+    with Pool(workers, initializer=_init_worker, initargs=(model_dir, batch_memo)) as pool:
+        # Only a few shards are in flight at once (Pool.imap would pickle them all up front)
+        pending = deque()
+        for shard in shards:
+            pending.append(pool.apply_async(_categorize_shard, (shard,)))
+            if len(pending) >= workers * 2:
+                results.extend(pending.popleft().get())
+        while pending:
+            results.extend(pending.popleft().get())
+    return results
+
+
+def recategorize_keywords(all_metadata, batch_size: int = RECATEGORIZE_BATCH_SIZE,
+                          workers: int = RECATEGORIZE_WORKERS):
+    """Rebuild keyword categories for saved metadata."""
+    workers = workers or os.cpu_count()
+    if workers > 1:
+        return parallel_categorize(all_metadata, workers, batch_size)
+    stage = categorize_stage(records_from_metadata(all_metadata),
+                             categorize_tiktoks.categorize_records, batch_size)
+    return [metadata for _, _, metadata in stage]
+
+
+def recategorize_ml(all_metadata, categorizer, batch_size: int = RECATEGORIZE_BATCH_SIZE,
+                    workers: int = RECATEGORIZE_WORKERS, model_dir: str = None):
+    """
+    Rebuild ML categories for saved metadata. With workers > 1 the categorizer
+    must have been saved to model_dir (default: MODEL_DIR), which workers load from.
+    """
+    import categorize_tiktoks_ml
+    workers = workers or os.cpu_count()
+    if workers > 1:
+        return parallel_categorize(all_metadata, workers, batch_size,
+                                   model_dir or categorize_tiktoks_ml.MODEL_DIR, categorizer.batch_memo)
+    stage = categorize_stage(records_from_metadata(all_metadata),
+                             lambda records: categorize_tiktoks_ml.categorize_records(records, categorizer),
+                             batch_size)
+    return [metadata for _, _, metadata in stage]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-categorize saved TikTok metadata offline.")
+    parser.add_argument("--ml", action="store_true", help="use the ML categorizer instead of keywords")
+    parser.add_argument("metadata_file", nargs="?",
+                        help="metadata JSON or .db store to re-categorize (default: the selected categorizer's METADATA_FILE)")
+    parser.add_argument("--output-dir", help="where to write organized files (default: the categorizer's OUTPUT_DIR)")
+    parser.add_argument("--batch-size", type=int, default=RECATEGORIZE_BATCH_SIZE,
+                        help=f"videos categorized per batch (default: {RECATEGORIZE_BATCH_SIZE})")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default="files",
+                        help="write author/hashtag files as plain files, one zip, or one SQLite db (default: files)")
+    parser.add_argument("--retrain", action="store_true",
+                        help="with --ml, ignore the saved model and train a fresh one")
+    parser.add_argument("--memo", action="store_true",
+                        help="with --ml, remember results across batches; only worth it when many titles repeat")
+    parser.add_argument("--workers", type=int, default=RECATEGORIZE_WORKERS,
+                        help=f"processes to categorize with, 0 = one per CPU core (default: {RECATEGORIZE_WORKERS})")
+    args = parser.parse_args()
+
+    if args.ml:
+        import categorize_tiktoks_ml as module
+    else:
+        module = categorize_tiktoks
+    metadata_file = args.metadata_file or module.METADATA_FILE
+    output_dir = args.output_dir or module.OUTPUT_DIR
+
+    try:
+        saved = load_metadata(metadata_file)
+    except FileNotFoundError:
+        print(f"❌ Error: {metadata_file} not found!")
+        print(f"Run {module.__name__}.py first to fetch metadata.")
+        return
+
+    print(f"🎬 Loaded {len(saved)} videos from {metadata_file}")
+    start = time.perf_counter()
+
+    if args.ml:
+        categorizer = module.MLCategorizer(batch_memo=args.memo or None)
+        categorizer.train(retrain=args.retrain)
+        all_metadata = recategorize_ml(saved, categorizer, args.batch_size, args.workers)
+    else:
+        all_metadata = recategorize_keywords(saved, args.batch_size, args.workers)
+
+    print(f"🔁 Re-categorized {len(all_metadata)} videos in {time.perf_counter() - start:.2f}s")
+    if (args.workers or os.cpu_count()) == 1:
+        memo = categorizer.memo if args.ml else categorize_tiktoks.get_keyword_memo()
+        if memo.lookups:
+            print(f"🧠 Categorization memo: {memo.summary()}")
+    print()
+
+    module.save_metadata(all_metadata, metadata_file)
+
+    print(f"\n📂 Organizing videos...\n")
+    index = build_index(all_metadata)
+    module.organize_by_categories(all_metadata, output_dir, index)
+    with OutputWriter(output_dir, args.output_format) as writer:
+        module.organize_by_authors(all_metadata, output_dir, index, writer)
+        module.organize_by_hashtags(all_metadata, output_dir, index=index, writer=writer)
+    print(f"💾 Wrote {writer.written} files ({writer.unchanged} unchanged)")
+    if args.ml:
+        module.generate_ml_report(all_metadata, output_dir, categorizer, index)
+    else:
+        module.generate_summary_report(all_metadata, output_dir, index)
+
+    print(f"\n✨ Done! Check the '{output_dir}' folder.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+import categorize_tiktoks
+from categorize_tiktoks import categorize_by_keywords, categorize_records
+
+
+def raw_record(title):
+    return {"url": "https://www.tiktok.com/@a/video/1", "normalized_url": "https://www.tiktok.com/@a/video/1",
+            "status_code": 200, "data": {"title": title}, "error": None, "from_cache": False}
+
+
+def test_keyword_changes_apply_to_direct_calls(monkeypatch):
+    keywords = {category: list(words) for category, words in categorize_tiktoks.CATEGORY_KEYWORDS.items()}
+    monkeypatch.setattr(categorize_tiktoks, "CATEGORY_KEYWORDS", keywords)
+    title = "zzqx tutorial"
+    assert "Cooking" not in categorize_by_keywords(title)
+
+    keywords["Cooking"].append("zzqx")
+    assert "Cooking" in categorize_by_keywords(title)
+    assert "Cooking" in categorize_records([raw_record(title)])[0]["categories"]
+
+    keywords["Cooking"].remove("zzqx")
+    assert "Cooking" not in categorize_by_keywords(title)
+
+
+def test_failed_records_have_no_metadata():
+    record = dict(raw_record("anything"), status_code=404, data=None)
+    assert categorize_records([record]) == [None]
@@ -0,0 +1,39 @@
+import io
+
+import extract_tiktoks
+from extract_tiktoks import VideoIdSet, extract_tiktok_links
+
+BIG_ID = 1 << 64
+
+
+def test_video_id_set_handles_zero_and_rejects_oversized_ids():
+    ids = VideoIdSet()
+    assert ids.add(0) and not ids.add(0)
+    assert 0 in ids and len(ids) == 1
+    assert BIG_ID not in ids
+    assert not VideoIdSet.fits(BIG_ID)
+
+
+def test_oversized_video_ids_are_deduplicated_without_overflow(tmp_path):
+    source = tmp_path / "links.txt"
+    source.write_text(
+        f"https://www.tiktok.com/@a/video/{BIG_ID}\n"
+        f"https://www.tiktokv.com/share/video/{BIG_ID}/\n"
+        "https://www.tiktok.com/@a/video/123\n"
+        "https://www.tiktokv.com/share/video/123/\n",
+        encoding="utf-8",
+    )
+    output = tmp_path / "out.txt"
+    extract_tiktok_links(str(source), str(output))
+    assert output.read_text(encoding="utf-8").splitlines() == [
+        f"https://www.tiktok.com/@a/video/{BIG_ID}",
+        "https://www.tiktok.com/@a/video/123",
+    ]
+
+
+def test_link_spanning_the_carry_cut_is_reported(monkeypatch, capsys):
+    monkeypatch.setattr(extract_tiktoks, "MAX_CARRY", 100)
+    text = "b" * 990 + "https://www.tiktok.com/@a/video/1?x=" + "a" * 3000 + " https://www.tiktok.com/@b/video/5 "
+    links = list(extract_tiktoks.iter_links(io.StringIO(text), block_size=1000))
+    assert links[-1] == "https://www.tiktok.com/@b/video/5"
+    assert "1 links longer than 100 characters" in capsys.readouterr().err
@@ -0,0 +1,23 @@
+from link_store import LinkStore
+
+
+def test_from_text_skips_ids_over_64_bits(tmp_path, capsys):
+    source = tmp_path / "links.txt"
+    source.write_text(
+        f"https://www.tiktok.com/@a/video/{1 << 64}\n"
+        "https://www.tiktokv.com/share/video/7000000000000000001/\n",
+        encoding="utf-8",
+    )
+    store = LinkStore.from_text(str(source))
+    assert list(store) == [7000000000000000001]
+    assert "Skipped 1 links" in capsys.readouterr().err
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "links.ids")
+    LinkStore([3, 1, 2, 3]).save(path)
+    store = LinkStore.load(path)
+    try:
+        assert list(store) == [1, 2, 3] and 2 in store and 4 not in store
+    finally:
+        store.close()
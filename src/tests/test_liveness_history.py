@@ -0,0 +1,26 @@
+from liveness_history import LivenessHistory
+from oembed_client import ALIVE, DEAD
+
+
+def test_same_cached_verdict_counts_once(tmp_path):
+    with LivenessHistory(str(tmp_path / "history.db")) as history:
+        fetched_at = 1_700_000_000.0
+        history.record([("123", DEAD, fetched_at)])
+        history.record([("123", DEAD, fetched_at)])
+        assert history.get("123").consecutive_failures == 1
+
+
+def test_duplicate_results_in_one_call_count_once(tmp_path):
+    with LivenessHistory(str(tmp_path / "history.db")) as history:
+        history.record([("123", DEAD, 100.0), ("123", DEAD, 100.0)])
+        history.record([("123", DEAD, 100.0), ("123", DEAD, 100.0)])
+        assert history.get("123").consecutive_failures == 1
+
+
+def test_newer_check_extends_streak_and_older_is_ignored(tmp_path):
+    with LivenessHistory(str(tmp_path / "history.db")) as history:
+        history.record([("123", DEAD, 100.0)])
+        history.record([("123", DEAD, 200.0)])
+        history.record([("123", ALIVE, 150.0)])
+        entry = history.get("123")
+        assert (entry.last_status, entry.last_checked, entry.consecutive_failures) == (DEAD, 200.0, 2)
@@ -0,0 +1,75 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+pytest.importorskip("requests")
+
+import oembed_cache
+from benchmarks.stub_oembed import make_links, start_stub_server
+from oembed_client import AdaptiveRateLimiter, OEmbedClient, normalize_tiktok_url
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    server, url = start_stub_server(latency=0.02)
+    monkeypatch.setattr(oembed_cache, "OEMBED_URL", url)
+    monkeypatch.setattr(oembed_cache, "CACHE_ENABLED", False)
+    yield server
+    server.shutdown()
+
+
+def make_client(**kwargs):
+    return OEmbedClient(AdaptiveRateLimiter(rate=float("inf"), max_rate=float("inf")), **kwargs)
+
+
+def test_growing_the_pool_mid_run_keeps_requests_and_counts(stub):
+    client = make_client(pool_size=2)
+    links = [normalize_tiktok_url(link) for link in make_links(40)]
+    started = threading.Event()
+
+    def fetch(link):
+        started.set()
+        return client.fetch(link).status_code
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(fetch, link) for link in links]
+        started.wait()
+        client.ensure_pool_size(8)
+        statuses = [future.result() for future in futures]
+
+    assert sorted(set(statuses)) == [200, 400]
+    assert client.connection_counts()[0] == len(links)
+    client.fetch(links[0])
+    assert client.connection_counts()[0] == len(links) + 1
+    assert client._session_pool_size == 8
+
+
+def test_counters_add_up_across_threads(stub):
+    client = make_client()
+    links = [normalize_tiktok_url(link) for link in make_links(200)]
+    with ThreadPoolExecutor(16) as pool:
+        verdicts = list(pool.map(client.probe, links))
+    assert client.probes == len(links) == len(verdicts)
+    assert client.stats.requests == client.probes + client.probe_fallbacks
+
+
+def test_head_is_spot_checked_after_the_first_verdicts(stub, monkeypatch):
+    import oembed_client
+    from benchmarks.stub_oembed import StubOEmbedHandler
+
+    def lying_head(handler):
+        handler.send_response(200)  # Claims every video is alive
+        handler.send_header("Content-Length", "0")
+        handler.end_headers()
+
+    monkeypatch.setattr(StubOEmbedHandler, "do_HEAD", lying_head)
+    monkeypatch.setattr(oembed_client, "PROBE_SPOT_CHECK", 1.0)
+    client = make_client()
+    links = [normalize_tiktok_url(link) for link in make_links(10, start=7560000000000000003)]
+    for link in links[:oembed_client.PROBE_VERIFY]:
+        assert client.probe(link) == "alive"
+    assert client.probe_method == "HEAD"
+    dead = normalize_tiktok_url(make_links(1, start=7560000000000000010)[0])
+    assert client.probe(dead) == "dead"
+    assert client.probe_method == "GET"
@@ -0,0 +1,44 @@
+import open_tiktoks
+from open_tiktoks import load_cursor, open_links_in_batches
+
+
+def write_links(path, ids):
+    path.write_text("".join(f"https://www.tiktokv.com/share/video/{i}/\n" for i in ids), encoding="utf-8")
+
+
+def run(path, monkeypatch, stop_at_prompt):
+    opened = []
+    monkeypatch.setattr(open_tiktoks.webbrowser, "open_new_tab", opened.append)
+    prompts = []
+
+    def prompt(_):
+        prompts.append(1)
+        if len(prompts) == stop_at_prompt:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr("builtins.input", prompt)
+    open_links_in_batches(str(path), batch_size=2, prefetch_metadata=False)
+    return [link.split("/")[-2] for link in opened]
+
+
+def test_stopping_at_the_prompt_keeps_the_opened_batch(tmp_path, monkeypatch):
+    monkeypatch.setattr(open_tiktoks.liveness_history, "HISTORY_ENABLED", False)
+    monkeypatch.setattr(open_tiktoks, "get_cache", lambda: None)
+    links = tmp_path / "links.txt"
+    write_links(links, range(101, 106))
+
+    assert run(links, monkeypatch, stop_at_prompt=1) == ["105", "104"]
+    assert load_cursor(str(links))["batch"] == 1
+    assert run(links, monkeypatch, stop_at_prompt=0) == ["103", "102", "101"]
+
+
+def test_appended_links_come_first(tmp_path, monkeypatch):
+    monkeypatch.setattr(open_tiktoks.liveness_history, "HISTORY_ENABLED", False)
+    monkeypatch.setattr(open_tiktoks, "get_cache", lambda: None)
+    links = tmp_path / "links.txt"
+    write_links(links, range(101, 104))
+    assert run(links, monkeypatch, stop_at_prompt=1) == ["103", "102"]
+
+    with open(links, "a", encoding="utf-8") as f:
+        f.write("https://www.tiktokv.com/share/video/200/\n")
+    assert run(links, monkeypatch, stop_at_prompt=0) == ["200", "101"]
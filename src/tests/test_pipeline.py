@@ -0,0 +1,50 @@
+import pytest
+
+from pipeline import FetchStage, categorize_stage
+
+
+def fake_fetch(link):
+    return {"url": link, "status_code": 200, "data": {"title": link}, "error": None}
+
+
+def broken_links():
+    yield "https://www.tiktok.com/@a/video/1"
+    raise RuntimeError("input went away")
+
+
+def test_fetch_stage_yields_every_link():
+    links = [f"https://www.tiktok.com/@a/video/{i}" for i in range(50)]
+    results = sorted(FetchStage(links, fake_fetch, concurrency=4))
+    assert [index for index, _ in results] == list(range(50))
+
+
+def test_fetch_stage_survives_a_raising_fetch():
+    def fetch(link):
+        if link.endswith("1"):
+            raise ValueError("boom")
+        return fake_fetch(link)
+
+    results = dict(FetchStage(["x/0", "x/1", "x/2"], fetch, concurrency=2))
+    assert results[1]["error"] == "boom" and results[1]["data"] is None
+    assert results[0]["data"] and results[2]["data"]
+
+
+def test_error_from_links_reaches_the_consumer():
+    received = []
+    with pytest.raises(RuntimeError, match="input went away"):
+        for item in FetchStage(broken_links(), fake_fetch, concurrency=2):
+            received.append(item)
+    assert [index for index, _ in received] == [0]
+
+
+def test_records_before_a_links_error_are_categorized():
+    categorized = []
+
+    def categorize(records):
+        categorized.extend(records)
+        return records
+
+    with pytest.raises(RuntimeError):
+        for _ in categorize_stage(FetchStage(broken_links(), fake_fetch), categorize, batch_size=8):
+            pass
+    assert [record["url"] for record in categorized] == ["https://www.tiktok.com/@a/video/1"]